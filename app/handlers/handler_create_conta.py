@@ -2,17 +2,27 @@ import json
 from app.services.servico_conta import ServicoConta
 from app.repositories.conta_repository import ContaRepository
 from app.repositories.fornecedor_repository import FornecedorRepository
+from app.repositories.cache import FornecedorRepositoryCache
+from app.repositories.outbox import OutboxRepository
+from app.repositories.transacao import unidade_de_trabalho
 from app.schemas.conta_schema import ContaCreate
 from app.utils.database import db_config
 from app.utils.logger import get_logger
-from app.utils.aws_config import send_sqs_message
+from app.utils.serialization import conta_json, dumps
+from app.utils.tracing import tracer
 from pydantic import ValidationError
 import os
 
 logger = get_logger(__name__)
 
 def lambda_handler(event, context):
-    """Handler Lambda para criar conta via API Gateway"""
+    """
+    Handler Lambda para criar conta via API Gateway
+
+    A mensagem SQS de conta criada é gravada na outbox na mesma transação da
+    conta e publicada depois pelo RelayOutbox, fora do caminho da resposta,
+    levando o contexto de trace da requisição.
+    """
     try:
         # Parse do body da requisição
         if isinstance(event.get('body'), str):
@@ -40,36 +50,33 @@ def lambda_handler(event, context):
         try:
             # Instanciar repositórios e serviços
             repo_conta = ContaRepository(session)
-            repo_fornecedor = FornecedorRepository(session)
+            repo_fornecedor = FornecedorRepositoryCache(FornecedorRepository(session))
             servico_conta = ServicoConta(repo_conta, repo_fornecedor)
             
-            # Criar conta
-            conta = servico_conta.criar_conta(conta_data)
-            
-            # Enviar para fila SQS (processamento assíncrono)
+            # Criar conta e registrar o evento na outbox numa única transação
             queue_url = os.getenv('SQS_CONTA_CRIADA_URL')
-            if queue_url:
-                message = {
-                    'conta_id': conta.id,
-                    'acao': 'conta_criada',
-                    'valor': conta.valor,
-                    'vencimento': conta.vencimento.isoformat()
-                }
-                send_sqs_message(queue_url, json.dumps(message))
+            with unidade_de_trabalho(session):
+                conta = servico_conta.criar_conta(conta_data)
+                
+                if queue_url:
+                    message = {
+                        'conta_id': conta.id,
+                        'acao': 'conta_criada',
+                        'valor': conta.valor,
+                        'vencimento': conta.vencimento.isoformat()
+                    }
+                    OutboxRepository(session).adicionar(queue_url, dumps(message), atributos=tracer.serialized_attributes())
+                
+                # Serializada antes do commit, que expira os atributos da conta
+                conta_id, corpo = conta.id, conta_json(conta)
             
-            logger.info(f"Conta criada com sucesso: {conta.id}")
+            tracer.annotate(conta_id=conta_id)
+            logger.info(f"Conta criada com sucesso: {conta_id}")
             
             return {
                 'statusCode': 201,
                 'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({
-                    'id': conta.id,
-                    'descricao': conta.descricao,
-                    'valor': conta.valor,
-                    'vencimento': conta.vencimento.isoformat(),
-                    'status': conta.status.value,
-                    'fornecedor_id': conta.fornecedor_id
-                })
+                'body': corpo
             }
             
         finally:
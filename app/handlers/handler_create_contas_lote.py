@@ -0,0 +1,110 @@
+import json
+from app.services.servico_conta import ServicoConta
+from app.repositories.conta_repository import ContaRepository
+from app.repositories.fornecedor_repository import FornecedorRepository
+from app.repositories.cache import FornecedorRepositoryCache
+from app.repositories.outbox import OutboxRepository
+from app.repositories.transacao import unidade_de_trabalho
+from app.utils.database import db_config
+from app.utils.logger import get_logger
+from app.utils.serialization import dumps
+from app.utils.tracing import tracer
+import os
+
+logger = get_logger(__name__)
+
+# Quantidade máxima de contas aceitas por requisição
+LIMITE_LOTE = int(os.getenv('CONTAS_LOTE_LIMITE', '5000'))
+
+def lambda_handler(event, context):
+    """
+    Handler Lambda para criar contas em lote via API Gateway (POST /contas/lote)
+
+    Retorna 201 se todas as contas foram criadas, 207 se só parte delas e 400
+    se nenhuma; o corpo traz o resultado de cada item nos três casos.
+    """
+    try:
+        # Parse do body da requisição
+        if isinstance(event.get('body'), str):
+            body = json.loads(event['body'])
+        else:
+            body = event.get('body', {})
+
+        itens = body.get('contas') if isinstance(body, dict) else body
+
+        if not isinstance(itens, list) or not itens:
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': 'Informe uma lista de contas em "contas"'})
+            }
+
+        if len(itens) > LIMITE_LOTE:
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': f'O lote deve ter no máximo {LIMITE_LOTE} contas'})
+            }
+
+        # Criar sessão do banco
+        session = db_config.get_session()
+
+        try:
+            repo_conta = ContaRepository(session)
+            repo_fornecedor = FornecedorRepositoryCache(FornecedorRepository(session))
+            servico_conta = ServicoConta(repo_conta, repo_fornecedor)
+
+            # Contas e eventos de conta criada (outbox) na mesma transação
+            queue_url = os.getenv('SQS_CONTA_CRIADA_URL')
+            with unidade_de_trabalho(session):
+                resultados = servico_conta.criar_contas_em_lote(itens)
+                criadas = [resultado for resultado in resultados if resultado['status'] == 'criada']
+
+                if queue_url and criadas:
+                    OutboxRepository(session).adicionar_varios(queue_url, (
+                        dumps({
+                            'conta_id': resultado['id'],
+                            'acao': 'conta_criada',
+                            'valor': resultado['valor'],
+                            'vencimento': resultado['vencimento']
+                        })
+                        for resultado in criadas
+                    ), atributos=tracer.serialized_attributes())
+
+            logger.info(f"Lote processado: {len(criadas)} de {len(itens)} contas criadas")
+
+            if len(criadas) == len(itens):
+                status_code = 201
+            elif criadas:
+                status_code = 207
+            else:
+                status_code = 400
+
+            return {
+                'statusCode': status_code,
+                'headers': {'Content-Type': 'application/json'},
+                'body': dumps({
+                    'total': len(itens),
+                    'criadas': len(criadas),
+                    'erros': len(itens) - len(criadas),
+                    'resultados': resultados
+                })
+            }
+
+        finally:
+            session.close()
+
+    except ValueError as e:
+        logger.error(f"Erro de negócio: {e}")
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': str(e)})
+        }
+    except Exception as e:
+        logger.error(f"Erro interno: {e}")
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': 'Erro interno do servidor'})
+        }
@@ -0,0 +1,37 @@
+import json
+from app.repositories.outbox import OutboxRepository
+from app.services.relay_outbox import RelayOutbox
+from app.utils.database import db_config
+from app.utils.logger import get_logger
+from app.utils.serialization import dumps
+import os
+
+logger = get_logger(__name__)
+
+# Folga (em segundos) deixada antes do timeout da Lambda
+MARGEM_TIMEOUT = float(os.getenv('OUTBOX_MARGEM_TIMEOUT', '5'))
+
+def tempo_disponivel(context) -> float:
+    """Tempo (em segundos) que a drenagem pode usar nesta invocação"""
+    limite = float(os.getenv('OUTBOX_TEMPO_LIMITE', '30'))
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        limite = min(limite, context.get_remaining_time_in_millis() / 1000 - MARGEM_TIMEOUT)
+    return max(limite, 0)
+
+def lambda_handler(event, context):
+    """Handler Lambda para publicar no SQS as mensagens da outbox (regra agendada drenar-outbox)"""
+    session = db_config.get_session()
+    try:
+        resultado = RelayOutbox(OutboxRepository(session)).drenar(tempo_limite=tempo_disponivel(context))
+        return {
+            'statusCode': 200,
+            'body': dumps(resultado)
+        }
+    except Exception as e:
+        logger.error(f"Erro ao drenar outbox: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'Erro ao drenar outbox'})
+        }
+    finally:
+        session.close()
@@ -0,0 +1,95 @@
+import json
+from datetime import date
+from app.services.servico_conta import ServicoConta
+from app.repositories.conta_repository import ContaRepository
+from app.repositories.fornecedor_repository import FornecedorRepository
+from app.repositories.cache import FornecedorRepositoryCache
+from app.repositories.leitura import ContaLeituraRepository
+from app.models.conta import Status
+from app.utils.database import db_config
+from app.utils.logger import get_logger
+from app.utils.serialization import pagina_contas_json
+
+logger = get_logger(__name__)
+
+def lambda_handler(event, context):
+    """Handler Lambda para listar contas via API Gateway (paginação por cursor)"""
+    try:
+        params = event.get('queryStringParameters') or {}
+
+        try:
+            filtros = extrair_filtros(params)
+            limite = int(params['limit']) if params.get('limit') else None
+        except ValueError as e:
+            logger.error(f"Parâmetros inválidos: {e}")
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': 'Parâmetros inválidos', 'details': str(e)})
+            }
+
+        # Criar sessão do banco (somente leitura: usa as réplicas, se configuradas)
+        session = db_config.get_session(read_only=True)
+
+        try:
+            repo_conta = ContaRepository(session)
+            repo_fornecedor = FornecedorRepositoryCache(FornecedorRepository(session))
+            servico_conta = ServicoConta(repo_conta, repo_fornecedor, ContaLeituraRepository(session))
+
+            contas, proximo_cursor = servico_conta.listar_contas_paginado(
+                limite=limite,
+                cursor=params.get('cursor'),
+                **filtros
+            )
+
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'body': pagina_contas_json(contas, proximo_cursor)
+            }
+
+        finally:
+            session.close()
+
+    except ValueError as e:
+        logger.error(f"Erro de negócio: {e}")
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': str(e)})
+        }
+    except Exception as e:
+        logger.error(f"Erro interno: {e}")
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': 'Erro interno do servidor'})
+        }
+
+def extrair_filtros(params: dict) -> dict:
+    """Converte os query string parameters em filtros do repositório"""
+    filtros = {}
+
+    if params.get('status'):
+        filtros['status'] = parse_status(params['status'])
+
+    if params.get('fornecedor_id'):
+        filtros['fornecedor_id'] = int(params['fornecedor_id'])
+
+    if params.get('data_inicio'):
+        filtros['data_inicio'] = date.fromisoformat(params['data_inicio'])
+
+    if params.get('data_fim'):
+        filtros['data_fim'] = date.fromisoformat(params['data_fim'])
+
+    return filtros
+
+def parse_status(valor: str) -> Status:
+    """Aceita tanto o valor ('Aberta') quanto o nome ('ABERTA') do status"""
+    try:
+        return Status(valor)
+    except ValueError:
+        try:
+            return Status[valor.upper()]
+        except KeyError:
+            raise ValueError(f"Status inválido: {valor}")
@@ -1,10 +1,11 @@
 import json
 from app.utils.logger import get_logger
+from app.utils.tracing import tracer
 
 logger = get_logger(__name__)
 
 def lambda_handler(event, context):
-    """Handler Lambda para notificações SNS"""
+    """Handler Lambda para notificações SNS (um span "sns <tópico>" por notificação, continuando o trace recebido)"""
     try:
         # Processar cada notificação SNS
         for record in event.get('Records', []):
@@ -23,14 +24,16 @@ def lambda_handler(event, context):
                 # - Webhook
                 # - Integração com sistemas externos
                 
-                if 'conta_criada' in topic_arn.lower():
-                    processar_notificacao_conta_criada(message, subject)
-                elif 'vencimento' in topic_arn.lower():
-                    processar_notificacao_vencimento(message, subject)
-                elif 'pagamento' in topic_arn.lower():
-                    processar_notificacao_pagamento(message, subject)
-                else:
-                    processar_notificacao_generica(message, subject)
+                remote = tracer.extract(sns_message.get('MessageAttributes'))
+                with tracer.span(f"sns {topic_arn.rsplit(':', 1)[-1]}", remote):
+                    if 'conta_criada' in topic_arn.lower():
+                        processar_notificacao_conta_criada(message, subject)
+                    elif 'vencimento' in topic_arn.lower():
+                        processar_notificacao_vencimento(message, subject)
+                    elif 'pagamento' in topic_arn.lower():
+                        processar_notificacao_pagamento(message, subject)
+                    else:
+                        processar_notificacao_generica(message, subject)
                 
             except Exception as e:
                 logger.error(f"Erro ao processar notificação SNS: {e}")
@@ -0,0 +1,107 @@
+import json
+from app.services.servico_conta import ServicoConta
+from app.services.notificacoes import resumir_pagamentos
+from app.repositories.conta_repository import ContaRepository
+from app.repositories.fornecedor_repository import FornecedorRepository
+from app.repositories.cache import FornecedorRepositoryCache
+from app.schemas.conta_schema import ContaPagamentoLote
+from app.utils.database import db_config
+from app.utils.logger import get_logger
+from app.utils.aws_config import publish_sns_message
+from app.utils.serialization import dumps
+from pydantic import ValidationError
+import os
+
+logger = get_logger(__name__)
+
+# Quantidade máxima de ids aceitos por requisição
+LIMITE_LOTE = int(os.getenv('CONTAS_LOTE_LIMITE', '5000'))
+
+def lambda_handler(event, context):
+    """
+    Handler Lambda para pagar contas em lote via API Gateway (POST /contas/pagar)
+
+    Body: {"conta_ids": [...]} e/ou {"fornecedor_id": N} (todas as contas em
+    aberto do fornecedor). As contas são pagas num único UPDATE; contas já
+    pagas são ignoradas. Se a notificação SNS falhar, o pagamento continua
+    confirmado (200) e o corpo traz notificacao_falhou=true.
+    """
+    try:
+        # Parse do body da requisição
+        if isinstance(event.get('body'), str):
+            body = json.loads(event['body'])
+        else:
+            body = event.get('body', {})
+
+        # Validação com Pydantic
+        try:
+            pagamento = ContaPagamentoLote(**body)
+        except (ValidationError, TypeError) as e:
+            logger.error(f"Erro de validação: {e}")
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': 'Informe "conta_ids" e/ou "fornecedor_id"'})
+            }
+
+        if pagamento.conta_ids is not None and len(pagamento.conta_ids) > LIMITE_LOTE:
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': f'O lote deve ter no máximo {LIMITE_LOTE} contas'})
+            }
+
+        # Criar sessão do banco
+        session = db_config.get_session()
+
+        try:
+            repo_conta = ContaRepository(session)
+            repo_fornecedor = FornecedorRepositoryCache(FornecedorRepository(session))
+            servico_conta = ServicoConta(repo_conta, repo_fornecedor)
+
+            pagas = servico_conta.pagar_contas(conta_ids=pagamento.conta_ids, fornecedor_id=pagamento.fornecedor_id)
+            total = sum(paga.valor for paga in pagas)
+
+            # Uma única notificação para o lote. Os pagamentos já foram
+            # confirmados: uma falha aqui não pode virar erro da requisição,
+            # pois repeti-la não pagaria (nem notificaria) nada de novo
+            topic_arn = os.getenv('SNS_PAGAMENTO_TOPIC')
+            notificacao_falhou = False
+            if topic_arn and pagas:
+                try:
+                    nomes = servico_conta.nomes_fornecedores(paga.fornecedor_id for paga in pagas)
+                    publish_sns_message(topic_arn, resumir_pagamentos(pagas, nomes), "Contas Pagas")
+                except Exception as e:
+                    logger.error(f"Erro ao notificar pagamento em lote de {len(pagas)} contas: {e}")
+                    notificacao_falhou = True
+
+            logger.info(f"Pagamento em lote: {len(pagas)} contas pagas")
+
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'body': dumps({
+                    'pagas': len(pagas),
+                    'total': round(total, 2),
+                    'ids': [paga.id for paga in pagas],
+                    'notificacao_falhou': notificacao_falhou
+                })
+            }
+
+        finally:
+            session.close()
+
+    except ValueError as e:
+        logger.error(f"Erro de negócio: {e}")
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': str(e)})
+        }
+    except Exception as e:
+        logger.error(f"Erro interno: {e}")
+        return {
+            'statusCode': 500,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': 'Erro interno do servidor'})
+        }
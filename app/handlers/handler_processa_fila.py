@@ -1,109 +1,349 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from app.services.servico_conta import ServicoConta
 from app.repositories.conta_repository import ContaRepository
 from app.repositories.fornecedor_repository import FornecedorRepository
+from app.repositories.cache import FornecedorRepositoryCache
+from app.repositories.leitura import ContaLeituraRepository
+from app.repositories.outbox import OutboxRepository
+from app.repositories.transacao import unidade_de_trabalho
+from app.services.notificacoes import descrever_fornecedor, resumir_pagamentos
+from app.services.relay_outbox import RelayOutbox
 from app.utils.database import db_config
-from app.utils.logger import get_logger
+from app.utils.logger import get_logger, log_payload
 from app.utils.aws_config import publish_sns_message
+from app.utils.tracing import tracer
 import os
 
 logger = get_logger(__name__)
 
+# Mensagem do lote: (messageId, corpo da mensagem)
+Mensagem = Tuple[str, dict]
+
+# Ações cujas listagens podem ser feitas nas réplicas de leitura
+ACOES_COM_LEITURA = {'verificar_vencimentos'}
+
 def lambda_handler(event, context):
-    """Handler Lambda para processar mensagens SQS"""
+    """
+    Handler Lambda para processar mensagens SQS
+
+    Processa o lote inteiro numa única sessão e retorna em batchItemFailures
+    apenas as mensagens que falharam, para que só elas voltem para a fila.
+    Com SQS_WORKERS > 1 o lote é dividido entre threads (uma sessão por
+    thread), mantendo na mesma thread as mensagens de uma mesma conta.
+
+    O contexto de trace de cada mensagem é continuado num span por mensagem
+    ("sqs <ação>") nos processadores que notificam por conta.
+    """
+    records = event.get('Records', [])
+    workers = int(os.getenv('SQS_WORKERS', '1'))
+
     try:
-        # Processar cada mensagem da fila
-        for record in event.get('Records', []):
-            try:
-                # Parse da mensagem SQS
-                message_body = json.loads(record['body'])
-                
-                logger.info(f"Processando mensagem: {message_body}")
-                
-                # Criar sessão do banco
-                session = db_config.get_session()
-                
-                try:
-                    # Instanciar serviços
-                    repo_conta = ContaRepository(session)
-                    repo_fornecedor = FornecedorRepository(session)
-                    servico_conta = ServicoConta(repo_conta, repo_fornecedor)
-                    
-                    # Processar diferentes tipos de ação
-                    acao = message_body.get('acao')
-                    
-                    if acao == 'conta_criada':
-                        processar_conta_criada(servico_conta, message_body)
-                    elif acao == 'verificar_vencimentos':
-                        processar_verificacao_vencimentos(servico_conta)
-                    elif acao == 'marcar_como_paga':
-                        processar_pagamento(servico_conta, message_body)
-                    else:
-                        logger.warning(f"Ação não reconhecida: {acao}")
-                
-                finally:
-                    session.close()
-                    
-            except Exception as e:
-                logger.error(f"Erro ao processar mensagem: {e}")
-                # Em produção, você pode decidir se rejeita a mensagem ou não
-                continue
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({'message': 'Mensagens processadas com sucesso'})
-        }
-        
+        if workers > 1 and len(records) > 1:
+            falhas = processar_lote_concorrente(records, workers)
+        else:
+            falhas = processar_lote(records)
     except Exception as e:
         logger.error(f"Erro no handler SQS: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': 'Erro ao processar mensagens'})
-        }
-
-def processar_conta_criada(servico_conta, message_body):
-    """Processa notificação de conta criada"""
-    conta_id = message_body.get('conta_id')
-    conta = servico_conta.buscar_conta(conta_id)
-    
-    if conta:
-        # Enviar notificação SNS
-        topic_arn = os.getenv('SNS_CONTA_CRIADA_TOPIC')
-        if topic_arn:
-            mensagem = f"Nova conta criada: {conta.descricao} - R${conta.valor} - Vencimento: {conta.vencimento}"
-            publish_sns_message(topic_arn, mensagem, "Nova Conta a Pagar")
-        
-        logger.info(f"Processamento pós-criação concluído para conta {conta_id}")
+        falhas = [record.get('messageId') for record in records]
+
+    if falhas:
+        logger.warning(f"{len(falhas)} de {len(records)} mensagens com falha serão reprocessadas")
+
+    return {
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in falhas]
+    }
+
+def ler_mensagem(record: dict) -> dict:
+    """Faz o parse do corpo da mensagem SQS"""
+    message_body = json.loads(record['body'])
+    if not isinstance(message_body, dict):
+        raise ValueError("o corpo da mensagem deve ser um objeto JSON")
+    return message_body
+
+def agrupar_por_acao(records: List[dict]) -> Tuple[List[Dict[str, List[Mensagem]]], List[str]]:
+    """
+    Agrupa as mensagens por ação, na ordem em que aparecem
+
+    Um novo segmento é iniciado quando uma conta já vista recebe uma ação
+    diferente, para que as mensagens de uma mesma conta sejam processadas na
+    ordem original. Retorna os segmentos e os messageIds das mensagens inválidas.
+    """
+    segmentos: List[Dict[str, List[Mensagem]]] = [{}]
+    acao_por_conta = {}
+    invalidas = []
+
+    for record in records:
+        message_id = record.get('messageId')
+        try:
+            message_body = ler_mensagem(record)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Mensagem {message_id} inválida: {e}")
+            invalidas.append(message_id)
+            continue
+
+        log_payload(logger, "Processando mensagem", message_body, level="DEBUG")
+        acao = message_body.get('acao')
+        conta_id = message_body.get('conta_id')
+
+        if conta_id is not None and acao_por_conta.get(conta_id, acao) != acao:
+            segmentos.append({})
+            acao_por_conta = {}
+        if conta_id is not None:
+            acao_por_conta[conta_id] = acao
+
+        segmentos[-1].setdefault(acao, []).append((message_id, message_body))
+
+    return [segmento for segmento in segmentos if segmento], invalidas
+
+def processar_lote(records: List[dict]) -> List[str]:
+    """Processa um lote de mensagens SQS numa única sessão; retorna os messageIds que falharam"""
+    segmentos, falhas = agrupar_por_acao(records)
+    if not segmentos:
+        return falhas
+
+    with tracer.bind_records(records):
+        return processar_segmentos(segmentos, falhas)
+
+def processar_segmentos(segmentos: List[Dict[str, List[Mensagem]]], falhas: List[str]) -> List[str]:
+    """Processa os segmentos agrupados por ação numa única sessão; acrescenta às falhas os messageIds que falharam"""
+    # Criar sessão do banco (uma por lote) e, se necessário, uma de leitura
+    session = db_config.get_session()
+    reader_session = None
+    if db_config.has_reader and any(ACOES_COM_LEITURA & grupos.keys() for grupos in segmentos):
+        reader_session = db_config.get_session(read_only=True)
+
+    try:
+        # Instanciar serviços
+        repo_conta = ContaRepository(session)
+        repo_fornecedor = FornecedorRepositoryCache(FornecedorRepository(session))
+        repo_leitura = ContaLeituraRepository(reader_session if reader_session is not None else session)
+        servico_conta = ServicoConta(repo_conta, repo_fornecedor, repo_leitura)
+
+        for grupos in segmentos:
+            for acao, mensagens in grupos.items():
+                processador = PROCESSADORES.get(acao)
+                if not processador:
+                    # Devolvidas à fila (e, esgotadas as tentativas, à DLQ) em vez de descartadas
+                    logger.error(f"Ação não reconhecida: {acao} ({len(mensagens)} mensagens)")
+                    falhas.extend(message_id for message_id, _ in mensagens)
+                    continue
+
+                try:
+                    falhas.extend(processador(servico_conta, session, mensagens))
+                except Exception as e:
+                    logger.error(f"Erro ao processar {len(mensagens)} mensagens '{acao}': {e}")
+                    session.rollback()
+                    falhas.extend(message_id for message_id, _ in mensagens)
+
+    finally:
+        session.close()
+        if reader_session is not None:
+            reader_session.close()
+
+    return falhas
+
+def particionar_por_conta(records: List[dict], particoes: int) -> Tuple[List[List[dict]], List[dict]]:
+    """
+    Divide as mensagens com conta_id em até `particoes` partes, mantendo as
+    mensagens de uma mesma conta juntas e na ordem original
+
+    Mensagens sem conta_id (pagamento em lote, verificar_vencimentos,
+    drenar_outbox) e inválidas são retornadas à parte, na ordem original:
+    podem tocar contas de qualquer partição e por isso não rodam em paralelo
+    com elas.
+    """
+    divisao: List[List[dict]] = [[] for _ in range(particoes)]
+    sem_conta: List[dict] = []
+
+    for record in records:
+        try:
+            conta_id = ler_mensagem(record).get('conta_id')
+        except (KeyError, TypeError, ValueError):
+            conta_id = None
+        if conta_id is None:
+            sem_conta.append(record)
+        else:
+            divisao[hash(conta_id) % particoes].append(record)
+
+    return [parte for parte in divisao if parte], sem_conta
+
+def processar_lote_concorrente(records: List[dict], workers: int) -> List[str]:
+    """
+    Processa em paralelo as mensagens por conta, uma sessão por thread, e
+    depois, em série, as mensagens sem conta_id; retorna os messageIds que falharam
+    """
+    partes, sem_conta = particionar_por_conta(records, workers)
+    falhas: List[str] = []
+
+    if len(partes) == 1:
+        falhas.extend(processar_lote(partes[0]))
+    elif partes:
+        with ThreadPoolExecutor(max_workers=len(partes)) as executor:
+            for resultado in executor.map(processar_lote, partes):
+                falhas.extend(resultado)
+
+    if sem_conta:
+        falhas.extend(processar_lote(sem_conta))
 
-def processar_verificacao_vencimentos(servico_conta):
-    """Verifica e notifica sobre contas vencendo"""
+    return falhas
+
+def processar_contas_criadas(servico_conta, session, mensagens: List[Mensagem]) -> List[str]:
+    """Notifica as contas criadas, buscando todas com uma única consulta"""
+    contas = {
+        conta.id: conta
+        for conta in servico_conta.buscar_contas(
+            [message_body.get('conta_id') for _, message_body in mensagens], com_fornecedor=True
+        )
+    }
+    topic_arn = os.getenv('SNS_CONTA_CRIADA_TOPIC')
+    falhas = []
+
+    for message_id, message_body in mensagens:
+        conta_id = message_body.get('conta_id')
+        conta = contas.get(conta_id)
+        if not conta:
+            logger.warning(f"Conta {conta_id} não encontrada para notificação de criação")
+            continue
+
+        try:
+            with tracer.message_span(message_id, 'sqs conta_criada', conta_id=conta_id):
+                # Enviar notificação SNS
+                if topic_arn:
+                    mensagem = f"Nova conta criada: {conta.descricao} - R${conta.valor} - Vencimento: {conta.vencimento}{descrever_fornecedor(conta.fornecedor.nome if conta.fornecedor else None)}"
+                    publish_sns_message(topic_arn, mensagem, "Nova Conta a Pagar")
+
+            logger.info("Processamento pós-criação concluído para conta {}", conta_id)
+        except Exception as e:
+            logger.error(f"Erro ao notificar criação da conta {conta_id}: {e}")
+            falhas.append(message_id)
+
+    return falhas
+
+def processar_verificacao_vencimentos(servico_conta, session, mensagens: List[Mensagem]) -> List[str]:
+    """Verifica e notifica sobre contas vencendo (uma única vez por lote)"""
     # Atualizar status de contas atrasadas
     contas_atrasadas = servico_conta.atualizar_status_atrasadas()
-    
+
     # Buscar contas vencendo nos próximos 3 dias
     contas_vencendo = servico_conta.listar_contas_vencendo(dias=3)
-    
+
     if contas_vencendo:
         topic_arn = os.getenv('SNS_VENCIMENTOS_TOPIC')
         if topic_arn:
             mensagem = f"Atenção! {len(contas_vencendo)} contas vencem nos próximos 3 dias"
             publish_sns_message(topic_arn, mensagem, "Alerta de Vencimentos")
-    
+
     logger.info(f"Verificação de vencimentos: {contas_atrasadas} atrasadas, {len(contas_vencendo)} vencendo")
+    return []
 
-def processar_pagamento(servico_conta, message_body):
-    """Processa marcação de conta como paga"""
-    conta_id = message_body.get('conta_id')
-    sucesso = servico_conta.marcar_como_paga(conta_id)
-    
-    if sucesso:
-        # Notificar pagamento
-        topic_arn = os.getenv('SNS_PAGAMENTO_TOPIC')
-        if topic_arn:
-            conta = servico_conta.buscar_conta(conta_id)
-            mensagem = f"Conta paga: {conta.descricao} - R${conta.valor}"
-            publish_sns_message(topic_arn, mensagem, "Conta Paga")
-        
-        logger.info(f"Pagamento processado para conta {conta_id}")
-    else:
-        logger.error(f"Falha ao processar pagamento da conta {conta_id}")
+def _nomes_para_notificacao(servico_conta, pagas: List) -> Dict[int, str]:
+    """Nomes dos fornecedores das contas pagas; sem eles a notificação sai sem o nome"""
+    if not pagas:
+        return {}
+    try:
+        return servico_conta.nomes_fornecedores(paga.fornecedor_id for paga in pagas)
+    except Exception as e:
+        logger.error(f"Erro ao buscar fornecedores para notificação: {e}")
+        return {}
+
+def processar_pagamentos(servico_conta, session, mensagens: List[Mensagem]) -> List[str]:
+    """
+    Marca contas como pagas numa única transação, isolando cada mensagem num savepoint
+
+    Cada pagamento é um único UPDATE ... RETURNING; contas já pagas (reentregas)
+    não voltam no RETURNING e não geram nova notificação. Por isso uma falha
+    ao notificar só é registrada no log: devolver a mensagem à fila não a
+    notificaria de novo.
+    """
+    falhas = []
+    pagas = []
+
+    with unidade_de_trabalho(session):
+        for message_id, message_body in mensagens:
+            conta_id = message_body.get('conta_id')
+            try:
+                with session.begin_nested():
+                    paga = servico_conta.marcar_como_paga(conta_id)
+            except Exception as e:
+                logger.error(f"Erro ao processar pagamento da conta {conta_id}: {e}")
+                falhas.append(message_id)
+                continue
+
+            if paga:
+                pagas.append((message_id, conta_id, paga))
+
+    # Notificar pagamentos após o commit
+    topic_arn = os.getenv('SNS_PAGAMENTO_TOPIC')
+    nomes = _nomes_para_notificacao(servico_conta, [paga for _, _, paga in pagas]) if topic_arn else {}
+
+    for message_id, conta_id, paga in pagas:
+        try:
+            with tracer.message_span(message_id, 'sqs marcar_como_paga', conta_id=conta_id):
+                if topic_arn:
+                    mensagem = f"Conta paga: {paga.descricao} - R${paga.valor}{descrever_fornecedor(nomes.get(paga.fornecedor_id))}"
+                    publish_sns_message(topic_arn, mensagem, "Conta Paga")
+
+            logger.info("Pagamento processado para conta {}", conta_id)
+        except Exception as e:
+            logger.error(f"Erro ao notificar pagamento da conta {conta_id} (pagamento confirmado): {e}")
+
+    return falhas
+
+def processar_pagamentos_lote(servico_conta, session, mensagens: List[Mensagem]) -> List[str]:
+    """
+    Paga, com um único UPDATE por mensagem, as contas informadas em
+    'conta_ids' e/ou todas as contas em aberto de 'fornecedor_id'
+
+    Como em processar_pagamentos, falhas ao notificar não devolvem a
+    mensagem à fila.
+    """
+    falhas = []
+    lotes = []
+
+    with unidade_de_trabalho(session):
+        for message_id, message_body in mensagens:
+            try:
+                with session.begin_nested():
+                    pagas = servico_conta.pagar_contas(
+                        conta_ids=message_body.get('conta_ids'),
+                        fornecedor_id=message_body.get('fornecedor_id')
+                    )
+            except Exception as e:
+                logger.error(f"Erro ao processar pagamento em lote da mensagem {message_id}: {e}")
+                falhas.append(message_id)
+                continue
+
+            if pagas:
+                lotes.append((message_id, pagas))
+
+    # Uma notificação por lote, após o commit
+    topic_arn = os.getenv('SNS_PAGAMENTO_TOPIC')
+    nomes = _nomes_para_notificacao(servico_conta, [paga for _, pagas in lotes for paga in pagas]) if topic_arn else {}
+
+    for message_id, pagas in lotes:
+        try:
+            with tracer.message_span(message_id, 'sqs marcar_como_paga_lote', contas=len(pagas)):
+                if topic_arn:
+                    publish_sns_message(topic_arn, resumir_pagamentos(pagas, nomes), "Contas Pagas")
+
+            logger.info("Pagamento em lote processado: {} contas", len(pagas))
+        except Exception as e:
+            logger.error(f"Erro ao notificar pagamento em lote da mensagem {message_id} (pagamento confirmado): {e}")
+
+    return falhas
+
+def processar_drenagem_outbox(servico_conta, session, mensagens: List[Mensagem]) -> List[str]:
+    """Publica as mensagens pendentes da outbox (uma única drenagem por lote)"""
+    RelayOutbox(OutboxRepository(session)).drenar(tempo_limite=float(os.getenv('OUTBOX_TEMPO_LIMITE', '30')))
+    return []
+
+# Processadores por ação: recebem todas as mensagens da ação no lote
+PROCESSADORES = {
+    'conta_criada': processar_contas_criadas,
+    'verificar_vencimentos': processar_verificacao_vencimentos,
+    'marcar_como_paga': processar_pagamentos,
+    'marcar_como_paga_lote': processar_pagamentos_lote,
+    'drenar_outbox': processar_drenagem_outbox,
+}
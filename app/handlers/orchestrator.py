@@ -7,28 +7,16 @@ Este arquivo contém toda a lógica de orquestração e roteamento de eventos.
 import json
 import os
 import importlib
+import importlib.util
+import time
 from typing import Dict, Any, Optional
 from app.utils.logger import get_logger
+from app.utils.metrics import metrics
+from app.utils.tracing import tracer
+from app.handlers.router import Router, ResultadoRota, import_handler
 
 logger = get_logger(__name__)
 
-def import_handler(handler_name: str) -> Optional[callable]:
-    """
-    Importa um handler dinamicamente se ele existir
-    
-    Args:
-        handler_name: Nome do handler (ex: 'handler_create_conta')
-    
-    Returns:
-        Função lambda_handler do módulo ou None se não encontrar
-    """
-    try:
-        module = importlib.import_module(f'app.handlers.{handler_name}')
-        return getattr(module, 'lambda_handler')
-    except (ImportError, AttributeError) as e:
-        logger.warning(f"Handler {handler_name} não encontrado: {e}")
-        return None
-
 def handle_event(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Orquestrador principal que roteia eventos para handlers específicos
@@ -43,20 +31,21 @@ def handle_event(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
         # Identificar tipo de evento e rotear para handler específico
         event_type = identify_event_type(event)
-        logger.info(f"🎯 Tipo de evento identificado: {event_type}")
+        logger.info("🎯 Tipo de evento identificado: {}", event_type)
         
-        if event_type == "api_gateway":
-            return handle_api_gateway(event, context)
-        elif event_type == "sqs":
-            return handle_sqs(event, context)
-        elif event_type == "sns":
-            return handle_sns(event, context)
-        elif event_type == "cloudwatch_event":
-            return handle_cloudwatch_event(event, context)
-        elif event_type == "test":
-            return handle_test_event(event, context)
-        else:
-            return handle_unknown_event(event, context)
+        with metrics.timer('event', EventType=event_type):
+            if event_type == "api_gateway":
+                return handle_api_gateway(event, context)
+            elif event_type == "sqs":
+                return handle_sqs(event, context)
+            elif event_type == "sns":
+                return handle_sns(event, context)
+            elif event_type == "cloudwatch_event":
+                return handle_cloudwatch_event(event, context)
+            elif event_type == "test":
+                return handle_test_event(event, context)
+            else:
+                return handle_unknown_event(event, context)
             
     except Exception as e:
         logger.error(f"Erro no orquestrador: {str(e)}", exc_info=True)
@@ -89,11 +78,12 @@ def identify_event_type(event: Dict[str, Any]) -> str:
     # SQS/SNS
     if 'Records' in event and event['Records']:
         first_record = event['Records'][0]
-        if 'eventSource' in first_record:
-            if first_record['eventSource'] == 'aws:sqs':
-                return "sqs"
-            elif first_record['eventSource'] == 'aws:sns':
-                return "sns"
+        # SQS usa "eventSource"; notificações SNS entregues à Lambda usam "EventSource"
+        event_source = first_record.get('eventSource') or first_record.get('EventSource')
+        if event_source == 'aws:sqs':
+            return "sqs"
+        elif event_source == 'aws:sns':
+            return "sns"
     
     # CloudWatch Events
     if 'source' in event and event.get('source') == 'aws.events':
@@ -116,124 +106,91 @@ def handle_api_gateway(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         resource = event.get('resource', '')
         path = event.get('path', '')
         
-        logger.info(f"📋 Method: {method}, Resource: {resource}, Path: {path}")
+        logger.info("📋 Method: {}, Resource: {}, Path: {}", method, resource, path)
         
-        # Roteamento para recursos específicos
-        if '/contas' in resource or '/contas' in path:
-            return route_conta_operations(event, context, method)
-        elif '/fornecedores' in resource or '/fornecedores' in path:
-            return route_fornecedor_operations(event, context, method)
-        elif '/health' in resource or '/health' in path:
-            return handle_health_check(event, context)
-        else:
+        # Roteamento pela tabela de rotas (caminho concreto e, em seguida, o template do recurso)
+        resultado = ROUTER.match(method, path or resource)
+        if resultado.rota is None and resource and resource != path:
+            resultado_recurso = ROUTER.match(method, resource)
+            if resultado_recurso.rota is not None or not resultado.allowed_methods:
+                resultado = resultado_recurso
+        
+        if resultado.rota is not None:
+            return dispatch_route(event, context, method, resultado)
+        
+        if resultado.allowed_methods:
             return {
-                'statusCode': 404,
+                'statusCode': 405,
                 'headers': {'Content-Type': 'application/json'},
                 'body': json.dumps({
-                    'error': 'Rota não encontrada',
-                    'resource': resource,
-                    'method': method,
-                    'available_routes': ['/contas', '/fornecedores', '/health']
+                    'error': f'Método {method} não permitido para {path or resource}',
+                    'allowed_methods': resultado.allowed_methods
                 })
             }
         
-    except Exception as e:
-        logger.error(f"Erro no handler do API Gateway: {str(e)}")
         return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'error': 'Erro interno do servidor'})
-        }
-
-def route_conta_operations(event: Dict[str, Any], context: Any, method: str) -> Dict[str, Any]:
-    """
-    Roteia operações relacionadas a contas
-    """
-    logger.info(f"💰 Roteando operação de conta: {method}")
-    
-    handler_map = {
-        'POST': 'handler_create_conta',
-        'GET': 'handler_list_contas',
-        'PUT': 'handler_update_conta',
-        'DELETE': 'handler_delete_conta'
-    }
-    
-    if method not in handler_map:
-        return {
-            'statusCode': 405,
+            'statusCode': 404,
             'headers': {'Content-Type': 'application/json'},
             'body': json.dumps({
-                'error': f'Método {method} não permitido para /contas',
-                'allowed_methods': list(handler_map.keys())
+                'error': 'Rota não encontrada',
+                'resource': resource,
+                'method': method,
+                'available_routes': ROUTER.recursos()
             })
         }
-    
-    handler_name = handler_map[method]
-    handler = import_handler(handler_name)
-    
-    if handler:
-        try:
-            return handler(event, context)
-        except Exception as e:
-            logger.error(f"Erro no handler {handler_name}: {e}")
-            return {
-                'statusCode': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': 'Erro interno do servidor'})
-            }
-    else:
+        
+    except Exception as e:
+        logger.error(f"Erro no handler do API Gateway: {str(e)}")
         return {
-            'statusCode': 501,
+            'statusCode': 500,
             'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({
-                'message': f'Operação {method} para contas em desenvolvimento',
-                'action': f'conta_{method.lower()}'
-            })
+            'body': json.dumps({'error': 'Erro interno do servidor'})
         }
 
-def route_fornecedor_operations(event: Dict[str, Any], context: Any, method: str) -> Dict[str, Any]:
+def dispatch_route(event: Dict[str, Any], context: Any, method: str, resultado: ResultadoRota) -> Dict[str, Any]:
     """
-    Roteia operações relacionadas a fornecedores
+    Executa o handler da rota encontrada, repassando os parâmetros do caminho
+
+    A rota abre o span de borda do trace, continuando o traceparent recebido
+    no cabeçalho quando houver.
     """
-    logger.info(f"🏢 Roteando operação de fornecedor: {method}")
+    rota = resultado.rota
+    logger.info("🧭 Rota {} {} -> {}", rota.method, rota.template, rota.handler)
     
-    handler_map = {
-        'POST': 'handler_create_fornecedor',
-        'GET': 'handler_list_fornecedores',
-        'PUT': 'handler_update_fornecedor',
-        'DELETE': 'handler_delete_fornecedor'
-    }
-    
-    if method not in handler_map:
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({
-                'error': f'Método {method} não permitido para /fornecedores',
-                'allowed_methods': list(handler_map.keys())
-            })
+    if resultado.path_parameters:
+        event = {
+            **event,
+            'pathParameters': {**(event.get('pathParameters') or {}), **resultado.path_parameters}
         }
     
-    handler_name = handler_map[method]
-    handler = import_handler(handler_name)
+    handler = ROUTER.resolve(rota)
     
     if handler:
-        try:
-            return handler(event, context)
-        except Exception as e:
-            logger.error(f"Erro no handler {handler_name}: {e}")
-            return {
-                'statusCode': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': 'Erro interno do servidor'})
-            }
+        nome_rota = f'{rota.method} {rota.template}'
+        inicio = time.perf_counter()
+        with tracer.span(f'api {nome_rota}', tracer.extract(event.get('headers'))):
+            try:
+                response = handler(event, context)
+            except Exception as e:
+                logger.error(f"Erro no handler {rota.handler}: {e}")
+                response = {
+                    'statusCode': 500,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({'error': 'Erro interno do servidor'})
+                }
+            if isinstance(response, dict):
+                tracer.annotate(status=response.get('statusCode'))
+        metrics.observe('route', (time.perf_counter() - inicio) * 1000, Route=nome_rota)
+        if isinstance(response, dict) and int(response.get('statusCode', 200)) >= 500:
+            metrics.incr('route.5xx', Route=nome_rota)
+        return response
     else:
         return {
             'statusCode': 501,
             'headers': {'Content-Type': 'application/json'},
             'body': json.dumps({
-                'message': f'Operação {method} para fornecedores em desenvolvimento',
-                'action': f'fornecedor_{method.lower()}'
+                'message': f'Operação {method} para {rota.recurso} em desenvolvimento',
+                'action': rota.handler
             })
         }
 
@@ -252,7 +209,9 @@ def handle_health_check(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'database': check_database_health(),
                 'handlers': check_handlers_health(),
                 'aws_services': check_aws_services_health()
-            }
+            },
+            # Totais do processo desde o cold start (latências em ms)
+            'metrics': metrics.snapshot()
         }
         
         return {
@@ -329,6 +288,7 @@ def handle_cloudwatch_event(event: Dict[str, Any], context: Any) -> Dict[str, An
             # Fallback para SQS se handler não existir ou falhar
             logger.warning("Handler handler_verificar_vencimentos não encontrado, enviando para SQS")
             from app.utils.aws_config import send_sqs_message
+            from app.utils.serialization import dumps
             
             queue_url = os.getenv('SQS_PROCESSAMENTO_URL')
             if queue_url:
@@ -337,13 +297,18 @@ def handle_cloudwatch_event(event: Dict[str, Any], context: Any) -> Dict[str, An
                     'timestamp': event.get('time'),
                     'source': 'cloudwatch_event'
                 }
-                send_sqs_message(queue_url, json.dumps(message))
+                # Envio síncrono: uma falha aqui vira erro 500 do agendamento
+                send_sqs_message(queue_url, dumps(message))
                 logger.info("Mensagem enviada para SQS")
             
             return {
                 'statusCode': 200,
                 'body': json.dumps({'message': 'Evento enviado para processamento assíncrono'})
             }
+        elif 'drenar-outbox' in detail.get('rule-name', ''):
+            # Publicar no SQS as mensagens gravadas na outbox
+            from app.handlers.handler_drenar_outbox import lambda_handler as drenar_outbox_handler
+            return drenar_outbox_handler(event, context)
         else:
             logger.info(f"Evento CloudWatch genérico: {detail_type}")
             return {
@@ -432,9 +397,10 @@ def check_database_health() -> str:
         return "ERROR"
 
 def check_handlers_health() -> str:
-    """Verifica saúde dos handlers"""
+    """Verifica saúde dos handlers (sem importá-los, para não pesar no health check)"""
     try:
-        from app.handlers import handler_create_conta
+        if importlib.util.find_spec('app.handlers.handler_create_conta') is None:
+            return "ERROR"
         return "OK"
     except Exception:
         return "ERROR"
@@ -446,3 +412,20 @@ def check_aws_services_health() -> str:
         return "OK"
     except Exception:
         return "ERROR"
+
+# Tabela de rotas do API Gateway (compilada uma única vez, na carga do módulo)
+ROUTER = Router()
+ROUTER.add('GET', '/contas', 'handler_list_contas')
+ROUTER.add('POST', '/contas', 'handler_create_conta')
+ROUTER.add('POST', '/contas/lote', 'handler_create_contas_lote')
+ROUTER.add('POST', '/contas/pagar', 'handler_pagar_contas_lote')
+ROUTER.add('GET', '/contas/{id}', 'handler_get_conta')
+ROUTER.add('PUT', '/contas/{id}', 'handler_update_conta')
+ROUTER.add('DELETE', '/contas/{id}', 'handler_delete_conta')
+ROUTER.add('POST', '/contas/{id}/pagar', 'handler_pagar_conta')
+ROUTER.add('GET', '/fornecedores', 'handler_list_fornecedores')
+ROUTER.add('POST', '/fornecedores', 'handler_create_fornecedor')
+ROUTER.add('GET', '/fornecedores/{id}', 'handler_get_fornecedor')
+ROUTER.add('PUT', '/fornecedores/{id}', 'handler_update_fornecedor')
+ROUTER.add('DELETE', '/fornecedores/{id}', 'handler_delete_fornecedor')
+ROUTER.add('GET', '/health', handle_health_check)
@@ -0,0 +1,197 @@
+"""
+Roteador declarativo do API Gateway
+
+As rotas (método + template de caminho, ex: "/contas/{id}/pagar") são
+compiladas uma única vez. Rotas estáticas são resolvidas por dicionário e
+rotas com parâmetros por comparação apenas dos segmentos literais do
+template, indexadas pela quantidade de segmentos do caminho. O resultado de
+cada (método, caminho) fica num cache limitado (ROUTER_CACHE_MAX), então
+caminhos repetidos custam uma consulta a dicionário. Os handlers são importados sob
+demanda e ficam em cache, inclusive os inexistentes (cache negativo), para
+que uma rota sem implementação não repita o import a cada requisição.
+"""
+
+import importlib
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_handlers: Dict[str, Optional[Callable]] = {}
+_handlers_lock = threading.Lock()
+
+def import_handler(handler_name: str) -> Optional[Callable]:
+    """
+    Importa um handler dinamicamente se ele existir (com cache, inclusive negativo)
+
+    Args:
+        handler_name: Nome do handler (ex: 'handler_create_conta')
+
+    Returns:
+        Função lambda_handler do módulo ou None se não encontrar
+    """
+    try:
+        return _handlers[handler_name]
+    except KeyError:
+        pass
+
+    with _handlers_lock:
+        if handler_name not in _handlers:
+            try:
+                module = importlib.import_module(f'app.handlers.{handler_name}')
+                _handlers[handler_name] = getattr(module, 'lambda_handler')
+            except (ImportError, AttributeError) as e:
+                logger.warning(f"Handler {handler_name} não encontrado: {e}")
+                _handlers[handler_name] = None
+        return _handlers[handler_name]
+
+def clear_handler_cache():
+    """Descarta os handlers resolvidos (útil em testes)"""
+    with _handlers_lock:
+        _handlers.clear()
+
+def normalizar_caminho(path: str) -> str:
+    """Remove a barra final (exceto na raiz)"""
+    if len(path) > 1 and path.endswith('/'):
+        return path.rstrip('/') or '/'
+    return path or '/'
+
+@dataclass(frozen=True)
+class Rota:
+    """Rota compilada: método, template e handler (nome do módulo ou função)"""
+    method: str
+    template: str
+    handler: Union[str, Callable]
+    recurso: str
+    # Segmentos do template; parâmetros aparecem como '{nome}'
+    segmentos: Tuple[str, ...] = field(default=(), compare=False)
+
+    @property
+    def estatica(self) -> bool:
+        return not any(segmento.startswith('{') for segmento in self.segmentos)
+
+class ResultadoRota(NamedTuple):
+    """Resultado do roteamento: rota encontrada ou métodos permitidos para o caminho"""
+    rota: Optional[Rota] = None
+    path_parameters: Dict[str, str] = {}
+    allowed_methods: List[str] = []
+
+_NAO_ENCONTRADA = ResultadoRota()
+
+# Template com parâmetros compilado: (posição, literal) e (posição, nome do parâmetro)
+Compilado = Tuple[Tuple[Tuple[int, str], ...], Tuple[Tuple[int, str], ...]]
+
+def compilar(segmentos: Tuple[str, ...]) -> Compilado:
+    """Separa os segmentos do template em literais e parâmetros (o recurso já vem da chave do índice)"""
+    literais = tuple((indice, segmento) for indice, segmento in enumerate(segmentos)
+                     if indice > 1 and not segmento.startswith('{'))
+    parametros = tuple((indice, segmento[1:-1]) for indice, segmento in enumerate(segmentos) if segmento.startswith('{'))
+    return literais, parametros
+
+class Router:
+    """Tabela de rotas do API Gateway"""
+
+    def __init__(self, cache_max: Optional[int] = None):
+        # caminho -> método -> resultado pré-montado
+        self._estaticas: Dict[str, Dict[str, ResultadoRota]] = {}
+        # (quantidade de segmentos, recurso) -> [(segmentos do template, compilado, método -> rota)]
+        self._dinamicas: Dict[Tuple[int, str], List[Tuple[Tuple[str, ...], Compilado, Dict[str, Rota]]]] = {}
+        # (método, caminho) -> resultado; esvaziado ao encher e a cada add()
+        self._resultados: Dict[Tuple[str, str], ResultadoRota] = {}
+        self.cache_max = int(os.getenv('ROUTER_CACHE_MAX', '1024')) if cache_max is None else cache_max
+
+    def add(self, method: str, template: str, handler: Union[str, Callable]) -> Rota:
+        """Registra uma rota; parâmetros no template usam a sintaxe {nome}"""
+        template = normalizar_caminho(template)
+        segmentos = tuple(template.split('/'))
+        rota = Rota(method.upper(), template, handler, segmentos[1] if len(segmentos) > 1 else '', segmentos)
+        self.limpar_cache()
+
+        if rota.estatica:
+            self._estaticas.setdefault(template, {})[rota.method] = ResultadoRota(rota)
+            return rota
+
+        templates = self._dinamicas.setdefault((len(segmentos), rota.recurso), [])
+        for existentes, _, por_metodo in templates:
+            if existentes == segmentos:
+                por_metodo[rota.method] = rota
+                break
+        else:
+            templates.append((segmentos, compilar(segmentos), {rota.method: rota}))
+        return rota
+
+    def match(self, method: str, path: str) -> ResultadoRota:
+        """
+        Encontra a rota para método e caminho
+
+        Rotas estáticas têm precedência sobre as parametrizadas (ex:
+        POST /contas/lote antes de /contas/{id}). Se o caminho existir mas o
+        método não, retorna os métodos permitidos (405). O resultado vem do
+        cache quando o mesmo (método, caminho) já foi roteado; path_parameters
+        é compartilhado entre as chamadas e não deve ser alterado.
+        """
+        chave = (method, path)
+        resultado = self._resultados.get(chave)
+        if resultado is None:
+            resultado = self._match(method, path)
+            if self.cache_max > 0:
+                if len(self._resultados) >= self.cache_max:
+                    self._resultados.clear()
+                self._resultados[chave] = resultado
+        return resultado
+
+    def limpar_cache(self):
+        """Descarta os resultados de roteamento em cache"""
+        self._resultados.clear()
+
+    def _match(self, method: str, path: str) -> ResultadoRota:
+        if path.endswith('/'):
+            path = normalizar_caminho(path)
+        method = method.upper()
+        permitidos: List[str] = []
+
+        por_metodo = self._estaticas.get(path)
+        if por_metodo:
+            resultado = por_metodo.get(method)
+            if resultado:
+                return resultado
+            permitidos.extend(por_metodo)
+
+        partes = path.split('/')
+        templates = self._dinamicas.get((len(partes), partes[1] if len(partes) > 1 else ''))
+        if templates:
+            for _, (literais, parametros), rotas in templates:
+                for indice, literal in literais:
+                    if partes[indice] != literal:
+                        break
+                else:
+                    valores = {}
+                    for indice, nome in parametros:
+                        valor = partes[indice]
+                        if not valor:
+                            break
+                        valores[nome] = valor
+                    else:
+                        rota = rotas.get(method)
+                        if rota:
+                            return ResultadoRota(rota, valores)
+                        permitidos.extend(rotas)
+
+        if not permitidos:
+            return _NAO_ENCONTRADA
+        return ResultadoRota(allowed_methods=sorted(set(permitidos)))
+
+    def resolve(self, rota: Rota) -> Optional[Callable]:
+        """Retorna a função do handler da rota (importada e mantida em cache)"""
+        if callable(rota.handler):
+            return rota.handler
+        return import_handler(rota.handler)
+
+    def recursos(self) -> List[str]:
+        """Caminhos base disponíveis (para a resposta 404)"""
+        recursos = {path.strip('/').split('/')[0] for path in self._estaticas}
+        recursos.update(recurso for _, recurso in self._dinamicas)
+        return sorted(f'/{recurso}' for recurso in recursos)
@@ -6,12 +6,19 @@ A orquestração fica nos handlers específicos.
 """
 
 import json
+import os
 from typing import Dict, Any
-from app.utils.logger import get_logger
+from app.utils.logger import get_logger, log_payload, flush_logs
 from app.handlers.orchestrator import handle_event
+from app.utils.aws_config import warm_up_aws_clients
+from app.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
+# Aquecimento opcional dos clientes AWS na inicialização do container
+# (serviços em AWS_WARM_UP_SERVICES, ex: "sqs,sns")
+warm_up_aws_clients()
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Ponto de entrada principal do sistema
@@ -25,7 +32,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     try:
         logger.info("🚀 Iniciando sistema de Contas a Pagar")
-        logger.info(f"Evento recebido: {json.dumps(event, default=str)}")
+        # Payload limitado/amostrado e serializado só se o nível estiver ativo
+        log_payload(logger, "Evento recebido", event, level=os.getenv('LOG_EVENT_LEVEL', 'INFO'))
         
         # Delegar para o orquestrador nos handlers
         return handle_event(event, context)
@@ -39,6 +47,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'message': str(e)
             })
         }
+    finally:
+        # Métricas da invocação em EMF (uma vez por invocação, antes do freeze)
+        try:
+            metrics.flush()
+        except Exception as e:
+            logger.error(f"Erro ao emitir métricas: {str(e)}")
+        # Com LOG_ENQUEUE, garante que os logs sejam gravados antes do freeze
+        flush_logs()
 
 # Para execução local/teste
 if __name__ == "__main__":
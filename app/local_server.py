@@ -0,0 +1,375 @@
+"""
+Servidor HTTP local para testes de carga do código real dos handlers
+
+Converte requisições HTTP em eventos de proxy do API Gateway e os entrega ao
+lambda_handler (que delega para orchestrator.handle_event), com várias
+requisições em paralelo sobre o mesmo db_config já aquecido, o mesmo pool e
+o mesmo logger. Assim ferramentas de carga comuns (wrk, hey, ab, k6)
+exercitam sessões concorrentes como numa Lambda com concorrência N.
+
+- ThreadingHTTPServer: uma thread por conexão, com no máximo --concurrency
+  invocações simultâneas do handler; --processes N faz pre-fork de N
+  processos aceitando no mesmo socket (cada um com o próprio pool)
+- ASGI: `asgi_app` para rodar sob uvicorn/hypercorn (o handler é síncrono e
+  roda num pool de threads do tamanho da concorrência)
+- --broker: usa o InMemoryBroker como backend de SQS/SNS e entrega as
+  mensagens em segundo plano (inclusive a regra drenar-outbox)
+
+GET /_local/stats retorna invocações, pool de conexões e filas do broker.
+
+Uso:
+    python -m app.local_server --port 8080 --concurrency 16 --migrate
+    python -m app.local_server --processes 4 --concurrency 8
+    DATABASE_URL=sqlite:///local.db python -m app.local_server --migrate --broker
+    uvicorn app.local_server:asgi_app --workers 4
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app.utils.local_broker import LocalContext
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Handler = Callable[[Dict[str, Any], Any], Any]
+
+STATS_PATH = '/_local/stats'
+
+def build_event(method: str, path: str, query_string: str, headers: Iterable[Tuple[str, str]],
+                body: bytes, source_ip: str = '127.0.0.1') -> Dict[str, Any]:
+    """Monta um evento de proxy do API Gateway (REST) para a requisição"""
+    multi_headers: Dict[str, List[str]] = {}
+    for name, value in headers:
+        multi_headers.setdefault(name, []).append(value)
+    multi_query = parse_qs(query_string, keep_blank_values=True)
+
+    try:
+        texto, base64_encoded = body.decode('utf-8'), False
+    except UnicodeDecodeError:
+        texto, base64_encoded = base64.b64encode(body).decode('ascii'), True
+
+    return {
+        'resource': path,
+        'path': path,
+        'httpMethod': method.upper(),
+        'headers': {name: values[-1] for name, values in multi_headers.items()} or None,
+        'multiValueHeaders': multi_headers or None,
+        'queryStringParameters': {name: values[-1] for name, values in multi_query.items()} or None,
+        'multiValueQueryStringParameters': multi_query or None,
+        'pathParameters': None,
+        'body': texto if body else None,
+        'isBase64Encoded': base64_encoded,
+        'requestContext': {
+            'requestId': str(uuid.uuid4()),
+            'httpMethod': method.upper(),
+            'path': path,
+            'stage': 'local',
+            'requestTimeEpoch': int(time.time() * 1000),
+            'identity': {'sourceIp': source_ip},
+        },
+    }
+
+def to_http_response(result: Any) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Converte a resposta do handler (formato de proxy) em status, cabeçalhos e corpo"""
+    if not isinstance(result, dict) or 'statusCode' not in result:
+        result = {'statusCode': 200, 'body': result}
+
+    headers = [(name, str(value)) for name, value in (result.get('headers') or {}).items()]
+    for name, values in (result.get('multiValueHeaders') or {}).items():
+        headers.extend((name, str(value)) for value in values)
+    if not any(name.lower() == 'content-type' for name, _ in headers):
+        headers.append(('Content-Type', 'application/json'))
+
+    body = result.get('body')
+    if body is None:
+        payload = b''
+    elif result.get('isBase64Encoded'):
+        payload = base64.b64decode(body)
+    elif isinstance(body, (bytes, bytearray)):
+        payload = bytes(body)
+    elif isinstance(body, str):
+        payload = body.encode('utf-8')
+    else:
+        payload = json.dumps(body, default=str).encode('utf-8')
+    return int(result['statusCode']), headers, payload
+
+class LocalInvoker:
+    """
+    Invoca o handler com no máximo `concurrency` execuções simultâneas
+
+    Faz o papel da concorrência reservada da Lambda: requisições acima do
+    limite esperam por um slot livre.
+    """
+
+    def __init__(self, handler: Optional[Handler] = None, concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, function_name: str = 'contas-a-pagar-local'):
+        self.concurrency = concurrency or int(os.getenv('LOCAL_CONCURRENCY', '8'))
+        self.timeout = timeout or float(os.getenv('LOCAL_TIMEOUT', '30'))
+        self.function_name = function_name
+        self._handler = handler
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self.invocations = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def handler(self) -> Handler:
+        if self._handler is None:
+            from app.lambda_handler import lambda_handler
+            self._handler = lambda_handler
+        return self._handler
+
+    def __call__(self, event: Dict[str, Any]) -> Any:
+        with self._slots:
+            with self._lock:
+                self.invocations += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                result = self.handler(event, LocalContext(self.timeout, self.function_name))
+            except Exception as e:
+                logger.error(f"Erro não tratado no handler: {str(e)}")
+                result = {'statusCode': 502, 'body': json.dumps({'error': 'Erro não tratado no handler', 'message': str(e)})}
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+            if isinstance(result, dict) and int(result.get('statusCode', 200)) >= 500:
+                with self._lock:
+                    self.errors += 1
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'invocations': self.invocations,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+            }
+
+def local_stats(invoker: LocalInvoker) -> dict:
+    """Estado do servidor: invocações, pool de conexões e broker em memória (se ativo)"""
+    from app.utils.aws_config import client_registry, get_messaging_backend
+    from app.utils.database import db_config
+
+    stats = {'pid': os.getpid(), 'invoker': invoker.stats(), 'database': db_config.pool_status()}
+    backend = get_messaging_backend()
+    if backend is not client_registry and hasattr(backend, 'stats'):
+        stats['broker'] = backend.stats()
+    return stats
+
+class LambdaRequestHandler(BaseHTTPRequestHandler):
+    """Traduz cada requisição HTTP em um evento do API Gateway"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ContasAPagarLocal/1.0'
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        parts = urlsplit(self.path)
+        path = unquote(parts.path) or '/'
+
+        if path == STATS_PATH:
+            result = {'statusCode': 200, 'body': json.dumps(local_stats(self.server.invoker))}
+        else:
+            event = build_event(self.command, path, parts.query, self.headers.items(), body, self.client_address[0])
+            result = self.server.invoker(event)
+
+        status, headers, payload = to_http_response(result)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+    def log_message(self, format, *args):
+        # O access log padrão vai para stderr e pesa na carga; fica no nível DEBUG
+        logger.debug("{} - {}", self.client_address[0], format % args)
+
+class LocalServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer que entrega as requisições ao LocalInvoker"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], invoker: Optional[LocalInvoker] = None):
+        super().__init__(address, LambdaRequestHandler)
+        self.invoker = invoker or LocalInvoker()
+
+class ASGIAdapter:
+    """Aplicação ASGI sobre o mesmo LocalInvoker (o handler síncrono roda num pool de threads)"""
+
+    def __init__(self, invoker: Optional[LocalInvoker] = None):
+        self._invoker = invoker
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def invoker(self) -> LocalInvoker:
+        if self._invoker is None:
+            self._invoker = LocalInvoker()
+        return self._invoker
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.invoker.concurrency, thread_name_prefix='lambda')
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        loop = asyncio.get_running_loop()
+        if scope['path'] == STATS_PATH:
+            result = {'statusCode': 200, 'body': json.dumps(local_stats(self.invoker))}
+        else:
+            headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope.get('headers', [])]
+            client = scope.get('client') or ('127.0.0.1', 0)
+            event = build_event(scope['method'], scope['path'], scope.get('query_string', b'').decode('latin-1'),
+                                headers, body, client[0])
+            result = await loop.run_in_executor(self.executor, self.invoker, event)
+
+        status, headers, payload = to_http_response(result)
+        headers.append(('Content-Length', str(len(payload))))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.get_running_loop().run_in_executor(None, warm_up)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+# Aplicação para servidores ASGI (ex: uvicorn app.local_server:asgi_app)
+asgi_app = ASGIAdapter()
+
+def warm_up(migrate: bool = False):
+    """Aquece o que as invocações compartilham: handler, engine do banco e clientes AWS"""
+    from app.lambda_handler import lambda_handler  # noqa: F401 (importa orquestrador e aquece clientes AWS)
+    from app.utils.database import db_config
+
+    if migrate:
+        db_config.create_tables()
+    with db_config.engine.connect():
+        pass
+    logger.info("Servidor local aquecido (pool: {})", db_config.pool_status())
+
+def start_broker(relay_interval: float = 1.0, poll_interval: float = 0.01) -> Tuple[Any, threading.Event]:
+    """Ativa o InMemoryBroker e entrega as mensagens numa thread em segundo plano"""
+    from app.utils.aws_config import set_messaging_backend
+    from app.utils.local_broker import InMemoryBroker
+
+    broker = InMemoryBroker()
+    broker.schedule('contas-a-pagar-drenar-outbox', relay_interval)
+    set_messaging_backend(broker)
+    parar = threading.Event()
+
+    def consumir():
+        while not parar.is_set():
+            try:
+                if not broker.deliver():
+                    parar.wait(poll_interval)
+            except Exception as e:
+                logger.error(f"Erro na entrega do broker local: {str(e)}")
+                parar.wait(poll_interval)
+
+    threading.Thread(target=consumir, name='local-broker', daemon=True).start()
+    return broker, parar
+
+def serve(host: str = '127.0.0.1', port: int = 8080, concurrency: Optional[int] = None, processes: int = 1,
+          migrate: bool = False, broker: bool = False, relay_interval: float = 1.0):
+    """Sobe o servidor HTTP local (bloqueia até Ctrl+C)"""
+    from app.utils.database import db_config
+
+    warm_up(migrate)
+    server = LocalServer((host, port), LocalInvoker(concurrency=concurrency))
+    parar_broker = None
+    children: List[int] = []
+
+    if processes > 1:
+        # Cada processo abre o próprio pool; conexões herdadas do pai não podem ser compartilhadas
+        db_config.dispose()
+        for _ in range(processes - 1):
+            pid = os.fork()
+            if pid == 0:
+                children = []
+                break
+            children.append(pid)
+    if broker:
+        _, parar_broker = start_broker(relay_interval)
+
+    logger.info("Servidor local em http://{}:{} (pid {}, concorrência {})", host, port, os.getpid(), server.invoker.concurrency)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if parar_broker is not None:
+            parar_broker.set()
+        server.server_close()
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        db_config.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('LOCAL_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('LOCAL_PORT', '8080')))
+    parser.add_argument('--concurrency', type=int, default=None, help='invocações simultâneas por processo (LOCAL_CONCURRENCY)')
+    parser.add_argument('--processes', type=int, default=1, help='processos (pre-fork) aceitando no mesmo socket')
+    parser.add_argument('--migrate', action='store_true', help='aplica as migrações antes de subir')
+    parser.add_argument('--broker', action='store_true', help='SQS/SNS em memória, com entrega em segundo plano')
+    parser.add_argument('--relay-interval', type=float, default=1.0, help='intervalo (s) da regra drenar-outbox com --broker')
+    args = parser.parse_args()
+
+    if args.broker and args.processes > 1:
+        parser.error('--broker usa filas em memória do processo; use com --processes 1')
+    serve(args.host, args.port, args.concurrency, args.processes, args.migrate, args.broker, args.relay_interval)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from .base import Base
 from .conta import Conta, Status
 from .fornecedor import Fornecedor
+from .outbox import OutboxMensagem
 
-__all__ = ['Base', 'Conta', 'Status', 'Fornecedor']
+__all__ = ['Base', 'Conta', 'Status', 'Fornecedor', 'OutboxMensagem']
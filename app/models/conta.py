@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from .base import Base
 import enum
 
@@ -9,9 +10,19 @@ class Status(enum.Enum):
 
 class Conta(Base):
     __tablename__ = "contas"
+    __table_args__ = (
+        # Listagens por status/período e atualização de atrasadas
+        Index('ix_contas_status_vencimento', 'status', 'vencimento', 'id'),
+        # Listagens por fornecedor
+        Index('ix_contas_fornecedor_vencimento', 'fornecedor_id', 'vencimento', 'id'),
+        # Paginação por (vencimento, id) sem filtros
+        Index('ix_contas_vencimento_id', 'vencimento', 'id'),
+    )
     id = Column(Integer, primary_key=True)
     descricao = Column(String)
     valor = Column(Float)
     vencimento = Column(Date)
     status = Column(Enum(Status))
     fornecedor_id = Column(Integer, ForeignKey("fornecedores.id"))
+    # Carregado sob demanda; listagens usam com_fornecedor=True no repositório
+    fornecedor = relationship("Fornecedor", lazy="select")
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from .base import Base
 
 class Fornecedor(Base):
     __tablename__ = "fornecedores"
+    __table_args__ = (
+        Index('ux_fornecedores_documento', 'documento', unique=True),
+    )
     id = Column(Integer, primary_key=True)
     nome = Column(String)
     documento = Column(String)  # CNPJ/CPF
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+from .base import Base
+
+class OutboxMensagem(Base):
+    """Mensagem a publicar, gravada na mesma transação da alteração que a originou"""
+    __tablename__ = "outbox"
+    id = Column(Integer, primary_key=True)
+    destino = Column(String, nullable=False)  # URL da fila SQS
+    corpo = Column(Text, nullable=False)
+    atributos = Column(Text, nullable=True)  # MessageAttributes em JSON (contexto de trace)
+    tentativas = Column(Integer, nullable=False, default=0)
+    criada_em = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,5 +1,9 @@
-from .interfaces import IRepositorioConta, IRepositorioFornecedor
-from .conta_repository import ContaRepository
+from .interfaces import IRepositorioConta, IRepositorioContaLeitura, IRepositorioFornecedor
+from .conta_repository import ContaPaga, ContaRepository
 from .fornecedor_repository import FornecedorRepository
+from .transacao import confirmar, unidade_de_trabalho
+from .cache import CacheLRU, FornecedorRepositoryCache, cache_fornecedores
+from .outbox import MensagemPendente, OutboxRepository
+from .leitura import ContaLeituraRepository, ContaRow, FornecedorLeituraRepository, FornecedorRow
 
-__all__ = ['IRepositorioConta', 'IRepositorioFornecedor', 'ContaRepository', 'FornecedorRepository']
+__all__ = ['IRepositorioConta', 'IRepositorioContaLeitura', 'IRepositorioFornecedor', 'ContaPaga', 'ContaRepository', 'FornecedorRepository', 'confirmar', 'unidade_de_trabalho', 'CacheLRU', 'FornecedorRepositoryCache', 'cache_fornecedores', 'ContaLeituraRepository', 'ContaRow', 'FornecedorLeituraRepository', 'FornecedorRow', 'MensagemPendente', 'OutboxRepository']
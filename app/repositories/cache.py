@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models.fornecedor import Fornecedor
+from app.repositories.interfaces import IRepositorioFornecedor
+
+_AUSENTE = object()
+
+class CacheLRU:
+    """
+    Cache em memória com capacidade limitada (LRU) e expiração por entrada (TTL)
+
+    Guarda também resultados negativos (valor None), com TTL próprio. É
+    thread-safe e conta acertos, faltas, remoções por capacidade e expirações.
+    """
+
+    def __init__(self, capacidade: int = 1024, ttl: float = 60.0, ttl_negativo: float = 5.0):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._entradas: OrderedDict = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.capacidade > 0 and self.ttl > 0
+
+    def get(self, chave: Hashable, padrao: Any = _AUSENTE) -> Any:
+        """Retorna o valor em cache (None para resultado negativo) ou `padrao`"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return padrao
+            expira_em, valor = entrada
+            if expira_em <= time.monotonic():
+                del self._entradas[chave]
+                self.expirations += 1
+                self.misses += 1
+                return padrao
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def set(self, chave: Hashable, valor: Any):
+        """Armazena o valor; None é armazenado como resultado negativo"""
+        if not self.ativo:
+            return
+        ttl = self.ttl if valor is not None else self.ttl_negativo
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self.evictions += 1
+
+    def invalidar(self, *chaves: Hashable):
+        with self._lock:
+            for chave in chaves:
+                self._entradas.pop(chave, None)
+
+    def invalidar_se(self, condicao: Callable[[Hashable, Any], bool]):
+        """Remove as entradas para as quais condicao(chave, valor) é verdadeira"""
+        with self._lock:
+            for chave in [chave for chave, (_, valor) in self._entradas.items() if condicao(chave, valor)]:
+                del self._entradas[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entradas),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+def criar_cache_fornecedores() -> CacheLRU:
+    """Cache configurado por ambiente (FORNECEDOR_CACHE_TTL=0 desativa)"""
+    return CacheLRU(
+        capacidade=int(os.getenv('FORNECEDOR_CACHE_MAX', '1024')),
+        ttl=float(os.getenv('FORNECEDOR_CACHE_TTL', '60')),
+        ttl_negativo=float(os.getenv('FORNECEDOR_CACHE_NEGATIVE_TTL', '5')),
+    )
+
+# Cache do processo: sobrevive entre invocações de um container Lambda aquecido
+cache_fornecedores = criar_cache_fornecedores()
+
+_COLUNAS_FORNECEDOR = [coluna.key for coluna in inspect(Fornecedor).column_attrs]
+
+# Marca, em session.info, que a transação aberta já enviou ao banco escritas de fornecedores
+FORNECEDORES_ALTERADOS = 'fornecedores_alterados'
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_fornecedores_alterados(session, flush_context):
+    if any(isinstance(objeto, Fornecedor) for objeto in (*session.new, *session.dirty, *session.deleted)):
+        session.info[FORNECEDORES_ALTERADOS] = True
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _limpar_fornecedores_alterados(session):
+    session.info.pop(FORNECEDORES_ALTERADOS, None)
+
+class FornecedorRepositoryCache(IRepositorioFornecedor):
+    """
+    Decorador de IRepositorioFornecedor com cache de leitura (read-through)
+
+    O cache guarda os valores das colunas, não a instância ORM; a cada acerto
+    o fornecedor é reconstruído e associado à sessão do repositório sem
+    consultar o banco. Escritas invalidam as entradas afetadas. Enquanto a
+    transação da sessão tiver escritas de fornecedores ainda não confirmadas
+    (ex: numa unidade de trabalho) o cache não é populado; leituras dentro de
+    uma unidade de trabalho que não altera fornecedores populam normalmente.
+    """
+
+    def __init__(self, repositorio: IRepositorioFornecedor, cache: Optional[CacheLRU] = None):
+        self.repositorio = repositorio
+        self.cache = cache if cache is not None else cache_fornecedores
+
+    @property
+    def session(self):
+        return getattr(self.repositorio, 'session', None)
+
+    def _pode_popular(self) -> bool:
+        session = self.session
+        if session is None:
+            return True
+        if session.info.get(FORNECEDORES_ALTERADOS):
+            return False
+        return not any(isinstance(objeto, Fornecedor) for objeto in (*session.new, *session.dirty, *session.deleted))
+
+    def _guardar(self, chave: Hashable, fornecedor: Optional[Fornecedor]):
+        if not self._pode_popular():
+            return
+        valores = None if fornecedor is None else {coluna: getattr(fornecedor, coluna) for coluna in _COLUNAS_FORNECEDOR}
+        self.cache.set(chave, valores)
+
+    def _reconstruir(self, valores: dict) -> Fornecedor:
+        fornecedor = Fornecedor(**valores)
+        session = self.session
+        if session is None:
+            return fornecedor
+        make_transient_to_detached(fornecedor)
+        return session.merge(fornecedor, load=False)
+
+    def _buscar(self, chave: Hashable, buscar: Callable[[], Optional[Fornecedor]]) -> Optional[Fornecedor]:
+        valores = self.cache.get(chave)
+        if valores is _AUSENTE:
+            fornecedor = buscar()
+            self._guardar(chave, fornecedor)
+            return fornecedor
+        if valores is None:
+            return None
+        return self._reconstruir(valores)
+
+    def _invalidar_fornecedor(self, fornecedor_id: Optional[int], *documentos: Optional[str]):
+        self.cache.invalidar(('id', fornecedor_id), *[('documento', documento) for documento in documentos if documento])
+        self.cache.invalidar_se(
+            lambda chave, valores: chave[0] == 'documento' and valores is not None and valores['id'] == fornecedor_id
+        )
+
+    def buscar_por_id(self, fornecedor_id: int) -> Optional[Fornecedor]:
+        return self._buscar(('id', fornecedor_id), lambda: self.repositorio.buscar_por_id(fornecedor_id))
+
+    def buscar_por_documento(self, documento: str) -> Optional[Fornecedor]:
+        return self._buscar(('documento', documento), lambda: self.repositorio.buscar_por_documento(documento))
+
+    def buscar_ids_existentes(self, fornecedor_ids: Iterable[int]) -> Set[int]:
+        """Responde pelo cache o que for possível e consulta o banco apenas para o restante"""
+        existentes = set()
+        pendentes = set()
+        for fornecedor_id in set(fornecedor_ids):
+            valores = self.cache.get(('id', fornecedor_id))
+            if valores is _AUSENTE:
+                pendentes.add(fornecedor_id)
+            elif valores is not None:
+                existentes.add(fornecedor_id)
+
+        if pendentes:
+            encontrados = self.repositorio.buscar_ids_existentes(pendentes)
+            existentes |= encontrados
+            for fornecedor_id in pendentes - encontrados:
+                self._guardar(('id', fornecedor_id), None)
+
+        return existentes
+
+    def buscar_por_ids(self, fornecedor_ids: Iterable[int]) -> List[Fornecedor]:
+        """Acertos reconstruídos do cache; as faltas vêm do banco numa única consulta e populam o cache"""
+        fornecedores = []
+        pendentes = set()
+        for fornecedor_id in set(fornecedor_ids):
+            valores = self.cache.get(('id', fornecedor_id))
+            if valores is _AUSENTE:
+                pendentes.add(fornecedor_id)
+            elif valores is not None:
+                fornecedores.append(self._reconstruir(valores))
+
+        if pendentes:
+            encontrados = self.repositorio.buscar_por_ids(pendentes)
+            for fornecedor in encontrados:
+                self._guardar(('id', fornecedor.id), fornecedor)
+            for fornecedor_id in pendentes - {fornecedor.id for fornecedor in encontrados}:
+                self._guardar(('id', fornecedor_id), None)
+            fornecedores.extend(encontrados)
+
+        return fornecedores
+
+    def listar(self) -> List[Fornecedor]:
+        return self.repositorio.listar()
+
+    def salvar(self, fornecedor: Fornecedor) -> Fornecedor:
+        fornecedor_salvo = self.repositorio.salvar(fornecedor)
+        self._invalidar_fornecedor(fornecedor_salvo.id, fornecedor_salvo.documento)
+        return fornecedor_salvo
+
+    def atualizar(self, fornecedor_id: int, dados: dict) -> Optional[Fornecedor]:
+        fornecedor = self.repositorio.atualizar(fornecedor_id, dados)
+        self._invalidar_fornecedor(fornecedor_id, dados.get('documento'))
+        return fornecedor
+
+    def excluir(self, fornecedor_id: int) -> bool:
+        sucesso = self.repositorio.excluir(fornecedor_id)
+        self._invalidar_fornecedor(fornecedor_id)
+        return sucesso
+
+    def estatisticas(self) -> Dict[str, int]:
+        return self.cache.estatisticas()
@@ -1,25 +1,62 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session, joinedload
 from app.models.conta import Conta, Status
+from app.repositories.transacao import confirmar
 from app.repositories.interfaces import IRepositorioConta
+from loguru import logger
 from datetime import date
+import time
+
+# Quantidade padrão de contas por lote em atualizar_status_atrasadas
+TAMANHO_LOTE_ATRASADAS = 5000
+
+class ContaPaga(NamedTuple):
+    """Conta efetivamente paga pelo UPDATE (dados usados nas notificações)"""
+    id: int
+    descricao: str
+    valor: float
+    fornecedor_id: int
+
+_COLUNAS_PAGA = [Conta.id, Conta.descricao, Conta.valor, Conta.fornecedor_id]
 
 class ContaRepository(IRepositorioConta):
     def __init__(self, session: Session):
         self.session = session
+        self.relatorio_atrasadas: List[dict] = []
 
     def salvar(self, conta: Conta) -> Conta:
         if not conta.status:
             conta.status = Status.ABERTA
         
         self.session.add(conta)
-        self.session.commit()
+        confirmar(self.session)
         self.session.refresh(conta)
         return conta
 
-    def listar(self, **filtros) -> List[Conta]:
-        query = self.session.query(Conta)
+    def salvar_em_lote(self, linhas: List[dict]) -> List[int]:
+        """Insere várias contas em uma única transação e retorna os ids na ordem recebida"""
+        if not linhas:
+            return []
+        
+        for linha in linhas:
+            linha.setdefault('status', Status.ABERTA)
         
+        dialect = self.session.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            stmt = insert(Conta).returning(Conta.id, sort_by_parameter_order=True)
+            ids = list(self.session.execute(stmt, linhas).scalars())
+        else:
+            contas = [Conta(**linha) for linha in linhas]
+            self.session.add_all(contas)
+            self.session.flush()
+            ids = [conta.id for conta in contas]
+        
+        confirmar(self.session)
+        return ids
+
+    def aplicar_filtros(self, query, filtros: dict):
+        """Aplica os filtros de listagem (status, fornecedor_id, data_inicio, data_fim) à consulta"""
         if filtros.get('status'):
             query = query.filter(Conta.status == filtros['status'])
         
@@ -32,29 +69,164 @@ class ContaRepository(IRepositorioConta):
         if filtros.get('data_fim'):
             query = query.filter(Conta.vencimento <= filtros['data_fim'])
         
-        return query.all()
+        return query
+
+    def _query(self, com_fornecedor: bool = False):
+        """Consulta de contas; com_fornecedor carrega o fornecedor no mesmo SELECT (JOIN)"""
+        query = self.session.query(Conta)
+        if com_fornecedor:
+            query = query.options(joinedload(Conta.fornecedor))
+        return query
+
+    # Consultas montadas sem executar, usadas pelos métodos abaixo e pela
+    # verificação de planos (app.utils.query_plans)
+
+    def consulta(self, com_fornecedor: bool = False, **filtros):
+        """Consulta de listar/iter_contas"""
+        return self.aplicar_filtros(self._query(com_fornecedor), filtros)
+
+    def consulta_pagina(self, limite: int, apos: Optional[Tuple[date, int]] = None, com_fornecedor: bool = False, **filtros):
+        """Consulta de listar_pagina"""
+        query = self.consulta(com_fornecedor, **filtros)
+
+        if apos:
+            query = query.filter(tuple_(Conta.vencimento, Conta.id) > tuple_(*apos))
+
+        return query.order_by(Conta.vencimento, Conta.id).limit(limite)
+
+    @staticmethod
+    def consulta_fim_lote_atrasadas(hoje: date, apos_id: int, tamanho_lote: int):
+        """Id da `tamanho_lote`-ésima conta vencida em aberto após `apos_id` (fim do lote em atualizar_status_atrasadas)"""
+        return (
+            select(Conta.id).where(Conta.id > apos_id, Conta.vencimento < hoje, Conta.status == Status.ABERTA)
+            .order_by(Conta.id).offset(tamanho_lote - 1).limit(1)
+        )
+
+    @staticmethod
+    def update_lote_atrasadas(hoje: date, apos_id: int, ate_id: Optional[int]):
+        """UPDATE de um lote de atualizar_status_atrasadas (sem `ate_id`: até o fim)"""
+        condicoes = [Conta.id > apos_id, Conta.vencimento < hoje, Conta.status == Status.ABERTA]
+        if ate_id is not None:
+            condicoes.append(Conta.id <= ate_id)
+        return update(Conta).where(*condicoes).values(status=Status.ATRASADA).execution_options(synchronize_session=False)
+
+    def listar(self, com_fornecedor: bool = False, **filtros) -> List[Conta]:
+        return self.consulta(com_fornecedor, **filtros).all()
+
+    def listar_pagina(self, limite: int, apos: Optional[Tuple[date, int]] = None, com_fornecedor: bool = False, **filtros) -> List[Conta]:
+        """Lista até `limite` contas ordenadas por (vencimento, id), após a chave `apos`"""
+        return self.consulta_pagina(limite, apos, com_fornecedor, **filtros).all()
+
+    def iter_contas(self, tamanho_lote: int = 1000, com_fornecedor: bool = False, **filtros) -> Iterator[Conta]:
+        """Percorre as contas filtradas em lotes, sem materializar o resultado inteiro"""
+        query = self.consulta(com_fornecedor, **filtros)
+        yield from query.order_by(Conta.vencimento, Conta.id).yield_per(tamanho_lote)
 
     def buscar_por_id(self, conta_id: int) -> Optional[Conta]:
         return self.session.query(Conta).filter(Conta.id == conta_id).first()
 
-    def marcar_como_paga(self, conta_id: int) -> bool:
-        conta = self.buscar_por_id(conta_id)
-        if conta:
-            conta.status = Status.PAGA
-            self.session.commit()
-            return True
-        return False
+    def buscar_por_ids(self, conta_ids: Iterable[int], com_fornecedor: bool = False) -> List[Conta]:
+        """Busca várias contas com uma única consulta"""
+        conta_ids = set(conta_ids)
+        if not conta_ids:
+            return []
+        return self._query(com_fornecedor).filter(Conta.id.in_(conta_ids)).all()
+
+    def _pagar(self, *criterios) -> List[ContaPaga]:
+        """
+        Marca como pagas, num único UPDATE, as contas ainda não pagas que
+        atendem aos critérios e retorna as que mudaram de status
+
+        Contas já pagas não são retornadas, o que torna a operação idempotente
+        (reentregas da mesma mensagem não geram nova notificação).
+        """
+        condicoes = (Conta.status != Status.PAGA, *criterios)
+
+        if self.session.get_bind().dialect.update_returning:
+            stmt = update(Conta).where(*condicoes).values(status=Status.PAGA).returning(*_COLUNAS_PAGA)
+            pagas = [ContaPaga._make(row) for row in self.session.execute(stmt.execution_options(synchronize_session=False))]
+        else:
+            # Bancos sem UPDATE ... RETURNING: seleciona (com lock) e atualiza pelos ids
+            selecao = select(*_COLUNAS_PAGA).where(*condicoes).with_for_update()
+            pagas = [ContaPaga._make(row) for row in self.session.execute(selecao)]
+            if pagas:
+                self.session.execute(
+                    update(Conta).where(Conta.id.in_([paga.id for paga in pagas])).values(status=Status.PAGA)
+                    .execution_options(synchronize_session=False)
+                )
+
+        confirmar(self.session)
+        return pagas
+
+    def marcar_como_paga(self, conta_id: int) -> Optional[ContaPaga]:
+        """Paga uma conta; retorna None se ela não existe ou já estava paga"""
+        pagas = self._pagar(Conta.id == conta_id)
+        return pagas[0] if pagas else None
+
+    def pagar_em_lote(self, conta_ids: Optional[Iterable[int]] = None, fornecedor_id: Optional[int] = None) -> List[ContaPaga]:
+        """Paga, num único UPDATE, as contas informadas e/ou todas as contas em aberto de um fornecedor"""
+        criterios = []
+        if conta_ids is not None:
+            conta_ids = set(conta_ids)
+            if not conta_ids:
+                return []
+            criterios.append(Conta.id.in_(conta_ids))
+        if fornecedor_id is not None:
+            criterios.append(Conta.fornecedor_id == fornecedor_id)
+        if not criterios:
+            raise ValueError("Informe as contas ou o fornecedor a pagar")
+        return self._pagar(*criterios)
+
+    def atualizar_status_atrasadas(self, tamanho_lote: int = TAMANHO_LOTE_ATRASADAS,
+                                   ao_atualizar: Optional[Callable[[List[int]], None]] = None) -> int:
+        """
+        Atualiza automaticamente contas vencidas para status ATRASADA
+
+        Executa um UPDATE por lote de até `tamanho_lote` contas vencidas, com
+        commit a cada lote, para manter transações e locks curtos. Os lotes são
+        delimitados por keyset (id da `tamanho_lote`-ésima conta vencida após
+        o último lote), então lacunas nos ids não geram UPDATEs vazios. Apenas
+        as contagens de cada lote ficam em `self.relatorio_atrasadas`.
 
-    def atualizar_status_atrasadas(self):
-        """Atualiza automaticamente contas vencidas para status ATRASADA"""
+        Onde o banco suporta UPDATE ... RETURNING, os ids atualizados em cada
+        lote são entregues a `ao_atualizar` após o commit do lote, sem
+        acumular; sem RETURNING, a contagem vem do rowcount e `ao_atualizar`
+        não é chamado.
+        """
         hoje = date.today()
-        contas_vencidas = self.session.query(Conta).filter(
-            Conta.vencimento < hoje,
-            Conta.status == Status.ABERTA
-        ).all()
-        
-        for conta in contas_vencidas:
-            conta.status = Status.ATRASADA
-        
-        self.session.commit()
-        return len(contas_vencidas)
+        self.relatorio_atrasadas = []
+
+        usar_returning = self.session.get_bind().dialect.update_returning
+        total = 0
+        ultimo_id = 0
+
+        while True:
+            fim = self.session.execute(self.consulta_fim_lote_atrasadas(hoje, ultimo_id, tamanho_lote)).scalar()
+            stmt = self.update_lote_atrasadas(hoje, ultimo_id, fim)
+
+            inicio_lote = time.perf_counter()
+            if usar_returning:
+                ids = list(self.session.execute(stmt.returning(Conta.id)).scalars())
+                linhas = len(ids)
+            else:
+                ids = None
+                linhas = self.session.execute(stmt).rowcount
+            confirmar(self.session)
+            duracao_ms = (time.perf_counter() - inicio_lote) * 1000
+
+            if ids and ao_atualizar is not None:
+                ao_atualizar(ids)
+
+            if linhas:
+                self.relatorio_atrasadas.append({
+                    'apos_id': ultimo_id,
+                    'ate_id': fim,
+                    'linhas': linhas,
+                    'duracao_ms': round(duracao_ms, 3)
+                })
+                logger.debug("Lote após id {}: {} contas atrasadas em {:.1f}ms", ultimo_id, linhas, duracao_ms)
+            total += linhas
+
+            if fim is None:
+                return total
+            ultimo_id = fim
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from sqlalchemy.orm import Session
 from app.models.fornecedor import Fornecedor
+from app.repositories.transacao import confirmar
 from app.repositories.interfaces import IRepositorioFornecedor
 
 class FornecedorRepository(IRepositorioFornecedor):
@@ -9,7 +10,7 @@ class FornecedorRepository(IRepositorioFornecedor):
 
     def salvar(self, fornecedor: Fornecedor) -> Fornecedor:
         self.session.add(fornecedor)
-        self.session.commit()
+        confirmar(self.session)
         self.session.refresh(fornecedor)
         return fornecedor
 
@@ -19,6 +20,21 @@ class FornecedorRepository(IRepositorioFornecedor):
     def buscar_por_id(self, fornecedor_id: int) -> Optional[Fornecedor]:
         return self.session.query(Fornecedor).filter(Fornecedor.id == fornecedor_id).first()
 
+    def buscar_ids_existentes(self, fornecedor_ids: Iterable[int]) -> Set[int]:
+        """Retorna, com uma única consulta, quais dos ids informados existem"""
+        fornecedor_ids = set(fornecedor_ids)
+        if not fornecedor_ids:
+            return set()
+        rows = self.session.query(Fornecedor.id).filter(Fornecedor.id.in_(fornecedor_ids))
+        return {fornecedor_id for (fornecedor_id,) in rows}
+
+    def buscar_por_ids(self, fornecedor_ids: Iterable[int]) -> List[Fornecedor]:
+        """Busca vários fornecedores com uma única consulta (IN)"""
+        fornecedor_ids = set(fornecedor_ids)
+        if not fornecedor_ids:
+            return []
+        return self.session.query(Fornecedor).filter(Fornecedor.id.in_(fornecedor_ids)).all()
+
     def buscar_por_documento(self, documento: str) -> Optional[Fornecedor]:
         return self.session.query(Fornecedor).filter(Fornecedor.documento == documento).first()
 
@@ -26,7 +42,7 @@ class FornecedorRepository(IRepositorioFornecedor):
         fornecedor = self.buscar_por_id(fornecedor_id)
         if fornecedor:
             self.session.delete(fornecedor)
-            self.session.commit()
+            confirmar(self.session)
             return True
         return False
 
@@ -36,6 +52,6 @@ class FornecedorRepository(IRepositorioFornecedor):
             for key, value in dados.items():
                 if hasattr(fornecedor, key) and value is not None:
                     setattr(fornecedor, key, value)
-            self.session.commit()
+            confirmar(self.session)
             return fornecedor
         return None
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, Iterator, List, Set
 from app.models.conta import Conta
 from app.models.fornecedor import Fornecedor
 
@@ -14,8 +14,31 @@ class IRepositorioConta(ABC):
     def marcar_como_paga(self, conta_id: int):
         pass
     @abstractmethod
+    def pagar_em_lote(self, conta_ids=None, fornecedor_id=None) -> List:
+        pass
+    @abstractmethod
     def buscar_por_id(self, conta_id: int) -> Conta:
         pass
+    @abstractmethod
+    def salvar_em_lote(self, linhas: List[dict]) -> List[int]:
+        pass
+    @abstractmethod
+    def buscar_por_ids(self, conta_ids: Iterable[int], com_fornecedor: bool = False) -> List[Conta]:
+        pass
+    @abstractmethod
+    def atualizar_status_atrasadas(self) -> int:
+        pass
+
+class IRepositorioContaLeitura(ABC):
+    @abstractmethod
+    def listar(self, **filtros) -> List:
+        pass
+    @abstractmethod
+    def listar_pagina(self, limite: int, apos=None, **filtros) -> List:
+        pass
+    @abstractmethod
+    def iter_contas(self, tamanho_lote: int = 1000, **filtros) -> Iterator:
+        pass
 
 class IRepositorioFornecedor(ABC):
     @abstractmethod
@@ -28,5 +51,17 @@ class IRepositorioFornecedor(ABC):
     def buscar_por_id(self, fornecedor_id: int) -> Fornecedor:
         pass
     @abstractmethod
+    def buscar_por_documento(self, documento: str) -> Fornecedor:
+        pass
+    @abstractmethod
+    def buscar_ids_existentes(self, fornecedor_ids: Iterable[int]) -> Set[int]:
+        pass
+    @abstractmethod
+    def buscar_por_ids(self, fornecedor_ids: Iterable[int]) -> List[Fornecedor]:
+        pass
+    @abstractmethod
+    def atualizar(self, fornecedor_id: int, dados: dict) -> Fornecedor:
+        pass
+    @abstractmethod
     def excluir(self, fornecedor_id: int):
         pass
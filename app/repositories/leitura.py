@@ -0,0 +1,96 @@
+from datetime import date
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from app.models.conta import Conta, Status
+from app.models.fornecedor import Fornecedor
+from app.repositories.interfaces import IRepositorioContaLeitura
+
+class ContaRow(NamedTuple):
+    """Linha de conta somente leitura (sem identity map nem rastreamento de alterações)"""
+    id: int
+    descricao: str
+    valor: float
+    vencimento: date
+    status: Status
+    fornecedor_id: int
+
+class FornecedorRow(NamedTuple):
+    """Linha de fornecedor somente leitura"""
+    id: int
+    nome: str
+    documento: str
+    email: str
+    telefone: str
+
+_contas = Conta.__table__
+_fornecedores = Fornecedor.__table__
+
+_COLUNAS_CONTA = [_contas.c[campo] for campo in ContaRow._fields]
+_COLUNAS_FORNECEDOR = [_fornecedores.c[campo] for campo in FornecedorRow._fields]
+
+class ContaLeituraRepository(IRepositorioContaLeitura):
+    """
+    Consultas de listagem e relatório com SQLAlchemy Core
+
+    Seleciona apenas as colunas de ContaRow e devolve tuplas nomeadas, sem
+    criar entidades ORM; usado nas listagens, exportações e verificação de
+    vencimentos.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def _select(self, filtros: dict):
+        stmt = select(*_COLUNAS_CONTA)
+
+        if filtros.get('status'):
+            stmt = stmt.where(_contas.c.status == filtros['status'])
+
+        if filtros.get('fornecedor_id'):
+            stmt = stmt.where(_contas.c.fornecedor_id == filtros['fornecedor_id'])
+
+        if filtros.get('data_inicio'):
+            stmt = stmt.where(_contas.c.vencimento >= filtros['data_inicio'])
+
+        if filtros.get('data_fim'):
+            stmt = stmt.where(_contas.c.vencimento <= filtros['data_fim'])
+
+        return stmt
+
+    def listar(self, **filtros) -> List[ContaRow]:
+        return [ContaRow._make(row) for row in self.session.execute(self._select(filtros))]
+
+    def listar_pagina(self, limite: int, apos: Optional[Tuple[date, int]] = None, **filtros) -> List[ContaRow]:
+        """Lista até `limite` contas ordenadas por (vencimento, id), após a chave `apos`"""
+        stmt = self._select(filtros)
+
+        if apos:
+            stmt = stmt.where(tuple_(_contas.c.vencimento, _contas.c.id) > tuple_(*apos))
+
+        stmt = stmt.order_by(_contas.c.vencimento, _contas.c.id).limit(limite)
+        return [ContaRow._make(row) for row in self.session.execute(stmt)]
+
+    def iter_contas(self, tamanho_lote: int = 1000, **filtros) -> Iterator[ContaRow]:
+        """Percorre as contas filtradas em lotes, com cursor no servidor quando suportado"""
+        stmt = self._select(filtros).order_by(_contas.c.vencimento, _contas.c.id)
+        result = self.session.execute(stmt.execution_options(yield_per=tamanho_lote))
+        for lote in result.partitions():
+            yield from map(ContaRow._make, lote)
+
+class FornecedorLeituraRepository:
+    """Consultas de listagem de fornecedores com SQLAlchemy Core"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def listar(self) -> List[FornecedorRow]:
+        stmt = select(*_COLUNAS_FORNECEDOR).order_by(_fornecedores.c.id)
+        return [FornecedorRow._make(row) for row in self.session.execute(stmt)]
+
+    def buscar_por_ids(self, fornecedor_ids: Iterable[int]) -> List[FornecedorRow]:
+        fornecedor_ids = set(fornecedor_ids)
+        if not fornecedor_ids:
+            return []
+        stmt = select(*_COLUNAS_FORNECEDOR).where(_fornecedores.c.id.in_(fornecedor_ids))
+        return [FornecedorRow._make(row) for row in self.session.execute(stmt)]
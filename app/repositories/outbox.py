@@ -0,0 +1,74 @@
+from typing import Iterable, List, NamedTuple, Optional
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.models.outbox import OutboxMensagem
+from app.repositories.transacao import confirmar
+
+class MensagemPendente(NamedTuple):
+    id: int
+    destino: str
+    corpo: str
+    tentativas: int
+    atributos: Optional[str]
+
+_COLUNAS_PENDENTE = [getattr(OutboxMensagem, campo) for campo in MensagemPendente._fields]
+
+class OutboxRepository:
+    """
+    Tabela de outbox: mensagens gravadas junto com a alteração que as
+    originou e publicadas depois pelo RelayOutbox
+
+    adicionar/adicionar_varios devem ser chamados dentro da mesma unidade de
+    trabalho que grava a conta, para que mensagem e conta sejam confirmadas
+    (ou desfeitas) juntas. `atributos` são os MessageAttributes serializados
+    em JSON (ex: o contexto de trace), repassados ao SQS pelo relay.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def adicionar(self, destino: str, corpo: str, atributos: Optional[str] = None):
+        self.session.add(OutboxMensagem(destino=destino, corpo=corpo, atributos=atributos, tentativas=0))
+        confirmar(self.session)
+
+    def adicionar_varios(self, destino: str, corpos: Iterable[str], atributos: Optional[str] = None):
+        linhas = [{'destino': destino, 'corpo': corpo, 'atributos': atributos, 'tentativas': 0} for corpo in corpos]
+        if linhas:
+            self.session.execute(insert(OutboxMensagem), linhas)
+            confirmar(self.session)
+
+    def reservar(self, limite: int, max_tentativas: int) -> List[MensagemPendente]:
+        """
+        Seleciona as mensagens mais antigas com bloqueio de linha
+
+        Com FOR UPDATE SKIP LOCKED (PostgreSQL), relays concorrentes pegam
+        mensagens diferentes em vez de esperar um pelo outro. Os bloqueios
+        duram até o commit de quem reservou.
+        """
+        stmt = (
+            select(*_COLUNAS_PENDENTE)
+            .where(OutboxMensagem.tentativas < max_tentativas)
+            .order_by(OutboxMensagem.id)
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        return [MensagemPendente._make(row) for row in self.session.execute(stmt)]
+
+    def remover(self, ids: Iterable[int]):
+        ids = list(ids)
+        if ids:
+            self.session.execute(
+                delete(OutboxMensagem).where(OutboxMensagem.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+
+    def registrar_falhas(self, ids: Iterable[int]):
+        ids = list(ids)
+        if ids:
+            self.session.execute(
+                update(OutboxMensagem).where(OutboxMensagem.id.in_(ids))
+                .values(tentativas=OutboxMensagem.tentativas + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+    def contar_pendentes(self) -> int:
+        return self.session.execute(select(func.count(OutboxMensagem.id))).scalar()
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy.orm import Session
+
+# Marca, em session.info, que há uma unidade de trabalho aberta na sessão
+UNIDADE_DE_TRABALHO = 'unidade_de_trabalho'
+
+def confirmar(session: Session):
+    """
+    Confirma as alterações feitas por um repositório
+
+    Dentro de uma unidade de trabalho apenas envia as alterações ao banco
+    (flush); o commit fica para o fim da unidade.
+    """
+    if session.info.get(UNIDADE_DE_TRABALHO):
+        session.flush()
+    else:
+        session.commit()
+
+@contextmanager
+def unidade_de_trabalho(session: Session) -> Iterator[Session]:
+    """Agrupa as operações dos repositórios numa única transação, confirmada ao final"""
+    session.info[UNIDADE_DE_TRABALHO] = True
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop(UNIDADE_DE_TRABALHO, None)
@@ -1,4 +1,4 @@
-from .conta_schema import ContaCreate, ContaResponse, ContaUpdate
+from .conta_schema import ContaCreate, ContaPagamentoLote, ContaPaginaResponse, ContaResponse, ContaUpdate
 from .fornecedor_schema import FornecedorCreate, FornecedorResponse, FornecedorUpdate
 
-__all__ = ['ContaCreate', 'ContaResponse', 'ContaUpdate', 'FornecedorCreate', 'FornecedorResponse', 'FornecedorUpdate']
+__all__ = ['ContaCreate', 'ContaPagamentoLote', 'ContaPaginaResponse', 'ContaResponse', 'ContaUpdate', 'FornecedorCreate', 'FornecedorResponse', 'FornecedorUpdate']
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator, model_validator
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 class StatusEnum(str, Enum):
@@ -26,7 +26,30 @@ class ContaUpdate(BaseModel):
 
 class ContaResponse(ContaBase):
     id: int
+    descricao: Optional[str] = None
     status: StatusEnum
     
+    @field_validator('status', mode='before')
+    @classmethod
+    def converter_status(cls, value):
+        """Aceita o enum Status do modelo ORM"""
+        return getattr(value, 'value', value)
+    
     class Config:
         from_attributes = True
+
+class ContaPaginaResponse(BaseModel):
+    items: List[ContaResponse]
+    count: int
+    next_cursor: Optional[str] = None
+
+class ContaPagamentoLote(BaseModel):
+    conta_ids: Optional[List[int]] = None
+    fornecedor_id: Optional[int] = None
+    
+    @model_validator(mode='after')
+    def exigir_criterio(self):
+        """Exige as contas e/ou o fornecedor a pagar"""
+        if self.conta_ids is None and self.fornecedor_id is None:
+            raise ValueError("Informe 'conta_ids' ou 'fornecedor_id'")
+        return self
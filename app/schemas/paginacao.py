@@ -0,0 +1,30 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Optional, Tuple
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+def codificar_cursor(vencimento: date, conta_id: int) -> str:
+    """Gera o cursor opaco que aponta para a chave (vencimento, id) da última conta da página"""
+    bruto = json.dumps([vencimento.isoformat(), conta_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip('=')
+
+def decodificar_cursor(cursor: str) -> Tuple[date, int]:
+    """Decodifica um cursor gerado por codificar_cursor"""
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        vencimento, conta_id = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        return date.fromisoformat(vencimento), int(conta_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+
+def normalizar_limite(limite: Optional[int]) -> int:
+    """Aplica o limite padrão e o teto de itens por página"""
+    if limite is None:
+        return LIMITE_PADRAO
+    if limite <= 0:
+        raise ValueError("O limite deve ser positivo")
+    return min(limite, LIMITE_MAXIMO)
@@ -1,4 +1,5 @@
 from .servico_conta import ServicoConta
 from .servico_fornecedor import ServicoFornecedor
+from .relay_outbox import RelayOutbox
 
-__all__ = ['ServicoConta', 'ServicoFornecedor']
+__all__ = ['ServicoConta', 'ServicoFornecedor', 'RelayOutbox']
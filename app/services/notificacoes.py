@@ -0,0 +1,20 @@
+"""
+Textos das notificações SNS de contas
+
+Compartilhados pelos handlers que publicam a mesma notificação (ex: o
+pagamento em lote pela API e pela fila), para que o texto não divirja.
+"""
+
+from typing import Dict, Iterable, Optional
+
+def descrever_fornecedor(nome: Optional[str]) -> str:
+    """Trecho com o nome do fornecedor para as notificações"""
+    return f" - Fornecedor: {nome}" if nome else ""
+
+def resumir_pagamentos(pagas: Iterable, nomes: Dict[int, str]) -> str:
+    """Texto da notificação de um pagamento em lote"""
+    pagas = list(pagas)
+    total = sum(paga.valor for paga in pagas)
+    fornecedores = {paga.fornecedor_id for paga in pagas}
+    fornecedor = descrever_fornecedor(nomes.get(fornecedores.pop())) if len(fornecedores) == 1 else ""
+    return f"{len(pagas)} contas pagas - Total R${total:.2f}{fornecedor}"
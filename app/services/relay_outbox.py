@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Optional, Tuple
+from app.repositories.outbox import OutboxRepository
+from app.utils.aws_config import SQSBatchProducer
+from app.utils.tracing import SENT_AT, TRACEPARENT, Remote, tracer
+from loguru import logger
+
+class RelayOutbox:
+    """
+    Publica no SQS as mensagens gravadas na outbox
+
+    Cada lote é reservado (FOR UPDATE SKIP LOCKED), enviado com
+    send_message_batch e removido da outbox na mesma transação. Mensagens que
+    falham continuam na outbox com o contador de tentativas incrementado; ao
+    atingir OUTBOX_MAX_TENTATIVAS deixam de ser reservadas e ficam para
+    análise. A entrega é pelo menos uma vez: se o commit falhar depois do
+    envio, a mensagem é reenviada no próximo ciclo.
+
+    Os MessageAttributes gravados com a mensagem são repassados ao SQS sem
+    alteração. Se incluírem contexto de trace, o envio ganha um span "outbox"
+    (com o tempo de espera na outbox em queue_ms) e os campos de trace são
+    trocados pelos desse span, que passa a ser o pai do consumidor da fila.
+    Atributos ilegíveis contam como falha da mensagem.
+    """
+
+    def __init__(self, repositorio: OutboxRepository, criar_produtor: Callable[[], SQSBatchProducer] = SQSBatchProducer,
+                 tamanho_lote: Optional[int] = None, max_tentativas: Optional[int] = None):
+        self.repositorio = repositorio
+        self.criar_produtor = criar_produtor
+        self.tamanho_lote = tamanho_lote or int(os.getenv('OUTBOX_LOTE', '100'))
+        self.max_tentativas = max_tentativas or int(os.getenv('OUTBOX_MAX_TENTATIVAS', '10'))
+
+    @staticmethod
+    def _atributos(atributos: Optional[str]) -> Tuple[Optional[dict], Optional[Remote]]:
+        """MessageAttributes gravados com a mensagem (sem os campos de trace, se houver contexto) e o contexto de trace"""
+        if not atributos:
+            return None, None
+        try:
+            gravados = json.loads(atributos)
+        except ValueError as e:
+            raise ValueError(f"atributos ilegíveis: {e}") from e
+        if not isinstance(gravados, dict):
+            raise ValueError("os atributos devem ser um objeto JSON")
+
+        contexto = tracer.extract(gravados)
+        if contexto is not None:
+            gravados = {nome: valor for nome, valor in gravados.items() if nome not in (TRACEPARENT, SENT_AT)}
+        return gravados or None, contexto
+
+    def drenar_lote(self) -> Dict[str, int]:
+        """Envia um lote da outbox; retorna quantas mensagens foram reservadas, enviadas e falharam"""
+        session = self.repositorio.session
+        try:
+            mensagens = self.repositorio.reservar(self.tamanho_lote, self.max_tentativas)
+            falhas = set()
+
+            if mensagens:
+                produtor = self.criar_produtor()
+                por_entrada = {}
+                for mensagem in mensagens:
+                    try:
+                        atributos, contexto = self._atributos(mensagem.atributos)
+                        with tracer.span('outbox', contexto, outbox_id=mensagem.id) if contexto else nullcontext():
+                            por_entrada[produtor.send(mensagem.destino, mensagem.corpo, atributos)] = mensagem.id
+                    except ValueError as e:
+                        logger.error(f"Mensagem {mensagem.id} da outbox inválida: {e}")
+                        falhas.add(mensagem.id)
+                falhas.update(por_entrada[falha['Id']] for falha in produtor.flush())
+
+                for mensagem in mensagens:
+                    if mensagem.id in falhas and mensagem.tentativas + 1 >= self.max_tentativas:
+                        logger.error(f"Mensagem {mensagem.id} da outbox atingiu o limite de {self.max_tentativas} tentativas")
+
+                self.repositorio.remover(mensagem.id for mensagem in mensagens if mensagem.id not in falhas)
+                self.repositorio.registrar_falhas(falhas)
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return {'reservadas': len(mensagens), 'enviadas': len(mensagens) - len(falhas), 'falhas': len(falhas)}
+
+    def drenar(self, max_lotes: Optional[int] = None, tempo_limite: Optional[float] = None) -> Dict[str, float]:
+        """
+        Envia lotes até esvaziar a outbox, atingir `max_lotes` ou passar de
+        `tempo_limite` segundos
+
+        Também para quando um lote inteiro falha, para não insistir enquanto
+        o SQS estiver indisponível.
+        """
+        inicio = time.perf_counter()
+        totais = {'lotes': 0, 'enviadas': 0, 'falhas': 0}
+
+        while max_lotes is None or totais['lotes'] < max_lotes:
+            resultado = self.drenar_lote()
+            if not resultado['reservadas']:
+                break
+
+            totais['lotes'] += 1
+            totais['enviadas'] += resultado['enviadas']
+            totais['falhas'] += resultado['falhas']
+
+            if resultado['reservadas'] < self.tamanho_lote or not resultado['enviadas']:
+                break
+            if tempo_limite is not None and time.perf_counter() - inicio >= tempo_limite:
+                break
+
+        totais['segundos'] = round(time.perf_counter() - inicio, 4)
+        logger.info("Outbox drenada: {} mensagens enviadas, {} falhas em {} lotes", totais['enviadas'], totais['falhas'], totais['lotes'])
+        return totais
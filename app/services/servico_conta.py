@@ -1,14 +1,21 @@
-from typing import List, Optional
-from app.repositories.interfaces import IRepositorioConta, IRepositorioFornecedor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.repositories.conta_repository import ContaPaga
+from app.repositories.interfaces import IRepositorioConta, IRepositorioContaLeitura, IRepositorioFornecedor
 from app.models.conta import Conta, Status
 from app.schemas.conta_schema import ContaCreate, ContaUpdate
+from app.schemas.paginacao import codificar_cursor, decodificar_cursor, normalizar_limite
+from pydantic import ValidationError
 from loguru import logger
 from datetime import date
 
 class ServicoConta:
-    def __init__(self, repositorio_conta: IRepositorioConta, repositorio_fornecedor: IRepositorioFornecedor):
+    def __init__(self, repositorio_conta: IRepositorioConta, repositorio_fornecedor: IRepositorioFornecedor,
+                 repositorio_leitura: Optional[IRepositorioContaLeitura] = None):
         self.repositorio_conta = repositorio_conta
         self.repositorio_fornecedor = repositorio_fornecedor
+        # Listagens e relatórios podem ir para as réplicas; escritas e
+        # buscas logo após escrita (buscar_conta/buscar_contas) ficam no writer
+        self.repositorio_leitura = repositorio_leitura or repositorio_conta
 
     def criar_conta(self, dados_conta: ContaCreate) -> Conta:
         """Cria uma nova conta após validações"""
@@ -33,22 +40,129 @@ class ServicoConta:
         logger.info(f"Conta criada: {conta_salva.id} - {conta_salva.descricao} - R${conta_salva.valor}")
         return conta_salva
 
+    def criar_contas_em_lote(self, itens: List[Any]) -> List[dict]:
+        """
+        Cria várias contas de uma vez
+        
+        Valida todos os itens, confere os fornecedores com uma única consulta e
+        insere as contas válidas numa única transação. Itens inválidos não
+        impedem a criação dos demais.
+        
+        Returns:
+            Um resultado por item, na ordem recebida: status 'criada' (com id)
+            ou 'erro' (com a mensagem)
+        """
+        resultados: List[Optional[dict]] = [None] * len(itens)
+        validos = []
+        
+        for indice, item in enumerate(itens):
+            try:
+                dados_conta = item if isinstance(item, ContaCreate) else ContaCreate(**item)
+            except ValidationError as e:
+                resultados[indice] = {
+                    'indice': indice,
+                    'status': 'erro',
+                    'erro': 'Dados inválidos',
+                    'details': e.errors(include_url=False, include_context=False)
+                }
+                continue
+            except TypeError:
+                resultados[indice] = {'indice': indice, 'status': 'erro', 'erro': 'Item deve ser um objeto'}
+                continue
+            
+            if dados_conta.valor <= 0:
+                resultados[indice] = {'indice': indice, 'status': 'erro', 'erro': 'O valor da conta deve ser positivo'}
+                continue
+            
+            validos.append((indice, dados_conta))
+        
+        # Verificar todos os fornecedores referenciados de uma vez
+        fornecedores_existentes = self.repositorio_fornecedor.buscar_ids_existentes(
+            {dados_conta.fornecedor_id for _, dados_conta in validos}
+        )
+        
+        a_inserir = []
+        for indice, dados_conta in validos:
+            if dados_conta.fornecedor_id not in fornecedores_existentes:
+                resultados[indice] = {
+                    'indice': indice,
+                    'status': 'erro',
+                    'erro': f"Fornecedor com ID {dados_conta.fornecedor_id} não encontrado"
+                }
+            else:
+                a_inserir.append((indice, dados_conta))
+        
+        ids = self.repositorio_conta.salvar_em_lote([
+            {
+                'descricao': dados_conta.descricao,
+                'valor': dados_conta.valor,
+                'vencimento': dados_conta.vencimento,
+                'status': Status.ABERTA,
+                'fornecedor_id': dados_conta.fornecedor_id
+            }
+            for _, dados_conta in a_inserir
+        ])
+        
+        for (indice, dados_conta), conta_id in zip(a_inserir, ids):
+            resultados[indice] = {
+                'indice': indice,
+                'status': 'criada',
+                'id': conta_id,
+                'valor': dados_conta.valor,
+                'vencimento': dados_conta.vencimento.isoformat()
+            }
+        
+        logger.info(f"Lote de contas processado: {len(ids)} criadas, {len(itens) - len(ids)} com erro")
+        return resultados
+
     def listar_contas(self, **filtros) -> List[Conta]:
         """Lista contas com filtros opcionais"""
-        return self.repositorio_conta.listar(**filtros)
+        return self.repositorio_leitura.listar(**filtros)
+
+    def listar_contas_paginado(self, limite: Optional[int] = None, cursor: Optional[str] = None, **filtros) -> Tuple[List[Conta], Optional[str]]:
+        """Lista uma página de contas e retorna o cursor da próxima página (ou None)"""
+        limite = normalizar_limite(limite)
+        apos = decodificar_cursor(cursor) if cursor else None
+        
+        # Busca um item a mais para saber se existe próxima página
+        contas = self.repositorio_leitura.listar_pagina(limite + 1, apos=apos, **filtros)
+        if len(contas) <= limite:
+            return contas, None
+        
+        contas = contas[:limite]
+        ultima = contas[-1]
+        return contas, codificar_cursor(ultima.vencimento, ultima.id)
+
+    def iter_contas(self, **filtros) -> Iterator[Conta]:
+        """Percorre todas as contas filtradas sem carregá-las de uma vez"""
+        return self.repositorio_leitura.iter_contas(**filtros)
 
     def buscar_conta(self, conta_id: int) -> Optional[Conta]:
         """Busca conta por ID"""
         return self.repositorio_conta.buscar_por_id(conta_id)
 
-    def marcar_como_paga(self, conta_id: int) -> bool:
-        """Marca uma conta como paga"""
-        sucesso = self.repositorio_conta.marcar_como_paga(conta_id)
-        if sucesso:
-            logger.info(f"Conta {conta_id} marcada como paga")
+    def buscar_contas(self, conta_ids: List[int], com_fornecedor: bool = False) -> List[Conta]:
+        """Busca várias contas por ID com uma única consulta (opcionalmente já com o fornecedor)"""
+        return self.repositorio_conta.buscar_por_ids(conta_ids, com_fornecedor=com_fornecedor)
+
+    def marcar_como_paga(self, conta_id: int) -> Optional[ContaPaga]:
+        """Marca uma conta como paga; retorna None se não existe ou já estava paga"""
+        paga = self.repositorio_conta.marcar_como_paga(conta_id)
+        if paga:
+            logger.info("Conta {} marcada como paga", conta_id)
         else:
-            logger.warning(f"Não foi possível marcar conta {conta_id} como paga")
-        return sucesso
+            logger.warning("Conta {} não encontrada ou já paga", conta_id)
+        return paga
+
+    def pagar_contas(self, conta_ids: Optional[List[int]] = None, fornecedor_id: Optional[int] = None) -> List[ContaPaga]:
+        """Paga várias contas (por ID e/ou todas as em aberto de um fornecedor) numa única instrução"""
+        pagas = self.repositorio_conta.pagar_em_lote(conta_ids=conta_ids, fornecedor_id=fornecedor_id)
+        logger.info("{} contas pagas em lote", len(pagas))
+        return pagas
+
+    def nomes_fornecedores(self, fornecedor_ids: Iterable[int]) -> Dict[int, str]:
+        """Nomes dos fornecedores para notificações, numa única consulta para os que não estiverem em cache"""
+        return {fornecedor.id: fornecedor.nome for fornecedor in self.repositorio_fornecedor.buscar_por_ids(fornecedor_ids)}
 
     def atualizar_status_atrasadas(self) -> int:
         """Atualiza automaticamente contas vencidas"""
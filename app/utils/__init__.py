@@ -1,14 +1,37 @@
-from .aws_config import get_aws_client, get_database_url, send_sqs_message, publish_sns_message
-from .logger import get_logger
-from .database import db_config, init_database, get_db_session
-
-__all__ = [
-    'get_aws_client', 
-    'get_database_url', 
-    'send_sqs_message', 
-    'publish_sns_message',
-    'get_logger',
-    'db_config',
-    'init_database',
-    'get_db_session'
-]
+"""
+Utilitários compartilhados
+
+Os símbolos são resolvidos no primeiro acesso (PEP 562), para que importar
+um submódulo leve (ex: app.utils.logger) não carregue boto3 e SQLAlchemy.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'get_aws_client': 'aws_config',
+    'warm_up_aws_clients': 'aws_config',
+    'get_database_url': 'aws_config',
+    'send_sqs_message': 'aws_config',
+    'send_sqs_message_batch': 'aws_config',
+    'publish_sns_message': 'aws_config',
+    'set_messaging_backend': 'aws_config',
+    'get_messaging_backend': 'aws_config',
+    'get_logger': 'logger',
+    'db_config': 'database',
+    'init_database': 'database',
+    'get_db_session': 'database',
+    'dumps': 'serialization',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{module_name}'), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,22 +1,147 @@
-import boto3
+import itertools
 import os
-from typing import Optional
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
 from loguru import logger
+from app.utils.metrics import metrics
+from app.utils.tracing import tracer
 
-def get_aws_client(service_name: str, region: Optional[str] = None):
-    """Cria cliente AWS para o serviço especificado"""
-    region = region or os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
+# boto3 é importado no primeiro uso: invocações que não falam com a AWS
+# (ex: /health, SNS) não pagam o custo de importação no cold start
+boto3 = None
+
+def _load_boto3():
+    """Importa o boto3 sob demanda"""
+    global boto3
+    if boto3 is None:
+        import boto3 as boto3_module
+        boto3 = boto3_module
+    return boto3
+
+# Limites de send_message_batch: mensagens e bytes por chamada
+SQS_MAX_BATCH_SIZE = 10
+SQS_MAX_BATCH_BYTES = 256 * 1024
+
+class AWSClientRegistry:
+    """
+    Registro de clientes boto3 compartilhados pelo processo
     
-    try:
-        client = boto3.client(service_name, region_name=region)
-        logger.info(f"Cliente AWS criado para {service_name} na região {region}")
+    Os clientes são criados sob demanda, uma única vez por (serviço, região),
+    e reaproveitados entre invocações do mesmo container Lambda, mantendo o
+    pool de conexões HTTPS aberto.
+    """
+    
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._session = None
+    
+    def _client_config(self):
+        """Configuração de pool, timeouts e retries dos clientes"""
+        from botocore.config import Config
+        
+        return Config(
+            max_pool_connections=int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '10')),
+            connect_timeout=float(os.getenv('AWS_CONNECT_TIMEOUT', '2')),
+            read_timeout=float(os.getenv('AWS_READ_TIMEOUT', '5')),
+            retries={
+                'max_attempts': int(os.getenv('AWS_MAX_ATTEMPTS', '3')),
+                'mode': 'standard'
+            },
+            tcp_keepalive=True
+        )
+    
+    def get(self, service_name: str, region: Optional[str] = None):
+        """Retorna o cliente do serviço, criando-o no primeiro uso"""
+        region = region or os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
+        key = (service_name, region)
+        
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    # boto3.Session não é thread-safe: criação sempre sob o lock
+                    if self._session is None:
+                        self._session = _load_boto3().session.Session()
+                    client = self._session.client(service_name, region_name=region, config=self._client_config())
+                    self._clients[key] = client
+                    logger.debug(f"Cliente AWS criado para {service_name} na região {region}")
         return client
+    
+    def warm_up(self, services: Iterable[str] = ('sqs', 'sns'), region: Optional[str] = None):
+        """Cria antecipadamente os clientes (ex: na inicialização do container)"""
+        for service_name in services:
+            self.get(service_name, region)
+    
+    def clear(self):
+        """Descarta os clientes em cache (ex: após trocar credenciais, ou em testes)"""
+        with self._lock:
+            self._clients.clear()
+            self._session = None
+
+# Registro global de clientes AWS
+client_registry = AWSClientRegistry()
+
+# Serviços atendidos pelo backend de mensageria plugável
+MESSAGING_SERVICES = ('sqs', 'sns')
+
+# Backend de mensageria: o registro de clientes boto3 ou, com
+# MESSAGING_BACKEND=memory, o broker em memória (app.utils.local_broker)
+_messaging_backend = None
+
+def set_messaging_backend(backend):
+    """
+    Troca o backend de SQS/SNS (objeto com get(service_name, region), como o
+    AWSClientRegistry); None volta ao padrão definido por MESSAGING_BACKEND
+    """
+    global _messaging_backend
+    _messaging_backend = backend
+
+def get_messaging_backend():
+    """Retorna o backend de SQS/SNS, criando-o no primeiro uso"""
+    global _messaging_backend
+    if _messaging_backend is None:
+        if os.getenv('MESSAGING_BACKEND', 'aws').lower() == 'memory':
+            from app.utils.local_broker import InMemoryBroker
+            _messaging_backend = InMemoryBroker()
+        else:
+            _messaging_backend = client_registry
+    return _messaging_backend
+
+def get_aws_client(service_name: str, region: Optional[str] = None):
+    """Retorna cliente AWS (reutilizado) para o serviço especificado"""
+    try:
+        if service_name in MESSAGING_SERVICES:
+            return get_messaging_backend().get(service_name, region)
+        return client_registry.get(service_name, region)
     except Exception as e:
         logger.error(f"Erro ao criar cliente AWS para {service_name}: {str(e)}")
         raise
 
+def warm_up_aws_clients(services: Optional[Iterable[str]] = None, region: Optional[str] = None):
+    """
+    Hook de aquecimento dos clientes AWS
+    
+    Sem argumentos, usa os serviços listados em AWS_WARM_UP_SERVICES (ex: "sqs,sns").
+    """
+    if services is None:
+        services = [name.strip() for name in os.getenv('AWS_WARM_UP_SERVICES', '').split(',') if name.strip()]
+    if get_messaging_backend() is not client_registry:
+        services = [name for name in services if name not in MESSAGING_SERVICES]
+    try:
+        client_registry.warm_up(services, region)
+    except Exception as e:
+        logger.warning(f"Não foi possível aquecer clientes AWS: {str(e)}")
+
 def get_database_url() -> str:
     """Retorna URL de conexão com o banco de dados"""
+    # URL explícita (ex: sqlite:///local.db para testes e benchmarks locais)
+    database_url = os.getenv('DATABASE_URL')
+    if database_url:
+        return database_url
+    
     # Para Aurora Serverless com Data API
     cluster_arn = os.getenv('AURORA_CLUSTER_ARN')
     secret_arn = os.getenv('AURORA_SECRET_ARN')
@@ -35,8 +160,30 @@ def get_database_url() -> str:
         
         return f"postgresql://{user}:{password}@{host}:{port}/{database}"
 
+def get_reader_database_url() -> Optional[str]:
+    """
+    Retorna URL do endpoint de leitura (réplicas do Aurora) ou None
+
+    Usa DATABASE_READER_URL ou, na falta dela, DB_READER_HOST com as mesmas
+    credenciais do writer. A Data API não tem endpoint de leitura.
+    """
+    reader_url = os.getenv('DATABASE_READER_URL')
+    if reader_url:
+        return reader_url
+    
+    reader_host = os.getenv('DB_READER_HOST')
+    if not reader_host:
+        return None
+    
+    port = os.getenv('DB_PORT', '5432')
+    user = os.getenv('DB_USER', 'postgres')
+    password = os.getenv('DB_PASSWORD', '')
+    database = os.getenv('DB_NAME', 'contas_a_pagar')
+    
+    return f"postgresql://{user}:{password}@{reader_host}:{port}/{database}"
+
 def send_sqs_message(queue_url: str, message_body: str, message_attributes: Optional[dict] = None):
-    """Envia mensagem para fila SQS"""
+    """Envia mensagem para fila SQS (com o contexto de trace do span ativo nos atributos)"""
     try:
         sqs = get_aws_client('sqs')
         
@@ -45,18 +192,175 @@ def send_sqs_message(queue_url: str, message_body: str, message_attributes: Opti
             'MessageBody': message_body
         }
         
+        message_attributes = tracer.inject(message_attributes)
         if message_attributes:
             params['MessageAttributes'] = message_attributes
         
-        response = sqs.send_message(**params)
+        with metrics.timer('sqs.send'):
+            response = sqs.send_message(**params)
         logger.info(f"Mensagem enviada para SQS: {response['MessageId']}")
         return response
     except Exception as e:
         logger.error(f"Erro ao enviar mensagem SQS: {str(e)}")
         raise
 
+class SQSBatchProducer:
+    """
+    Produtor SQS com buffer
+    
+    Acumula as mensagens por fila e as envia com send_message_batch em grupos
+    de até 10 mensagens ou 256 KB. Um grupo é enviado assim que enche; o
+    restante sai em flush(). Cada uso cria o próprio produtor e chama flush()
+    ao terminar (ex: o RelayOutbox, um por drenagem), para que o buffer nunca
+    seja compartilhado entre invocações ou threads. Em falhas parciais, só as
+    entradas que falharam são reenviadas; as falhas definitivas, inclusive as
+    dos grupos enviados durante send(), são retornadas por flush().
+    """
+    
+    def __init__(self, max_retries: int = 2, retry_delay: float = 0.05):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._buffers: Dict[str, List[dict]] = {}
+        self._buffer_sizes: Dict[str, int] = {}
+        self._failures: List[dict] = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _entry_size(entry: dict) -> int:
+        """Tamanho da entrada como contabilizado pelo SQS (corpo + atributos)"""
+        size = len(entry['MessageBody'].encode('utf-8'))
+        for name, attribute in entry.get('MessageAttributes', {}).items():
+            size += len(name.encode('utf-8')) + len(attribute.get('DataType', '').encode('utf-8'))
+            value = attribute.get('StringValue') or attribute.get('BinaryValue') or ''
+            size += len(value) if isinstance(value, bytes) else len(value.encode('utf-8'))
+        return size
+    
+    def send(self, queue_url: str, message_body: str, message_attributes: Optional[dict] = None) -> str:
+        """
+        Adiciona a mensagem ao buffer da fila, com o contexto de trace do
+        span ativo nos atributos
+        
+        Returns:
+            Id da entrada no lote (usado para identificar falhas)
+        """
+        entry = {'Id': str(next(self._ids)), 'MessageBody': message_body}
+        message_attributes = tracer.inject(message_attributes)
+        if message_attributes:
+            entry['MessageAttributes'] = message_attributes
+        
+        size = self._entry_size(entry)
+        if size > SQS_MAX_BATCH_BYTES:
+            raise ValueError(f"Mensagem SQS excede o limite de {SQS_MAX_BATCH_BYTES} bytes")
+        
+        ready = None
+        with self._lock:
+            buffer = self._buffers.setdefault(queue_url, [])
+            if buffer and self._buffer_sizes[queue_url] + size > SQS_MAX_BATCH_BYTES:
+                ready = self._take(queue_url)
+                buffer = self._buffers.setdefault(queue_url, [])
+            buffer.append(entry)
+            self._buffer_sizes[queue_url] = self._buffer_sizes.get(queue_url, 0) + size
+            if ready is None and len(buffer) >= SQS_MAX_BATCH_SIZE:
+                ready = self._take(queue_url)
+        
+        if ready:
+            failures = self._send_batch(queue_url, ready)
+            if failures:
+                with self._lock:
+                    self._failures.extend(failures)
+        return entry['Id']
+    
+    def _take(self, queue_url: str) -> List[dict]:
+        """Retira o conteúdo do buffer da fila (chamar com o lock adquirido)"""
+        self._buffer_sizes[queue_url] = 0
+        return self._buffers.pop(queue_url, [])
+    
+    def _send_batch(self, queue_url: str, entries: List[dict]) -> List[dict]:
+        """Envia um lote, reenviando apenas as entradas que falharam; retorna as falhas definitivas"""
+        pending = {entry['Id']: entry for entry in entries}
+        failures = []
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            
+            try:
+                with metrics.timer('sqs.send_batch'):
+                    response = get_aws_client('sqs').send_message_batch(
+                        QueueUrl=queue_url,
+                        Entries=list(pending.values())
+                    )
+                failures = response.get('Failed', [])
+            except Exception as e:
+                logger.warning(f"Erro ao enviar lote SQS (tentativa {attempt + 1}): {str(e)}")
+                failures = [
+                    {'Id': entry_id, 'Code': type(e).__name__, 'Message': str(e), 'SenderFault': False}
+                    for entry_id in pending
+                ]
+            
+            pending = {
+                failure['Id']: pending[failure['Id']]
+                for failure in failures
+                if failure['Id'] in pending
+            }
+            # Erros do remetente (mensagem inválida) não adianta reenviar
+            if not pending or all(failure.get('SenderFault') for failure in failures):
+                break
+        
+        failures = [
+            dict(failure, QueueUrl=queue_url, MessageBody=pending[failure['Id']]['MessageBody'])
+            for failure in failures
+            if failure['Id'] in pending
+        ]
+        metrics.incr('sqs.messages', len(entries) - len(failures))
+        if failures:
+            metrics.incr('sqs.messages.failed', len(failures))
+        for failure in failures:
+            logger.error(f"Falha ao enviar mensagem SQS {failure['Id']} ({failure.get('Code')}): {failure.get('Message')}")
+        
+        logger.debug(f"Lote SQS enviado: {len(entries) - len(failures)} mensagens, {len(failures)} falhas")
+        return failures
+    
+    def flush(self) -> List[dict]:
+        """
+        Envia tudo o que está no buffer
+        
+        Returns:
+            Entradas que falharam definitivamente (com QueueUrl e MessageBody)
+        """
+        with self._lock:
+            batches = [(queue_url, self._take(queue_url)) for queue_url in list(self._buffers)]
+            failures, self._failures = self._failures, []
+        
+        for queue_url, entries in batches:
+            for start in range(0, len(entries), SQS_MAX_BATCH_SIZE):
+                failures.extend(self._send_batch(queue_url, entries[start:start + SQS_MAX_BATCH_SIZE]))
+        return failures
+    
+    def pending(self) -> int:
+        """Quantidade de mensagens aguardando envio"""
+        with self._lock:
+            return sum(len(entries) for entries in self._buffers.values())
+
+def send_sqs_message_batch(queue_url: str, message_bodies: List[str]) -> List[dict]:
+    """Envia mensagens para fila SQS em lotes (send_message_batch) e aguarda o envio
+    
+    Returns:
+        Entradas que falharam, com 'Id' igual à posição da mensagem em message_bodies
+    """
+    producer = SQSBatchProducer()
+    positions = {
+        producer.send(queue_url, body): index
+        for index, body in enumerate(message_bodies)
+    }
+    failed = [dict(failure, Id=str(positions[failure['Id']])) for failure in producer.flush()]
+    
+    logger.info(f"{len(message_bodies) - len(failed)} mensagens enviadas para SQS em lote ({len(failed)} falhas)")
+    return failed
+
 def publish_sns_message(topic_arn: str, message: str, subject: Optional[str] = None):
-    """Publica mensagem no tópico SNS"""
+    """Publica mensagem no tópico SNS (com o contexto de trace do span ativo nos atributos)"""
     try:
         sns = get_aws_client('sns')
         
@@ -68,7 +372,12 @@ def publish_sns_message(topic_arn: str, message: str, subject: Optional[str] = N
         if subject:
             params['Subject'] = subject
         
-        response = sns.publish(**params)
+        message_attributes = tracer.message_attributes()
+        if message_attributes:
+            params['MessageAttributes'] = message_attributes
+        
+        with metrics.timer('sns.publish'):
+            response = sns.publish(**params)
         logger.info(f"Mensagem publicada no SNS: {response['MessageId']}")
         return response
     except Exception as e:
@@ -1,25 +1,203 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from app.models.base import Base
-from app.utils.aws_config import get_database_url
+from sqlalchemy.pool import NullPool, QueuePool
+from app.utils.aws_config import get_database_url, get_reader_database_url
 from app.utils.logger import get_logger
-from typing import Generator
+from app.utils.metrics import instrument_engine, metrics as metrics_registry
+from typing import Dict, Generator, Optional
 import os
+import threading
 
 logger = get_logger(__name__)
 
-class DatabaseConfig:
+# Estratégias de pool (DB_POOL_STRATEGY):
+#   queue  - QueuePool clássico (DB_POOL_SIZE + DB_MAX_OVERFLOW conexões)
+#   single - uma conexão persistente por thread de processamento do container
+#            Lambda (SQS_WORKERS, padrão 1: o consumidor concorrente abre uma
+#            sessão por thread e não pode esperar pela conexão de outra)
+#   null   - sem pool; cada sessão abre e fecha a conexão (uso atrás do RDS Proxy)
+POOL_STRATEGIES = ('queue', 'single', 'null')
+
+def pool_settings(strategy: Optional[str] = None) -> dict:
+    """Parâmetros de pool para a estratégia, lidos do ambiente"""
+    strategy = (strategy or os.getenv('DB_POOL_STRATEGY', 'queue')).lower()
+    if strategy not in POOL_STRATEGIES:
+        raise ValueError(f"DB_POOL_STRATEGY inválida: {strategy} (use {', '.join(POOL_STRATEGIES)})")
+    
+    if strategy == 'null':
+        return {'poolclass': NullPool}
+    
+    settings = {
+        'poolclass': QueuePool,
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '300')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+    }
+    if strategy == 'single':
+        settings.update(pool_size=max(int(os.getenv('SQS_WORKERS', '1')), 1), max_overflow=0)
+    else:
+        settings.update(
+            pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10'))
+        )
+    return settings
+
+class PoolMetrics:
+    """Contadores de conexões do pool, alimentados pelos eventos do SQLAlchemy"""
+    
     def __init__(self):
-        self.database_url = get_database_url()
-        self.engine = None
-        self.SessionLocal = None
-        self._initialize()
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.closes = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.max_open = 0
+    
+    def attach(self, engine):
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'close', self._on_close)
+        event.listen(engine, 'close_detached', self._on_close)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+    
+    @property
+    def open(self) -> int:
+        return self.connects - self.closes
+    
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+            self.max_open = max(self.max_open, self.open)
+    
+    def _on_close(self, dbapi_connection, *args):
+        with self._lock:
+            self.closes += 1
+    
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+    
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+    
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'closes': self.closes,
+                'open': self.open,
+                'max_open': self.max_open,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'invalidations': self.invalidations,
+            }
+
+class DatabaseConfig:
+    """
+    Configuração do banco de dados
+    
+    A engine e a fábrica de sessões são criadas no primeiro uso (e não na
+    importação do módulo), para que invocações que não acessam o banco não
+    paguem esse custo no cold start.
+    """
+    
+    def __init__(self, database_url: Optional[str] = None, pool_strategy: Optional[str] = None,
+                 reader_url: Optional[str] = None):
+        self.database_url = database_url or get_database_url()
+        self.reader_url = reader_url if reader_url is not None else get_reader_database_url()
+        self.pool_strategy = pool_strategy
+        self.metrics = PoolMetrics()
+        self.reader_metrics = PoolMetrics()
+        self._engine = None
+        self._session_factory = None
+        self._reader_engine = None
+        self._reader_session_factory = None
+        self._lock = threading.Lock()
+    
+    @property
+    def engine(self):
+        """Engine do SQLAlchemy (criada no primeiro acesso)"""
+        if self._engine is None:
+            self._initialize()
+        return self._engine
+    
+    @property
+    def SessionLocal(self) -> sessionmaker:
+        """Fábrica de sessões (criada no primeiro acesso)"""
+        if self._session_factory is None:
+            self._initialize()
+        return self._session_factory
+    
+    @property
+    def has_reader(self) -> bool:
+        """Indica se há um endpoint de leitura separado do writer"""
+        return bool(self.reader_url) and self.reader_url != self.database_url
+    
+    @property
+    def reader_engine(self):
+        """Engine das réplicas de leitura (ou a do writer, sem endpoint de leitura)"""
+        if not self.has_reader:
+            return self.engine
+        if self._reader_engine is None:
+            self._initialize_reader()
+        return self._reader_engine
+    
+    @property
+    def ReaderSessionLocal(self) -> sessionmaker:
+        """Fábrica de sessões de leitura (a do writer, sem endpoint de leitura)"""
+        if not self.has_reader:
+            return self.SessionLocal
+        if self._reader_session_factory is None:
+            self._initialize_reader()
+        return self._reader_session_factory
+    
+    @property
+    def initialized(self) -> bool:
+        """Indica se a engine já foi criada"""
+        return self._engine is not None
     
     def _initialize(self):
         """Inicializa engine e sessão do SQLAlchemy"""
+        with self._lock:
+            if self._engine is None:
+                self._create_engine()
+    
+    def _initialize_reader(self):
+        """Inicializa engine e sessão das réplicas de leitura"""
+        with self._lock:
+            if self._reader_engine is None:
+                engine = self._build_engine(self.reader_url, self.reader_metrics, read_only=True)
+                self._reader_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                self._reader_engine = engine
+    
+    def _create_engine(self):
+        """Cria a engine do writer (chamar com o lock adquirido)"""
+        engine = self._build_engine(self.database_url, self.metrics)
+        self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self._engine = engine
+    
+    def _build_engine(self, database_url: str, metrics: PoolMetrics, read_only: bool = False):
+        """Cria uma engine conforme o ambiente"""
         try:
+            echo = os.getenv('SQL_ECHO', 'false').lower() == 'true'
+            connect_timeout = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+            
             # Configurações específicas para diferentes ambientes
-            if 'aurora+awsrdsdata' in self.database_url:
+            if 'aurora+awsrdsdata' in database_url:
                 # Para Aurora Data API (instalação adicional necessária)
                 # pip install sqlalchemy-aurora-data-api
                 try:
@@ -27,42 +205,86 @@ class DatabaseConfig:
                     register_dialects()
                 except ImportError:
                     logger.warning("sqlalchemy-aurora-data-api não instalado, usando PostgreSQL padrão")
-                    self.database_url = self.database_url.replace('aurora+awsrdsdata', 'postgresql')
+                    database_url = database_url.replace('aurora+awsrdsdata', 'postgresql')
+                    if not read_only:
+                        self.database_url = database_url
                 
-                self.engine = create_engine(
-                    self.database_url,
-                    echo=os.getenv('SQL_ECHO', 'false').lower() == 'true'
+                # Data API usa HTTP: sem timeout de socket, mas o pool continua limitado
+                engine = create_engine(
+                    database_url,
+                    echo=echo,
+                    **pool_settings(self.pool_strategy)
+                )
+            elif database_url.startswith('sqlite'):
+                # Para SQLite local (testes e benchmarks); em memória mantém o pool padrão
+                em_memoria = database_url in ('sqlite://', 'sqlite:///:memory:')
+                engine = create_engine(
+                    database_url,
+                    echo=echo,
+                    connect_args={'timeout': connect_timeout, 'check_same_thread': False},
+                    **({} if em_memoria else pool_settings(self.pool_strategy))
                 )
             else:
-                # Para PostgreSQL tradicional
-                self.engine = create_engine(
-                    self.database_url,
-                    pool_size=5,
-                    max_overflow=10,
-                    echo=os.getenv('SQL_ECHO', 'false').lower() == 'true'
+                # Para PostgreSQL tradicional (ou RDS Proxy com DB_POOL_STRATEGY=null)
+                engine = create_engine(
+                    database_url,
+                    echo=echo,
+                    connect_args={'connect_timeout': connect_timeout},
+                    **pool_settings(self.pool_strategy)
                 )
+                if read_only:
+                    # Transações somente leitura nas réplicas
+                    engine = engine.execution_options(postgresql_readonly=True)
             
-            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-            logger.info("Configuração de banco de dados inicializada")
+            metrics.attach(engine)
+            instrument_engine(engine, prefix='db.reader' if read_only else 'db')
+            logger.info("Engine {} inicializada (pool: {})", 'de leitura' if read_only else 'do banco', type(engine.pool).__name__)
+            return engine
             
         except Exception as e:
             logger.error(f"Erro ao configurar banco de dados: {str(e)}")
             raise
     
     def create_tables(self):
-        """Cria todas as tabelas do banco"""
+        """Cria/atualiza o schema do banco aplicando as migrações pendentes"""
+        from app.utils.migrations import run_migrations
+        
         try:
-            Base.metadata.create_all(bind=self.engine)
-            logger.info("Tabelas criadas no banco de dados")
+            applied = run_migrations(self.engine)
+            logger.info(f"Schema do banco atualizado (migrações aplicadas: {applied or 'nenhuma'})")
         except Exception as e:
             logger.error(f"Erro ao criar tabelas: {str(e)}")
             raise
     
-    def get_session(self) -> Session:
-        """Retorna uma nova sessão do banco de dados"""
+    def get_session(self, read_only: bool = False) -> Session:
+        """
+        Retorna uma nova sessão do banco de dados
+        
+        Com read_only=True a sessão usa as réplicas de leitura (quando
+        configuradas); escritas e leituras logo após uma escrita devem usar
+        o writer.
+        """
+        metrics_registry.incr('db.sessions')
+        if read_only and self.has_reader:
+            return self.ReaderSessionLocal()
         return self.SessionLocal()
+    
+    def pool_status(self) -> dict:
+        """Métricas do pool de conexões (sem criar a engine)"""
+        status = self.metrics.snapshot()
+        if self._engine is not None:
+            status['pool'] = self._engine.pool.status()
+        if self._reader_engine is not None:
+            status['reader'] = {**self.reader_metrics.snapshot(), 'pool': self._reader_engine.pool.status()}
+        return status
+    
+    def dispose(self):
+        """Fecha as conexões do pool (ex: antes de um fork ou ao fim de um teste)"""
+        for engine in (self._engine, self._reader_engine):
+            if engine is not None:
+                engine.dispose()
 
-# Instância global da configuração
+# Instância global da configuração (não conecta nem cria a engine na importação)
 db_config = DatabaseConfig()
 
 def get_db_session() -> Generator[Session, None, None]:
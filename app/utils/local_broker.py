@@ -0,0 +1,441 @@
+"""
+Broker SQS/SNS em memória para execuções locais de ponta a ponta
+
+Substitui os clientes boto3 de SQS e SNS (MESSAGING_BACKEND=memory ou
+set_messaging_backend) por filas e tópicos em processo. As mensagens
+publicadas voltam para o orquestrador (handle_event) como eventos Lambda:
+
+- filas: entrega em lotes (como o event source mapping), com visibility
+  timeout, reentrega das mensagens em batchItemFailures e dead letter após
+  max_receives recebimentos
+- tópicos: cada publicação vira um evento SNS (uma notificação por
+  invocação, como na AWS) e é copiada para as filas assinantes
+- agendamentos: regras do CloudWatch disparadas a cada `interval` segundos
+
+Filas e tópicos desconhecidos são criados no primeiro uso, então as URLs e
+ARNs das variáveis de ambiente funcionam sem configuração.
+"""
+
+import hashlib
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+Handler = Callable[[Dict[str, Any], Any], Any]
+
+class LocalContext:
+    """Contexto Lambda mínimo (tempo restante e identificação da invocação)"""
+
+    def __init__(self, timeout: float = 300.0, function_name: str = 'local'):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(int((self._deadline - time.monotonic()) * 1000), 0)
+
+@dataclass
+class LocalMessage:
+    message_id: str
+    body: str
+    attributes: Dict[str, dict]
+    sent_at: float
+    receipt_handle: Optional[str] = None
+    visible_at: float = 0.0
+    receive_count: int = 0
+
+@dataclass
+class LocalQueue:
+    name: str
+    url: str
+    arn: str
+    visibility_timeout: float
+    batch_size: int
+    deliver: bool
+    messages: 'OrderedDict[str, LocalMessage]' = field(default_factory=OrderedDict)
+    dead_letters: List[LocalMessage] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=lambda: {'sent': 0, 'received': 0, 'deleted': 0, 'failed': 0, 'dead_letters': 0})
+
+@dataclass
+class LocalTopic:
+    name: str
+    arn: str
+    deliver: bool
+    subscriptions: List[str] = field(default_factory=list)
+    pending: List[dict] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=lambda: {'published': 0, 'delivered': 0})
+
+@dataclass
+class LocalSchedule:
+    rule_name: str
+    interval: float
+    next_run: float
+
+def _to_lambda_attributes(attributes: Dict[str, dict]) -> Dict[str, dict]:
+    """MessageAttributes do SQS no formato do evento Lambda (chaves em camelCase)"""
+    return {
+        name: {'stringValue': value.get('StringValue'), 'dataType': value.get('DataType', 'String')}
+        for name, value in attributes.items()
+    }
+
+class LocalSQSClient:
+    """Subconjunto da API do cliente SQS do boto3 usado pela aplicação"""
+
+    def __init__(self, broker: 'InMemoryBroker'):
+        self.broker = broker
+
+    def send_message(self, QueueUrl: str, MessageBody: str, MessageAttributes: Optional[dict] = None, **kwargs) -> dict:
+        message_id = self.broker.send(QueueUrl, MessageBody, MessageAttributes)
+        return {'MessageId': message_id, 'MD5OfMessageBody': hashlib.md5(MessageBody.encode()).hexdigest()}
+
+    def send_message_batch(self, QueueUrl: str, Entries: List[dict]) -> dict:
+        successful = [
+            {'Id': entry['Id'], 'MessageId': self.broker.send(QueueUrl, entry['MessageBody'], entry.get('MessageAttributes'))}
+            for entry in Entries
+        ]
+        return {'Successful': successful, 'Failed': []}
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int = 1, VisibilityTimeout: Optional[float] = None, **kwargs) -> dict:
+        messages = self.broker.receive(QueueUrl, MaxNumberOfMessages, VisibilityTimeout)
+        return {'Messages': [
+            {
+                'MessageId': message.message_id,
+                'ReceiptHandle': message.receipt_handle,
+                'Body': message.body,
+                'MessageAttributes': message.attributes,
+                'Attributes': {'ApproximateReceiveCount': str(message.receive_count)},
+            }
+            for message in messages
+        ]}
+
+    def delete_message(self, QueueUrl: str, ReceiptHandle: str) -> dict:
+        self.broker.delete(QueueUrl, ReceiptHandle)
+        return {}
+
+    def change_message_visibility(self, QueueUrl: str, ReceiptHandle: str, VisibilityTimeout: float) -> dict:
+        self.broker.change_visibility(QueueUrl, ReceiptHandle, VisibilityTimeout)
+        return {}
+
+    def create_queue(self, QueueName: str, **kwargs) -> dict:
+        return {'QueueUrl': self.broker.create_queue(QueueName)}
+
+    def get_queue_url(self, QueueName: str, **kwargs) -> dict:
+        return {'QueueUrl': self.broker.create_queue(QueueName)}
+
+class LocalSNSClient:
+    """Subconjunto da API do cliente SNS do boto3 usado pela aplicação"""
+
+    def __init__(self, broker: 'InMemoryBroker'):
+        self.broker = broker
+
+    def publish(self, TopicArn: str, Message: str, Subject: Optional[str] = None, MessageAttributes: Optional[dict] = None, **kwargs) -> dict:
+        return {'MessageId': self.broker.publish(TopicArn, Message, Subject, MessageAttributes)}
+
+    def create_topic(self, Name: str, **kwargs) -> dict:
+        return {'TopicArn': self.broker.create_topic(Name)}
+
+    def subscribe(self, TopicArn: str, Protocol: str, Endpoint: str, **kwargs) -> dict:
+        self.broker.subscribe(TopicArn, Endpoint)
+        return {'SubscriptionArn': f'{TopicArn}:{uuid.uuid4()}'}
+
+class InMemoryBroker:
+    """
+    Filas e tópicos em memória com entrega para um handler Lambda local
+
+    O broker é um backend de mensageria para app.utils.aws_config: get()
+    devolve clientes com a mesma interface dos clientes boto3 de SQS e SNS.
+    A entrega é feita por deliver()/run_until_idle(), na thread de quem chama;
+    publicações feitas durante a entrega só são entregues na rodada seguinte.
+    """
+
+    def __init__(self, handler: Optional[Handler] = None, batch_size: int = 10, visibility_timeout: float = 30.0,
+                 max_receives: int = 5, region: str = 'us-east-1', account_id: str = '000000000000'):
+        self._handler = handler
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.max_receives = max_receives
+        self.region = region
+        self.account_id = account_id
+        self.queues: Dict[str, LocalQueue] = {}
+        self.topics: Dict[str, LocalTopic] = {}
+        self.schedules: List[LocalSchedule] = []
+        self.invocations = 0
+        self._receipts = itertools.count()
+        self._lock = threading.RLock()
+        self._clients = {'sqs': LocalSQSClient(self), 'sns': LocalSNSClient(self)}
+
+    @property
+    def handler(self) -> Handler:
+        """Handler que recebe os eventos (padrão: o orquestrador)"""
+        if self._handler is None:
+            from app.handlers.orchestrator import handle_event
+            self._handler = handle_event
+        return self._handler
+
+    def get(self, service_name: str, region: Optional[str] = None):
+        """Mesma interface do AWSClientRegistry, para os serviços de mensageria"""
+        try:
+            return self._clients[service_name]
+        except KeyError:
+            raise ValueError(f"Serviço {service_name} não suportado pelo broker local") from None
+
+    # Filas
+
+    def create_queue(self, name_or_url: str, visibility_timeout: Optional[float] = None,
+                     batch_size: Optional[int] = None, deliver: bool = True) -> str:
+        """Cria (ou retorna) a fila; aceita o nome ou a URL completa"""
+        with self._lock:
+            queue = self._find_queue(name_or_url)
+            if queue is None:
+                name = name_or_url.rstrip('/').rsplit('/', 1)[-1]
+                url = name_or_url if '://' in name_or_url else f'https://sqs.{self.region}.amazonaws.com/{self.account_id}/{name}'
+                queue = LocalQueue(
+                    name=name,
+                    url=url,
+                    arn=f'arn:aws:sqs:{self.region}:{self.account_id}:{name}',
+                    visibility_timeout=self.visibility_timeout if visibility_timeout is None else visibility_timeout,
+                    batch_size=batch_size or self.batch_size,
+                    deliver=deliver,
+                )
+                self.queues[url] = queue
+            return queue.url
+
+    def _find_queue(self, name_or_url: str) -> Optional[LocalQueue]:
+        queue = self.queues.get(name_or_url)
+        if queue is None:
+            queue = next((queue for queue in self.queues.values() if name_or_url in (queue.name, queue.arn)), None)
+        return queue
+
+    def _queue(self, name_or_url: str) -> LocalQueue:
+        with self._lock:
+            return self._find_queue(name_or_url) or self.queues[self.create_queue(name_or_url)]
+
+    def send(self, queue_url: str, body: str, attributes: Optional[dict] = None) -> str:
+        message = LocalMessage(message_id=str(uuid.uuid4()), body=body, attributes=attributes or {}, sent_at=time.time())
+        with self._lock:
+            queue = self._queue(queue_url)
+            queue.messages[message.message_id] = message
+            queue.stats['sent'] += 1
+        return message.message_id
+
+    def receive(self, queue_url: str, max_messages: int = 10, visibility_timeout: Optional[float] = None) -> List[LocalMessage]:
+        """Recebe até `max_messages` mensagens visíveis, ocultando-as pelo visibility timeout"""
+        agora = time.monotonic()
+        recebidas = []
+        with self._lock:
+            queue = self._queue(queue_url)
+            timeout = queue.visibility_timeout if visibility_timeout is None else visibility_timeout
+            for message in list(queue.messages.values()):
+                if len(recebidas) >= max_messages:
+                    break
+                if message.visible_at > agora:
+                    continue
+                if message.receive_count >= self.max_receives:
+                    # Excedeu o limite de recebimentos: vai para a dead letter
+                    del queue.messages[message.message_id]
+                    queue.dead_letters.append(message)
+                    queue.stats['dead_letters'] += 1
+                    continue
+                message.receive_count += 1
+                message.receipt_handle = f'{message.message_id}#{next(self._receipts)}'
+                message.visible_at = agora + timeout
+                recebidas.append(message)
+            queue.stats['received'] += len(recebidas)
+        return recebidas
+
+    def delete(self, queue_url: str, receipt_handle: str):
+        with self._lock:
+            queue = self._queue(queue_url)
+            message = queue.messages.get(receipt_handle.split('#', 1)[0])
+            if message is not None and message.receipt_handle == receipt_handle:
+                del queue.messages[message.message_id]
+                queue.stats['deleted'] += 1
+
+    def change_visibility(self, queue_url: str, receipt_handle: str, timeout: float):
+        with self._lock:
+            queue = self._queue(queue_url)
+            message = queue.messages.get(receipt_handle.split('#', 1)[0])
+            if message is not None and message.receipt_handle == receipt_handle:
+                message.visible_at = time.monotonic() + timeout
+
+    # Tópicos
+
+    def create_topic(self, name_or_arn: str, deliver: bool = True) -> str:
+        """Cria (ou retorna) o tópico; aceita o nome ou o ARN"""
+        with self._lock:
+            name = name_or_arn.rsplit(':', 1)[-1]
+            arn = name_or_arn if name_or_arn.startswith('arn:') else f'arn:aws:sns:{self.region}:{self.account_id}:{name}'
+            if arn not in self.topics:
+                self.topics[arn] = LocalTopic(name=name, arn=arn, deliver=deliver)
+            return arn
+
+    def subscribe(self, topic_arn: str, queue_url: str):
+        """Assina uma fila no tópico (entrega bruta: o corpo é a mensagem publicada)"""
+        with self._lock:
+            topic = self.topics[self.create_topic(topic_arn)]
+            topic.subscriptions.append(self.create_queue(queue_url))
+
+    def publish(self, topic_arn: str, message: str, subject: Optional[str] = None, attributes: Optional[dict] = None) -> str:
+        message_id = str(uuid.uuid4())
+        with self._lock:
+            topic = self.topics[self.create_topic(topic_arn)]
+            topic.stats['published'] += 1
+            if topic.deliver:
+                topic.pending.append({
+                    'Type': 'Notification',
+                    'MessageId': message_id,
+                    'TopicArn': topic.arn,
+                    'Subject': subject,
+                    'Message': message,
+                    'Timestamp': datetime.now(timezone.utc).isoformat(),
+                    'MessageAttributes': {
+                        name: {'Type': value.get('DataType', 'String'), 'Value': value.get('StringValue')}
+                        for name, value in (attributes or {}).items()
+                    },
+                })
+            for queue_url in topic.subscriptions:
+                self.send(queue_url, message, attributes)
+        return message_id
+
+    # Agendamentos
+
+    def schedule(self, rule_name: str, interval: float):
+        """Dispara a regra do CloudWatch `rule_name` a cada `interval` segundos durante run_until_idle"""
+        self.schedules.append(LocalSchedule(rule_name=rule_name, interval=interval, next_run=time.monotonic()))
+
+    # Entrega
+
+    def invoke(self, event: Dict[str, Any], context: Any = None) -> Any:
+        """Invoca o handler como a Lambda faria"""
+        with self._lock:
+            self.invocations += 1
+        return self.handler(event, context or LocalContext())
+
+    def _sqs_event(self, queue: LocalQueue, messages: List[LocalMessage]) -> dict:
+        return {'Records': [
+            {
+                'messageId': message.message_id,
+                'receiptHandle': message.receipt_handle,
+                'body': message.body,
+                'attributes': {
+                    'ApproximateReceiveCount': str(message.receive_count),
+                    'SentTimestamp': str(int(message.sent_at * 1000)),
+                },
+                'messageAttributes': _to_lambda_attributes(message.attributes),
+                'md5OfBody': hashlib.md5(message.body.encode()).hexdigest(),
+                'eventSource': 'aws:sqs',
+                'eventSourceARN': queue.arn,
+                'awsRegion': self.region,
+            }
+            for message in messages
+        ]}
+
+    def _deliver_queue(self, queue: LocalQueue) -> int:
+        """Entrega um lote da fila; mensagens em batchItemFailures (ou de uma invocação com erro) voltam após o visibility timeout"""
+        messages = self.receive(queue.url, queue.batch_size)
+        if not messages:
+            return 0
+
+        try:
+            response = self.invoke(self._sqs_event(queue, messages))
+            failed = {item['itemIdentifier'] for item in (response or {}).get('batchItemFailures', [])}
+        except Exception:
+            failed = {message.message_id for message in messages}
+
+        for message in messages:
+            if message.message_id in failed:
+                with self._lock:
+                    queue.stats['failed'] += 1
+            else:
+                self.delete(queue.url, message.receipt_handle)
+        return len(messages)
+
+    def _deliver_topic(self, topic: LocalTopic) -> int:
+        with self._lock:
+            notifications, topic.pending = topic.pending, []
+        for notification in notifications:
+            self.invoke({'Records': [{
+                'EventSource': 'aws:sns',
+                'EventVersion': '1.0',
+                'EventSubscriptionArn': f'{topic.arn}:local',
+                'Sns': notification,
+            }]})
+        topic.stats['delivered'] += len(notifications)
+        return len(notifications)
+
+    def _run_schedules(self) -> int:
+        agora = time.monotonic()
+        disparadas = 0
+        for schedule in self.schedules:
+            if schedule.next_run <= agora:
+                schedule.next_run = agora + schedule.interval
+                self.invoke({
+                    'source': 'aws.events',
+                    'detail-type': 'Scheduled Event',
+                    'time': datetime.now(timezone.utc).isoformat(),
+                    'detail': {'rule-name': schedule.rule_name},
+                })
+                disparadas += 1
+        return disparadas
+
+    def deliver(self) -> int:
+        """Uma rodada de entrega: agendamentos vencidos, um lote por fila e as notificações pendentes"""
+        self._run_schedules()
+        entregues = 0
+        for queue in list(self.queues.values()):
+            if queue.deliver:
+                entregues += self._deliver_queue(queue)
+        for topic in list(self.topics.values()):
+            if topic.deliver:
+                entregues += self._deliver_topic(topic)
+        return entregues
+
+    def pending(self) -> int:
+        """Mensagens ainda não entregues (inclusive as ocultas pelo visibility timeout)"""
+        with self._lock:
+            return (
+                sum(len(queue.messages) for queue in self.queues.values() if queue.deliver)
+                + sum(len(topic.pending) for topic in self.topics.values() if topic.deliver)
+            )
+
+    def run_until_idle(self, timeout: float = 60.0, idle_rounds: int = 1, poll_interval: float = 0.01) -> int:
+        """
+        Entrega até não haver mais mensagens pendentes (ou até `timeout` segundos)
+
+        Com agendamentos, espera `idle_rounds` disparos sem novas mensagens
+        antes de parar (ex: a regra drenar-outbox, que publica o que ficou na
+        outbox). Retorna quantas mensagens e notificações foram entregues.
+        """
+        limite = time.monotonic() + timeout
+        total = 0
+        ociosas = 0
+        while time.monotonic() < limite:
+            entregues = self.deliver()
+            total += entregues
+            if entregues:
+                ociosas = 0
+            elif self.pending():
+                # Só restam mensagens ocultas pelo visibility timeout
+                time.sleep(poll_interval)
+            elif not self.schedules:
+                break
+            else:
+                ociosas += 1
+                if ociosas > idle_rounds:
+                    break
+                proximo = min(schedule.next_run for schedule in self.schedules)
+                time.sleep(max(proximo - time.monotonic(), 0))
+        return total
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'invocations': self.invocations,
+                'queues': {queue.name: dict(queue.stats, in_flight=len(queue.messages)) for queue in self.queues.values()},
+                'topics': {topic.name: dict(topic.stats) for topic in self.topics.values()},
+            }
@@ -1,49 +1,127 @@
+import json
+import random
 import sys
+import threading
 from loguru import logger
 import os
 
-def configure_logger():
-    """Configura o logger com formato estruturado"""
-    # Remove o logger padrão
-    logger.remove()
-    
-    # Formato para desenvolvimento local
-    format_local = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
-    
-    # Formato para produção (Lambda)
-    format_lambda = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} - {message}"
-    
-    # Determinar se está rodando em Lambda
-    is_lambda = os.getenv('AWS_LAMBDA_FUNCTION_NAME') is not None
-    
-    if is_lambda:
-        # Em Lambda, usar stdout com formato simples
-        logger.add(
-            sys.stdout,
-            format=format_lambda,
-            level="INFO",
-            serialize=False
-        )
-    else:
-        # Desenvolvimento local
-        logger.add(
-            sys.stdout,
-            format=format_local,
-            level="DEBUG",
-            colorize=True
-        )
-        
-        # Arquivo de log para desenvolvimento
-        logger.add(
-            "logs/app.log",
-            format=format_lambda,
-            level="INFO",
-            rotation="1 day",
-            retention="7 days",
-            compression="zip"
-        )
+_configured = False
+_configure_lock = threading.Lock()
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+def configure_logger(force: bool = False):
+    """
+    Configura o logger com formato estruturado (uma única vez por processo)
+
+    Variáveis de ambiente:
+        LOG_LEVEL: nível mínimo (padrão INFO na Lambda, DEBUG local)
+        LOG_JSON: saída JSON estruturada (serialize do loguru)
+        LOG_ENQUEUE: grava os logs numa thread de fundo (não bloqueia o handler)
+        LOG_FILE: arquivo de log local (padrão logs/app.log; vazio desativa)
+    """
+    global _configured
+    if _configured and not force:
+        return
+
+    with _configure_lock:
+        if _configured and not force:
+            return
+
+        # Remove o logger padrão
+        logger.remove()
+
+        # Formato para desenvolvimento local
+        format_local = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+        # Formato para produção (Lambda)
+        format_lambda = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} - {message}"
+
+        # Determinar se está rodando em Lambda
+        is_lambda = os.getenv('AWS_LAMBDA_FUNCTION_NAME') is not None
+        level = os.getenv('LOG_LEVEL', 'INFO' if is_lambda else 'DEBUG').upper()
+        serialize = _env_flag('LOG_JSON')
+        enqueue = _env_flag('LOG_ENQUEUE')
+
+        if is_lambda:
+            # Em Lambda, usar stdout com formato simples
+            logger.add(
+                sys.stdout,
+                format=format_lambda,
+                level=level,
+                serialize=serialize,
+                enqueue=enqueue
+            )
+        else:
+            # Desenvolvimento local
+            logger.add(
+                sys.stdout,
+                format=format_local,
+                level=level,
+                colorize=not serialize,
+                serialize=serialize,
+                enqueue=enqueue
+            )
+
+            # Arquivo de log para desenvolvimento
+            log_file = os.getenv('LOG_FILE', 'logs/app.log')
+            if log_file:
+                logger.add(
+                    log_file,
+                    format=format_lambda,
+                    level="INFO",
+                    rotation="1 day",
+                    retention="7 days",
+                    compression="zip",
+                    serialize=serialize,
+                    enqueue=enqueue
+                )
+
+        _configured = True
 
 def get_logger(name: str = __name__):
     """Retorna logger configurado"""
     configure_logger()
     return logger.bind(service=name)
+
+def flush_logs():
+    """Aguarda a gravação dos logs enfileirados (chamar ao fim da invocação)"""
+    logger.complete()
+
+def truncate_payload(payload, max_bytes: int = None) -> str:
+    """
+    Serializa o payload em JSON limitado a `max_bytes` bytes em UTF-8
+
+    A serialização é incremental e para assim que o limite é atingido, então
+    o custo não cresce com o tamanho do payload (ex: lotes SQS grandes). O
+    corte nunca divide um caractere multibyte.
+    """
+    if max_bytes is None:
+        max_bytes = int(os.getenv('LOG_PAYLOAD_MAX_BYTES', '2048'))
+
+    partes = []
+    tamanho = 0
+    for parte in json.JSONEncoder(default=str, ensure_ascii=False).iterencode(payload):
+        parte = parte.encode()
+        partes.append(parte)
+        tamanho += len(parte)
+        if tamanho > max_bytes:
+            texto = b''.join(partes)[:max_bytes].decode(errors='ignore')
+            return texto + f"... [truncado em {max_bytes} bytes]"
+    return b''.join(partes).decode()
+
+def log_payload(log, message: str, payload, level: str = "INFO", sample_rate: float = None):
+    """
+    Registra um payload com tamanho limitado e amostragem
+
+    A serialização só acontece se o nível estiver habilitado em algum sink
+    (opt(lazy=True)) e se a mensagem for sorteada pela amostragem
+    (LOG_PAYLOAD_SAMPLE_RATE, de 0 a 1).
+    """
+    if sample_rate is None:
+        sample_rate = float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', '1'))
+    if sample_rate < 1 and random.random() >= sample_rate:
+        return
+
+    log.opt(lazy=True, depth=1).log(level, message + ": {}", lambda: truncate_payload(payload))
@@ -0,0 +1,312 @@
+"""
+Métricas por invocação: contadores, gauges e histogramas de latência
+
+O registro acumula dois níveis:
+
+- da invocação: o que foi medido desde o último flush(), emitido uma vez
+  por invocação em CloudWatch Embedded Metric Format (uma linha JSON no
+  stdout, que o CloudWatch Logs converte em métricas sem PutMetricData)
+- do processo: totais desde o cold start, com histogramas de buckets fixos,
+  expostos pelo /health
+
+Cada medição custa um lock e algumas operações em dicionário; não há I/O
+fora do flush. As latências da invocação são agregadas na chegada (valor
+com EMF_SIGNIFICANT_DIGITS algarismos -> contagem), então a memória não
+cresce com a quantidade de medições mesmo sem flush(). Variáveis de ambiente:
+
+    METRICS_ENABLED: liga/desliga a coleta (padrão true)
+    METRICS_EMF: emite EMF no flush (padrão: só dentro da Lambda)
+    METRICS_NAMESPACE: namespace no CloudWatch (padrão ContasAPagar)
+"""
+
+import bisect
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Limites superiores (ms) dos buckets de latência; o último é +inf
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# EMF aceita até 100 valores por métrica em cada documento; acima disso os
+# valores são divididos em vários documentos
+EMF_MAX_VALUES = 100
+
+# Precisão das latências da invocação (algarismos significativos)
+EMF_SIGNIFICANT_DIGITS = 3
+
+Dimensions = Tuple[Tuple[str, str], ...]
+MetricKey = Tuple[str, Dimensions]
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+def _key(name: str, dimensions: Dict[str, str]) -> MetricKey:
+    return name, (tuple(sorted(dimensions.items())) if dimensions else ())
+
+def _quantize(value: float) -> float:
+    return float(f'{value:.{EMF_SIGNIFICANT_DIGITS}g}')
+
+def _chunks(counts: Dict[float, int]) -> List[List[float]]:
+    """Valores agregados expandidos em blocos de até EMF_MAX_VALUES"""
+    expandidos = list(itertools.chain.from_iterable(itertools.repeat(valor, quantidade) for valor, quantidade in sorted(counts.items())))
+    return [expandidos[inicio:inicio + EMF_MAX_VALUES] for inicio in range(0, len(expandidos), EMF_MAX_VALUES)]
+
+def _label(key: MetricKey) -> str:
+    name, dimensions = key
+    if not dimensions:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in dimensions)}]"
+
+class Histogram:
+    """Histograma de buckets fixos (contagem, soma, mínimo, máximo e percentis aproximados)"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Limite superior do bucket que contém o percentil `q` (0-100), limitado ao máximo observado"""
+        if not self.count:
+            return 0.0
+        alvo = self.count * q / 100
+        acumulado = 0
+        for indice, quantidade in enumerate(self.counts):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                limite = self.buckets[indice] if indice < len(self.buckets) else self.max
+                return min(limite, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        if not self.count:
+            return {'count': 0}
+        rotulos = [f'le_{limite}' for limite in self.buckets] + ['le_inf']
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'min': round(self.min, 3),
+            'max': round(self.max, 3),
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+            'buckets': {rotulo: quantidade for rotulo, quantidade in zip(rotulos, self.counts) if quantidade},
+        }
+
+class MetricsRegistry:
+    """Registro de métricas do processo, com flush por invocação"""
+
+    def __init__(self, enabled: Optional[bool] = None, namespace: Optional[str] = None,
+                 emf: Optional[bool] = None, stream=None):
+        self.enabled = _env_flag('METRICS_ENABLED', True) if enabled is None else enabled
+        self.namespace = namespace or os.getenv('METRICS_NAMESPACE', 'ContasAPagar')
+        in_lambda = os.getenv('AWS_LAMBDA_FUNCTION_NAME') is not None
+        self.emf = _env_flag('METRICS_EMF', in_lambda) if emf is None else emf
+        self.service = os.getenv('AWS_LAMBDA_FUNCTION_NAME', 'contas-a-pagar')
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._invocations = 0
+        self.reset()
+
+    def reset(self):
+        """Descarta tudo o que foi medido (útil em testes)"""
+        with self._lock:
+            self._counters: Dict[MetricKey, float] = {}
+            self._gauges: Dict[MetricKey, float] = {}
+            self._histograms: Dict[MetricKey, Histogram] = {}
+            self._pending_counters: Dict[MetricKey, float] = {}
+            self._pending_gauges: Dict[MetricKey, float] = {}
+            self._pending_values: Dict[MetricKey, Dict[float, int]] = {}
+
+    # Medições
+
+    def incr(self, name: str, value: float = 1, **dimensions: str):
+        if not self.enabled:
+            return
+        key = _key(name, dimensions)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._pending_counters[key] = self._pending_counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **dimensions: str):
+        if not self.enabled:
+            return
+        key = _key(name, dimensions)
+        with self._lock:
+            self._gauges[key] = value
+            self._pending_gauges[key] = value
+
+    def observe(self, name: str, value_ms: float, **dimensions: str):
+        """Registra uma latência (ms) no histograma do processo e nos valores da invocação"""
+        if not self.enabled:
+            return
+        key = _key(name, dimensions)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value_ms)
+            valores = self._pending_values.get(key)
+            if valores is None:
+                valores = self._pending_values[key] = {}
+            valor = _quantize(value_ms)
+            valores[valor] = valores.get(valor, 0) + 1
+
+    @contextmanager
+    def timer(self, name: str, **dimensions: str) -> Iterator[None]:
+        """Mede o bloco; exceções também contam em `<name>.errors`"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.incr(f'{name}.errors', **dimensions)
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - inicio) * 1000, **dimensions)
+
+    def timed(self, name: str, **dimensions: str) -> Callable:
+        """Decorator equivalente a timer()"""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **dimensions):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # Saída
+
+    def _take_pending(self):
+        with self._lock:
+            pending = (self._pending_counters, self._pending_gauges, self._pending_values)
+            self._pending_counters, self._pending_gauges, self._pending_values = {}, {}, {}
+            self._invocations += 1
+        return pending
+
+    def emf_documents(self, counters: Dict[MetricKey, float], gauges: Dict[MetricKey, float],
+                      values: Dict[MetricKey, Dict[float, int]], timestamp_ms: Optional[int] = None) -> List[dict]:
+        """
+        Monta um documento EMF por conjunto de dimensões; latências com mais
+        de EMF_MAX_VALUES amostras continuam em documentos adicionais
+        """
+        timestamp_ms = timestamp_ms or int(time.time() * 1000)
+        grupos: Dict[Tuple[Dimensions, int], dict] = {}
+        medidas = itertools.chain(
+            ((key, 0, value, 'Count') for key, value in counters.items()),
+            ((key, 0, value, 'None') for key, value in gauges.items()),
+            ((key, parte, bloco, 'Milliseconds') for key, value in values.items() for parte, bloco in enumerate(_chunks(value))),
+        )
+        for (name, dimensions), parte, value, unit in medidas:
+            documento = grupos.get((dimensions, parte))
+            if documento is None:
+                documento = grupos[(dimensions, parte)] = {
+                    '_aws': {
+                        'Timestamp': timestamp_ms,
+                        'CloudWatchMetrics': [{
+                            'Namespace': self.namespace,
+                            'Dimensions': [['Service', *(k for k, _ in dimensions)]],
+                            'Metrics': [],
+                        }],
+                    },
+                    'Service': self.service,
+                    **dict(dimensions),
+                }
+            documento['_aws']['CloudWatchMetrics'][0]['Metrics'].append({'Name': name, 'Unit': unit})
+            documento[name] = value
+        return list(grupos.values())
+
+    def flush(self) -> List[dict]:
+        """
+        Fecha a invocação: emite em EMF o que foi medido desde o último flush
+        (se METRICS_EMF) e zera as medições da invocação
+        """
+        if not self.enabled:
+            return []
+        counters, gauges, values = self._take_pending()
+        if not (counters or gauges or values):
+            return []
+        documentos = self.emf_documents(counters, gauges, values)
+        if self.emf:
+            stream = self.stream or sys.stdout
+            stream.write(''.join(json.dumps(documento, separators=(',', ':')) + '\n' for documento in documentos))
+            stream.flush()
+        return documentos
+
+    def snapshot(self) -> dict:
+        """Totais do processo desde o cold start (para o /health)"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'uptime_s': round(time.time() - self._started, 1),
+                'invocations': self._invocations,
+                'counters': {_label(key): value for key, value in self._counters.items()},
+                'gauges': {_label(key): value for key, value in self._gauges.items()},
+                'histograms': {_label(key): histogram.snapshot() for key, histogram in self._histograms.items()},
+            }
+
+def instrument_engine(engine, registry: Optional['MetricsRegistry'] = None, prefix: str = 'db'):
+    """
+    Mede o tempo de cada comando SQL (`<prefix>.query`) e o tempo em que
+    cada conexão fica fora do pool (`<prefix>.connection`)
+    """
+    from sqlalchemy import event
+
+    registry = registry or metrics
+    if not registry.enabled:
+        return
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get('metrics_query_start')
+        if inicios:
+            registry.observe(f'{prefix}.query', (time.perf_counter() - inicios.pop()) * 1000)
+
+    def handle_error(context):
+        conn = context.connection
+        inicios = conn.info.get('metrics_query_start') if conn is not None else None
+        if inicios:
+            inicios.pop()
+        registry.incr(f'{prefix}.query.errors')
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['metrics_checkout'] = time.perf_counter()
+
+    def checkin(dbapi_connection, connection_record):
+        inicio = connection_record.info.pop('metrics_checkout', None)
+        if inicio is not None:
+            registry.observe(f'{prefix}.connection', (time.perf_counter() - inicio) * 1000)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(engine, 'handle_error', handle_error)
+    event.listen(engine, 'checkout', checkout)
+    event.listen(engine, 'checkin', checkin)
+
+# Registro global do processo
+metrics = MetricsRegistry()
@@ -0,0 +1,162 @@
+"""
+Migrações versionadas do schema do banco de dados
+
+Cada migração é registrada em MIGRATIONS com um número de versão crescente.
+A versão aplicada fica gravada na tabela schema_migrations; rodar as
+migrações novamente só aplica as versões pendentes.
+"""
+
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import (
+    Column, Date, DateTime, Enum, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    func, insert, inspect, select, text
+)
+from sqlalchemy.engine import Connection, Engine
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Chave do advisory lock usado no PostgreSQL para serializar migrações concorrentes
+MIGRATION_LOCK_KEY = 724_001
+
+class MigrationError(Exception):
+    """Migração que não pode ser aplicada sem intervenção nos dados"""
+
+schema_migrations = Table(
+    'schema_migrations',
+    MetaData(),
+    Column('versao', Integer, primary_key=True),
+    Column('descricao', String),
+    Column('aplicada_em', DateTime)
+)
+
+# Tabelas como eram em cada versão. As migrações não usam os models: uma
+# coluna nova no model não pode mudar o que uma migração antiga cria.
+
+_v1 = MetaData()
+
+_fornecedores_v1 = Table(
+    'fornecedores', _v1,
+    Column('id', Integer, primary_key=True),
+    Column('nome', String),
+    Column('documento', String),
+    Column('email', String),
+    Column('telefone', String)
+)
+
+_contas_v1 = Table(
+    'contas', _v1,
+    Column('id', Integer, primary_key=True),
+    Column('descricao', String),
+    Column('valor', Float),
+    Column('vencimento', Date),
+    Column('status', Enum('ABERTA', 'PAGA', 'ATRASADA', name='status')),
+    Column('fornecedor_id', Integer, ForeignKey('fornecedores.id'))
+)
+
+# Índices declarados numa cópia das tabelas, para não entrarem no create da versão 1
+_v2 = MetaData()
+_fornecedores_v2 = _fornecedores_v1.to_metadata(_v2)
+_contas_v2 = _contas_v1.to_metadata(_v2)
+
+_indexes_v2 = (
+    Index('ix_contas_status_vencimento', _contas_v2.c.status, _contas_v2.c.vencimento, _contas_v2.c.id),
+    Index('ix_contas_fornecedor_vencimento', _contas_v2.c.fornecedor_id, _contas_v2.c.vencimento, _contas_v2.c.id),
+    Index('ix_contas_vencimento_id', _contas_v2.c.vencimento, _contas_v2.c.id),
+)
+
+_ux_fornecedores_documento_v2 = Index('ux_fornecedores_documento', _fornecedores_v2.c.documento, unique=True)
+
+_outbox_v3 = Table(
+    'outbox', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('destino', String, nullable=False),
+    Column('corpo', Text, nullable=False),
+    Column('tentativas', Integer, nullable=False, default=0),
+    Column('criada_em', DateTime, nullable=False, server_default=func.now())
+)
+
+def _create_base_tables(conn: Connection):
+    """Cria as tabelas de fornecedores e contas"""
+    _v1.create_all(bind=conn, tables=[_fornecedores_v1, _contas_v1], checkfirst=True)
+
+def _check_documentos_unicos(conn: Connection, exemplos: int = 10):
+    """Falha com os documentos repetidos antes de criar o índice único"""
+    documento = _fornecedores_v2.c.documento
+    repetidos = conn.execute(
+        select(documento, func.count())
+        .where(documento.is_not(None))
+        .group_by(documento)
+        .having(func.count() > 1)
+        .order_by(documento)
+        .limit(exemplos)
+    ).all()
+    if repetidos:
+        lista = ', '.join(f"{valor} ({quantidade}x)" for valor, quantidade in repetidos)
+        raise MigrationError(
+            f"fornecedores com documento repetido impedem o índice único ux_fornecedores_documento: {lista}; "
+            "unifique os cadastros e rode as migrações novamente"
+        )
+
+def _create_indexes(conn: Connection):
+    """Cria os índices compostos de contas e o índice único de documento"""
+    _check_documentos_unicos(conn)
+    for index in (*_indexes_v2, _ux_fornecedores_documento_v2):
+        index.create(bind=conn, checkfirst=True)
+
+def _create_outbox(conn: Connection):
+    """Cria a tabela de outbox das mensagens SQS"""
+    _outbox_v3.create(bind=conn, checkfirst=True)
+
+def _add_outbox_atributos(conn: Connection):
+    """Adiciona à outbox a coluna com os MessageAttributes (contexto de trace) das mensagens"""
+    colunas = {coluna['name'] for coluna in inspect(conn).get_columns('outbox')}
+    if 'atributos' not in colunas:
+        conn.execute(text("ALTER TABLE outbox ADD COLUMN atributos TEXT"))
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Cria tabelas fornecedores e contas", _create_base_tables),
+    (2, "Cria índices de contas e índice único de documento do fornecedor", _create_indexes),
+    (3, "Cria tabela outbox", _create_outbox),
+    (4, "Adiciona coluna atributos na outbox", _add_outbox_atributos),
+]
+
+def current_version(conn: Connection) -> int:
+    """Retorna a última versão aplicada (0 se nenhuma)"""
+    schema_migrations.create(bind=conn, checkfirst=True)
+    return conn.execute(select(func.coalesce(func.max(schema_migrations.c.versao), 0))).scalar()
+
+def run_migrations(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    Aplica as migrações pendentes, cada uma em sua própria transação
+
+    Args:
+        engine: Engine do SQLAlchemy
+        target: Versão máxima a aplicar (padrão: todas)
+
+    Returns:
+        Lista das versões aplicadas nesta execução
+    """
+    applied = []
+
+    for version, description, migrate in MIGRATIONS:
+        if target is not None and version > target:
+            break
+
+        with engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+
+            if current_version(conn) >= version:
+                continue
+
+            logger.info(f"Aplicando migração {version}: {description}")
+            migrate(conn)
+            conn.execute(insert(schema_migrations).values(
+                versao=version,
+                descricao=description,
+                aplicada_em=func.now()
+            ))
+            applied.append(version)
+
+    return applied
@@ -0,0 +1,101 @@
+"""
+Verificação dos planos de execução das consultas críticas dos repositórios
+
+Roda EXPLAIN (PostgreSQL) ou EXPLAIN QUERY PLAN (SQLite) nas consultas mais
+frequentes e confere se cada uma usa o índice esperado.
+
+Uso local (contra o banco configurado em DATABASE_URL / DB_*):
+    python -m app.utils.query_plans
+"""
+
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, Tuple
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.conta import Status
+from app.models.fornecedor import Fornecedor
+from app.repositories.conta_repository import TAMANHO_LOTE_ATRASADAS, ContaRepository
+
+def hot_queries(session: Session) -> Dict[str, Tuple[Any, str]]:
+    """
+    Consultas críticas e o índice que cada uma deve usar
+
+    As consultas são as mesmas que os repositórios executam (montadas pelos
+    métodos consulta*/update_* de ContaRepository), não cópias delas.
+    """
+    repo_conta = ContaRepository(session)
+    hoje = date.today()
+
+    return {
+        'listar_por_status': (
+            repo_conta.consulta(status=Status.ABERTA).statement,
+            'ix_contas_status_vencimento'
+        ),
+        'listar_contas_vencendo': (
+            repo_conta.consulta(status=Status.ABERTA, data_inicio=hoje, data_fim=hoje + timedelta(days=7)).statement,
+            'ix_contas_status_vencimento'
+        ),
+        'listar_por_fornecedor': (
+            repo_conta.consulta(fornecedor_id=1).statement,
+            'ix_contas_fornecedor_vencimento'
+        ),
+        'listar_pagina': (
+            repo_conta.consulta_pagina(50).statement,
+            'ix_contas_vencimento_id'
+        ),
+        'atualizar_status_atrasadas_fim_lote': (
+            ContaRepository.consulta_fim_lote_atrasadas(hoje, 0, TAMANHO_LOTE_ATRASADAS),
+            'ix_contas_status_vencimento'
+        ),
+        'atualizar_status_atrasadas_update': (
+            ContaRepository.update_lote_atrasadas(hoje, 0, TAMANHO_LOTE_ATRASADAS),
+            'ix_contas_status_vencimento'
+        ),
+        'buscar_por_documento': (
+            select(Fornecedor).where(Fornecedor.documento == '00000000000000'),
+            'ux_fornecedores_documento'
+        ),
+    }
+
+def explain_hot_queries(engine: Engine) -> Dict[str, Dict[str, Any]]:
+    """
+    Executa EXPLAIN nas consultas críticas
+
+    No PostgreSQL o seq scan é desabilitado durante a verificação para que o
+    resultado não dependa do volume de dados da base local.
+
+    Returns:
+        Dicionário {consulta: {'index', 'uses_index', 'plan'}}
+    """
+    results = {}
+
+    with engine.connect() as conn:
+        with conn.begin():
+            if conn.dialect.name == 'postgresql':
+                conn.execute(text("SET LOCAL enable_seqscan = off"))
+                prefix = "EXPLAIN"
+            else:
+                prefix = "EXPLAIN QUERY PLAN"
+
+            session = Session(bind=conn)
+            for name, (statement, index) in hot_queries(session).items():
+                sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+                rows = conn.execute(text(f"{prefix} {sql}")).fetchall()
+                plan = "\n".join(str(row[-1]) for row in rows)
+                results[name] = {
+                    'index': index,
+                    'uses_index': index in plan,
+                    'plan': plan
+                }
+            session.close()
+
+    return results
+
+if __name__ == "__main__":
+    from app.utils.database import db_config
+
+    results = explain_hot_queries(db_config.engine)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    raise SystemExit(0 if all(result['uses_index'] for result in results.values()) else 1)
@@ -0,0 +1,71 @@
+"""
+Serialização de respostas e mensagens
+
+Modelos ORM são convertidos para JSON através de TypeAdapters do Pydantic v2
+compilados uma única vez (validação e serialização em Rust, direto para
+bytes). Para dicionários montados à mão (mensagens SQS, corpos de erro) usa
+o orjson (requirements.txt) e, na falta dele, o json da biblioteca padrão;
+date/datetime, Enum e chaves não-string (ex: ids inteiros) são serializados
+igualmente nos dois casos.
+"""
+
+import enum
+import json
+from datetime import date
+from typing import Any, Iterable, List, Optional
+from pydantic import TypeAdapter
+from app.schemas.conta_schema import ContaPaginaResponse, ContaResponse
+from app.schemas.fornecedor_schema import FornecedorResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+# Chaves int/date como no json da biblioteca padrão
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+CONTA_ADAPTER = TypeAdapter(ContaResponse)
+CONTAS_ADAPTER = TypeAdapter(List[ContaResponse])
+PAGINA_CONTAS_ADAPTER = TypeAdapter(ContaPaginaResponse)
+FORNECEDOR_ADAPTER = TypeAdapter(FornecedorResponse)
+FORNECEDORES_ADAPTER = TypeAdapter(List[FornecedorResponse])
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_bytes(data: Any) -> bytes:
+    """Serializa estruturas simples (dict/list) para JSON em bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+def dumps(data: Any) -> str:
+    """Serializa estruturas simples (dict/list) para JSON em texto"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS).decode()
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+def model_json(adapter: TypeAdapter, value: Any) -> str:
+    """Valida objetos ORM (from_attributes) e serializa com o adapter informado"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True)).decode()
+
+def conta_json(conta) -> str:
+    return model_json(CONTA_ADAPTER, conta)
+
+def contas_json(contas: Iterable) -> str:
+    return model_json(CONTAS_ADAPTER, list(contas))
+
+def pagina_contas_json(contas: List, next_cursor: Optional[str]) -> str:
+    """Corpo da listagem paginada: {'items', 'count', 'next_cursor'}"""
+    return model_json(PAGINA_CONTAS_ADAPTER, {'items': contas, 'count': len(contas), 'next_cursor': next_cursor})
+
+def fornecedor_json(fornecedor) -> str:
+    return model_json(FORNECEDOR_ADAPTER, fornecedor)
+
+def fornecedores_json(fornecedores: Iterable) -> str:
+    return model_json(FORNECEDORES_ADAPTER, list(fornecedores))
@@ -0,0 +1,243 @@
+"""
+Propagação de contexto de trace entre API Gateway, SQS, SNS e as Lambdas
+
+O trace nasce na borda (rota da API, ou o primeiro consumidor que recebe uma
+mensagem sem contexto) e viaja nos MessageAttributes das mensagens:
+
+    traceparent: formato W3C "00-<trace_id>-<span_id>-<flags>"; o span_id é
+                 o do span que enviou a mensagem (pai do próximo salto)
+    trace_sent_at: instante do envio (epoch em ms), para medir a espera na
+                   fila/tópico de cada salto
+
+send_sqs_message, SQSBatchProducer e publish_sns_message acrescentam esses
+atributos automaticamente quando há um span ativo; os handlers recuperam o
+contexto com extract() (ou, no lote SQS, com bind_records/message_span).
+
+Cada span fechado vira uma linha de log INFO "span {...}" com trace_id,
+span_id, parent_id, início, duração e espera na fila; benchmarks.trace_report
+reconstrói a latência de ponta a ponta a partir dos logs. Variáveis de
+ambiente:
+
+    TRACING_ENABLED: liga/desliga propagação e spans (padrão true)
+    TRACE_SAMPLE_RATE: fração dos traces novos que emitem spans (padrão 1);
+                       traces não amostrados continuam propagando o contexto
+"""
+
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+from loguru import logger
+
+TRACEPARENT = 'traceparent'
+SENT_AT = 'trace_sent_at'
+
+class TraceContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+class Remote(NamedTuple):
+    """Contexto recebido numa mensagem, com o instante em que ela foi enviada"""
+    context: TraceContext
+    sent_at_ms: Optional[float] = None
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+def _now_ms() -> float:
+    return time.time() * 1000
+
+def format_traceparent(context: TraceContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+def parse_traceparent(value: Optional[str]) -> Optional[TraceContext]:
+    """Lê um traceparent W3C; retorna None se ausente ou malformado"""
+    if not value:
+        return None
+    partes = value.strip().split('-')
+    if len(partes) != 4 or len(partes[1]) != 32 or len(partes[2]) != 16:
+        return None
+    try:
+        trace_id, span_id, flags = (int(parte, 16) for parte in partes[1:])
+    except ValueError:
+        return None
+    if not trace_id or not span_id:
+        return None
+    return TraceContext(partes[1].lower(), partes[2].lower(), bool(flags & 1))
+
+def _attribute_value(attributes: Dict[str, object], name: str) -> Optional[str]:
+    """
+    Valor do atributo em qualquer dos formatos recebidos: MessageAttributes
+    do boto3 (StringValue), do evento SQS (stringValue), do evento SNS (Value)
+    ou cabeçalhos HTTP (string, nome sem diferenciar maiúsculas)
+    """
+    value = attributes.get(name)
+    if value is None:
+        value = next((v for k, v in attributes.items() if k.lower() == name), None)
+    if isinstance(value, dict):
+        value = value.get('StringValue') or value.get('stringValue') or value.get('Value')
+    return value if isinstance(value, str) else None
+
+class Span:
+    """Span ativo: contexto propagado e atributos que irão para o registro"""
+
+    __slots__ = ('name', 'context', 'parent_id', 'start_ms', 'attributes')
+
+    def __init__(self, name: str, context: TraceContext, parent_id: Optional[str], start_ms: float, attributes: dict):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_ms = start_ms
+        self.attributes = attributes
+
+    def record(self, end_ms: float) -> dict:
+        return {
+            'span': self.name,
+            'trace_id': self.context.trace_id,
+            'span_id': self.context.span_id,
+            'parent_id': self.parent_id,
+            'start_ms': round(self.start_ms, 3),
+            'duration_ms': round(end_ms - self.start_ms, 3),
+            **self.attributes,
+        }
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+# Contexto recebido por messageId no lote SQS em processamento
+_bound_records: ContextVar[Optional[Dict[str, tuple]]] = ContextVar('bound_records', default=None)
+
+class Tracer:
+    """Cria spans, propaga o contexto nas mensagens e emite os registros nos logs"""
+
+    def __init__(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None):
+        self.enabled = _env_flag('TRACING_ENABLED', True) if enabled is None else enabled
+        self.sample_rate = float(os.getenv('TRACE_SAMPLE_RATE', '1')) if sample_rate is None else sample_rate
+        self.service = os.getenv('AWS_LAMBDA_FUNCTION_NAME', 'contas-a-pagar')
+
+    def current(self) -> Optional[TraceContext]:
+        span = _current_span.get()
+        return span.context if span is not None else None
+
+    def annotate(self, **attributes):
+        """Acrescenta atributos ao span ativo (ex: o conta_id depois de criar a conta)"""
+        span = _current_span.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def extract(self, attributes: Optional[Dict[str, object]]) -> Optional[Remote]:
+        """Contexto recebido em MessageAttributes (SQS/SNS) ou cabeçalhos HTTP"""
+        if not self.enabled or not attributes:
+            return None
+        context = parse_traceparent(_attribute_value(attributes, TRACEPARENT))
+        if context is None:
+            return None
+        try:
+            sent_at_ms = float(_attribute_value(attributes, SENT_AT))
+        except (TypeError, ValueError):
+            sent_at_ms = None
+        return Remote(context, sent_at_ms)
+
+    def message_attributes(self) -> Dict[str, dict]:
+        """MessageAttributes (formato boto3, SQS e SNS) com o contexto do span ativo; vazio sem span"""
+        context = self.current() if self.enabled else None
+        if context is None:
+            return {}
+        return {
+            TRACEPARENT: {'DataType': 'String', 'StringValue': format_traceparent(context)},
+            SENT_AT: {'DataType': 'Number', 'StringValue': str(int(_now_ms()))},
+        }
+
+    def serialized_attributes(self) -> Optional[str]:
+        """message_attributes() em JSON, para gravar na outbox junto com a mensagem"""
+        attributes = self.message_attributes()
+        return json.dumps(attributes, separators=(',', ':')) if attributes else None
+
+    def inject(self, message_attributes: Optional[dict]) -> Optional[dict]:
+        """Junta o contexto do span ativo aos atributos da mensagem, sem sobrescrever um traceparent já presente"""
+        propagados = self.message_attributes()
+        if not propagados or (message_attributes and TRACEPARENT in message_attributes):
+            return message_attributes
+        return {**(message_attributes or {}), **propagados}
+
+    @contextmanager
+    def span(self, name: str, remote: Optional[Remote] = None, start_ms: Optional[float] = None,
+             **attributes) -> Iterator[Optional[Span]]:
+        """
+        Span filho do contexto recebido (`remote`), do span ativo ou, na falta
+        dos dois, raiz de um novo trace
+
+        Com `remote`, registra em queue_ms a espera entre o envio da mensagem
+        e o início do span. Exceções marcam o span com error.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        start_ms = start_ms if start_ms is not None else _now_ms()
+        if remote is not None:
+            parent = remote.context
+            if remote.sent_at_ms is not None:
+                attributes['queue_ms'] = round(max(start_ms - remote.sent_at_ms, 0.0), 3)
+        else:
+            parent = self.current()
+
+        if parent is not None:
+            context = TraceContext(parent.trace_id, os.urandom(8).hex(), parent.sampled)
+        else:
+            context = TraceContext(os.urandom(16).hex(), os.urandom(8).hex(), random.random() < self.sample_rate)
+
+        span = Span(name, context, parent.span_id if parent is not None else None, start_ms, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            attributes['error'] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            if context.sampled:
+                self._emit(span, _now_ms())
+
+    def _emit(self, span: Span, end_ms: float):
+        attributes = span.attributes
+        attributes.setdefault('service', self.service)
+        logger.opt(lazy=True).info("span {}", lambda: json.dumps(span.record(end_ms), separators=(',', ':'), default=str))
+
+    # Lotes SQS
+
+    @contextmanager
+    def bind_records(self, records: Iterable[dict]) -> Iterator[None]:
+        """
+        Guarda o contexto recebido em cada mensagem do lote SQS, para que os
+        processadores abram um span por mensagem com message_span()
+
+        O início dos spans é o recebimento do lote: a duração inclui a espera
+        pelas outras mensagens processadas antes.
+        """
+        if not self.enabled:
+            yield
+            return
+        recebido_em = _now_ms()
+        contextos = {
+            record.get('messageId'): (self.extract(record.get('messageAttributes')), recebido_em)
+            for record in records
+        }
+        token = _bound_records.set(contextos)
+        try:
+            yield
+        finally:
+            _bound_records.reset(token)
+
+    def message_span(self, message_id: Optional[str], name: str, **attributes):
+        """Span de uma mensagem do lote registrado com bind_records()"""
+        remote, start_ms = (_bound_records.get() or {}).get(message_id, (None, None))
+        return self.span(name, remote, start_ms, **attributes)
+
+# Tracer global do processo
+tracer = Tracer()
@@ -0,0 +1,7 @@
+# Benchmarks e ferramentas de medição locais (não fazem parte do pacote Lambda)
+
+import os
+
+# Sem arquivo de log local por padrão (evita logs/app.log a cada execução);
+# defina LOG_FILE para gravar, ex: os spans lidos pelo trace_report
+os.environ.setdefault('LOG_FILE', '')
@@ -0,0 +1,139 @@
+"""
+Gerador determinístico de fornecedores e contas para benchmarks
+
+A mesma semente e a mesma data de referência geram sempre os mesmos dados.
+As distribuições imitam uma base real de contas a pagar:
+
+- fornecedores: poucos concentram a maior parte das contas (pesos 1/k)
+- vencimento: 70% no passado (até 2 anos, mais denso perto da data de
+  referência) e 30% nos próximos 6 meses, com metade caindo nos dias de
+  vencimento usuais (5, 10, 15, 20, 25)
+- status: contas vencidas quase sempre pagas, algumas atrasadas e uma parte
+  ainda em aberto (trabalho para atualizar_status_atrasadas); as futuras,
+  em aberto, com alguns pagamentos antecipados
+- valor: log-normal (mediana ~ R$ 800), com duas casas
+
+A carga usa INSERTs em lote (executemany) de `tamanho_lote` linhas por
+transação, em SQLite ou Postgres.
+
+Uso:
+    python -m benchmarks.dataset --contas 1000000 --database-url sqlite:///bench.db
+    python -m benchmarks.dataset --contas 10000000 --fornecedores 50000 --database-url postgresql://localhost/contas
+"""
+
+import argparse
+import bisect
+import calendar
+import itertools
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, insert
+
+from app.models.conta import Conta, Status
+from app.models.fornecedor import Fornecedor
+from app.utils.migrations import run_migrations
+
+SEMENTE = 42
+DIAS_USUAIS = (5, 10, 15, 20, 25)
+
+def gerar_fornecedores(quantidade: int, semente: int = SEMENTE) -> Iterator[dict]:
+    """Fornecedores com documento único (CNPJ de 14 dígitos sem máscara)"""
+    rng = random.Random(f'fornecedores:{semente}')
+    for i in range(1, quantidade + 1):
+        yield {
+            'nome': f'Fornecedor {i:06d} {rng.choice(("Ltda", "S.A.", "ME", "EIRELI"))}',
+            'documento': f'{i:08d}{rng.randrange(10**6):06d}',
+            'email': f'financeiro{i}@fornecedor{i}.com.br',
+            'telefone': f'11{rng.randrange(10**8, 10**9)}',
+        }
+
+def _vencimento(rng: random.Random, hoje: date) -> date:
+    if rng.random() < 0.7:
+        # Passado: densidade decrescente até 730 dias atrás
+        dia = hoje - timedelta(days=int(rng.triangular(1, 730, 1)))
+    else:
+        dia = hoje + timedelta(days=rng.randint(0, 180))
+    if rng.random() < 0.5:
+        # Ajusta para o dia de vencimento usual mais próximo no mesmo mês
+        usual = min(DIAS_USUAIS, key=lambda d: abs(d - dia.day))
+        dia = dia.replace(day=min(usual, calendar.monthrange(dia.year, dia.month)[1]))
+    return dia
+
+def _status(rng: random.Random, vencimento: date, hoje: date) -> Status:
+    sorteio = rng.random()
+    if vencimento < hoje:
+        if sorteio < 0.85:
+            return Status.PAGA
+        return Status.ATRASADA if sorteio < 0.95 else Status.ABERTA
+    return Status.PAGA if sorteio < 0.1 else Status.ABERTA
+
+def gerar_contas(quantidade: int, fornecedores: int, semente: int = SEMENTE, hoje: Optional[date] = None) -> Iterator[dict]:
+    """Contas distribuídas entre os fornecedores 1..`fornecedores` (ids gerados na carga)"""
+    rng = random.Random(f'contas:{semente}')
+    hoje = hoje or date.today()
+    acumulado = list(itertools.accumulate(1 / k for k in range(1, fornecedores + 1)))
+    total = acumulado[-1]
+
+    for i in range(1, quantidade + 1):
+        vencimento = _vencimento(rng, hoje)
+        yield {
+            'descricao': f'NF {i:08d}',
+            'valor': round(min(rng.lognormvariate(6.7, 1.1), 500_000.0), 2),
+            'vencimento': vencimento,
+            'status': _status(rng, vencimento, hoje),
+            'fornecedor_id': bisect.bisect_left(acumulado, rng.random() * total) + 1,
+        }
+
+def _em_lotes(linhas: Iterator[dict], tamanho: int) -> Iterator[List[dict]]:
+    while True:
+        lote = list(itertools.islice(linhas, tamanho))
+        if not lote:
+            return
+        yield lote
+
+def carregar(engine, contas: int, fornecedores: int, semente: int = SEMENTE, hoje: Optional[date] = None,
+             tamanho_lote: int = 10_000) -> Dict[str, float]:
+    """
+    Aplica as migrações e insere os dados gerados
+
+    Espera tabelas vazias: os fornecedor_id das contas assumem fornecedores
+    com ids 1..N, na ordem de inserção.
+    """
+    run_migrations(engine)
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        for lote in _em_lotes(gerar_fornecedores(fornecedores, semente), tamanho_lote):
+            conn.execute(insert(Fornecedor), lote)
+    meio = time.perf_counter()
+    for lote in _em_lotes(gerar_contas(contas, fornecedores, semente, hoje), tamanho_lote):
+        with engine.begin() as conn:
+            conn.execute(insert(Conta), lote)
+    fim = time.perf_counter()
+    return {
+        'fornecedores_segundos': round(meio - inicio, 3),
+        'contas_segundos': round(fim - meio, 3),
+        'contas_por_segundo': round(contas / (fim - meio), 1) if contas else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--contas', type=int, default=10_000)
+    parser.add_argument('--fornecedores', type=int, default=None, help='padrão: 1 para cada 200 contas (mínimo 10)')
+    parser.add_argument('--semente', type=int, default=SEMENTE)
+    parser.add_argument('--hoje', type=date.fromisoformat, default=None, help='data de referência (AAAA-MM-DD)')
+    parser.add_argument('--tamanho-lote', type=int, default=10_000)
+    args = parser.parse_args()
+
+    fornecedores = args.fornecedores or max(args.contas // 200, 10)
+    engine = create_engine(args.database_url)
+    tempos = carregar(engine, args.contas, fornecedores, args.semente, args.hoje, args.tamanho_lote)
+    engine.dispose()
+    print(json.dumps({'contas': args.contas, 'fornecedores': fornecedores, 'semente': args.semente, **tempos}, indent=2))
+
+if __name__ == "__main__":
+    main()
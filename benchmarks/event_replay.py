@@ -0,0 +1,446 @@
+"""
+Replay e gerador de carga de eventos Lambda com mistura configurável
+
+Monta um fluxo ponderado de eventos (API Gateway, SQS, SNS e CloudWatch) e o
+entrega a app.lambda_handler.lambda_handler, no próprio processo ou num
+pool de processos, sobre um SQLite temporário populado com
+benchmarks.dataset (ou --database-url). SQS e SNS vão para um backend que
+descarta as mensagens, então só o código da aplicação é medido.
+
+Os eventos vêm de modelos sintéticos ou de uma gravação (--replay, JSON ou
+JSONL, um evento por linha). Cada evento recebe um rótulo (ex:
+"api.GET /contas", "sqs.conta_criada", "cloudwatch.drenar-outbox") e a
+mistura é dada em pesos por rótulo, inline ou num arquivo JSON:
+
+    --mix "api.GET /contas=50,api.POST /contas=20,sqs.conta_criada=30"
+
+Reporta, por rótulo: eventos/s, p50/p95/p99, erros (statusCode >= 500 ou
+batchItemFailures) e, com --tracemalloc, o pico de alocação por evento; e o
+pico de RSS de cada processo. O JSON (--output) pode ser comparado com
+--baseline, como em benchmarks.repository_suite.
+
+Uso:
+    python -m benchmarks.event_replay --eventos 5000
+    python -m benchmarks.event_replay --mix mix.json --processos 4 --output resultados/replay.json
+    python -m benchmarks.event_replay --replay eventos.jsonl --eventos 10000 --baseline resultados/replay.json
+    python -m benchmarks.event_replay --eventos 1000 --gravar eventos.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from statistics import quantiles
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import SEMENTE, carregar
+from app.utils.logger import configure_logger
+from benchmarks.repository_suite import comparar, imprimir_comparacao
+
+QUEUE_URL = 'https://sqs.us-east-1.amazonaws.com/000000000000/contas-a-pagar'
+TOPIC_ARN = 'arn:aws:sns:us-east-1:000000000000:contas-a-pagar-conta_criada'
+ENV = {
+    'SQS_CONTA_CRIADA_URL': QUEUE_URL,
+    'SQS_PROCESSAMENTO_URL': QUEUE_URL,
+    'SNS_CONTA_CRIADA_TOPIC': TOPIC_ARN,
+    'SNS_VENCIMENTOS_TOPIC': TOPIC_ARN,
+    'SNS_PAGAMENTOS_TOPIC': TOPIC_ARN,
+}
+
+MIX_PADRAO = {
+    'api.GET /contas': 35,
+    'api.POST /contas': 15,
+    'api.GET /health': 5,
+    'api.POST /contas/pagar': 5,
+    'sqs.conta_criada': 20,
+    'sqs.marcar_como_paga': 10,
+    'sns': 8,
+    'cloudwatch.verificar-vencimentos': 1,
+    'cloudwatch.drenar-outbox': 1,
+}
+
+Evento = Tuple[str, dict]
+
+class DescarteMensagens:
+    """Backend de mensageria que aceita e descarta os envios para SQS e SNS"""
+
+    def get(self, service_name: str, region: Optional[str] = None):
+        return self
+
+    def send_message(self, QueueUrl, MessageBody, **kwargs):
+        return {'MessageId': '0'}
+
+    def send_message_batch(self, QueueUrl, Entries, **kwargs):
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': []}
+
+    def publish(self, TopicArn, Message, **kwargs):
+        return {'MessageId': '0'}
+
+# Modelos sintéticos
+
+class Contexto:
+    """Faixa de ids da base carregada, usada pelos modelos de evento"""
+
+    def __init__(self, contas: int, fornecedores: int):
+        self.contas = max(contas, 1)
+        self.fornecedores = max(fornecedores, 1)
+        self.sequencia = itertools.count(1)
+
+def _api(method: str, path: str, body: Optional[dict] = None, query: Optional[dict] = None) -> dict:
+    return {
+        'httpMethod': method,
+        'resource': path,
+        'path': path,
+        'headers': {'Content-Type': 'application/json'},
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None,
+    }
+
+def _sqs(corpos: List[dict]) -> dict:
+    return {'Records': [
+        {'messageId': f'msg-{i}', 'eventSource': 'aws:sqs', 'body': json.dumps(corpo)}
+        for i, corpo in enumerate(corpos)
+    ]}
+
+def _cloudwatch(regra: str) -> dict:
+    return {
+        'source': 'aws.events',
+        'detail-type': 'Scheduled Event',
+        'time': '2024-01-01T00:00:00Z',
+        'detail': {'rule-name': f'contas-a-pagar-{regra}'},
+    }
+
+def _listar(rng: random.Random, ctx: Contexto, lote: int) -> dict:
+    query = rng.choice([
+        {'limit': '50'},
+        {'status': 'Aberta', 'limit': '50'},
+        {'fornecedor_id': str(rng.randint(1, ctx.fornecedores)), 'limit': '50'},
+    ])
+    return _api('GET', '/contas', query=query)
+
+def _criar(rng: random.Random, ctx: Contexto, lote: int) -> dict:
+    vencimento = date.today() + timedelta(days=rng.randint(0, 90))
+    return _api('POST', '/contas', {
+        'descricao': f'Replay {next(ctx.sequencia)}',
+        'valor': round(rng.uniform(10, 5000), 2),
+        'vencimento': vencimento.isoformat(),
+        'fornecedor_id': rng.randint(1, ctx.fornecedores),
+    })
+
+def _pagar_lote(rng: random.Random, ctx: Contexto, lote: int) -> dict:
+    return _api('POST', '/contas/pagar', {'conta_ids': [rng.randint(1, ctx.contas) for _ in range(lote)]})
+
+MODELOS: Dict[str, Callable[[random.Random, Contexto, int], dict]] = {
+    'api.GET /contas': _listar,
+    'api.POST /contas': _criar,
+    'api.GET /health': lambda rng, ctx, lote: _api('GET', '/health'),
+    'api.POST /contas/pagar': _pagar_lote,
+    'sqs.conta_criada': lambda rng, ctx, lote: _sqs(
+        [{'acao': 'conta_criada', 'conta_id': rng.randint(1, ctx.contas)} for _ in range(lote)]),
+    'sqs.marcar_como_paga': lambda rng, ctx, lote: _sqs(
+        [{'acao': 'marcar_como_paga', 'conta_id': rng.randint(1, ctx.contas)} for _ in range(lote)]),
+    'sns': lambda rng, ctx, lote: {'Records': [{
+        'EventSource': 'aws:sns',
+        'Sns': {'Message': 'Nova conta criada', 'Subject': 'Conta Criada', 'TopicArn': TOPIC_ARN},
+    }]},
+    'cloudwatch.verificar-vencimentos': lambda rng, ctx, lote: _cloudwatch('verificar-vencimentos'),
+    'cloudwatch.drenar-outbox': lambda rng, ctx, lote: _cloudwatch('drenar-outbox'),
+}
+
+def rotulo(event: dict) -> str:
+    """Rótulo do evento: tipo e rota (API), ação (SQS) ou regra (CloudWatch)"""
+    from app.handlers.orchestrator import ROUTER, identify_event_type
+
+    tipo = identify_event_type(event)
+    if tipo == 'api_gateway':
+        method = event.get('httpMethod', '').upper()
+        resultado = ROUTER.match(method, event.get('path') or event.get('resource', ''))
+        return f"api.{method} {resultado.rota.template if resultado.rota else event.get('resource') or event.get('path')}"
+    if tipo == 'sqs':
+        try:
+            return f"sqs.{json.loads(event['Records'][0]['body']).get('acao')}"
+        except (ValueError, KeyError, AttributeError):
+            return 'sqs'
+    if tipo == 'cloudwatch_event':
+        regra = event.get('detail', {}).get('rule-name', '')
+        for conhecida in ('verificar-vencimentos', 'drenar-outbox'):
+            if conhecida in regra:
+                return f'cloudwatch.{conhecida}'
+        return 'cloudwatch'
+    return tipo
+
+def parse_mix(valor: Optional[str]) -> Dict[str, float]:
+    """Pesos por rótulo: arquivo JSON ({"rótulo": peso}) ou "rótulo=peso,rótulo=peso" """
+    if not valor:
+        return dict(MIX_PADRAO)
+    if os.path.exists(valor):
+        with open(valor) as arquivo:
+            return {nome: float(peso) for nome, peso in json.load(arquivo).items()}
+    mix = {}
+    for parte in valor.split(','):
+        nome, _, peso = parte.rpartition('=')
+        mix[nome.strip()] = float(peso)
+    return mix
+
+def gerar_eventos(mix: Dict[str, float], quantidade: int, ctx: Contexto, semente: int = SEMENTE,
+                  lote_sqs: int = 10) -> List[Evento]:
+    """Fluxo sintético com a mistura de rótulos informada"""
+    desconhecidos = set(mix) - set(MODELOS)
+    if desconhecidos:
+        raise ValueError(f"Sem modelo sintético para: {', '.join(sorted(desconhecidos))} (disponíveis: {', '.join(MODELOS)})")
+    rng = random.Random(semente)
+    nomes = list(mix)
+    escolhidos = rng.choices(nomes, weights=[mix[nome] for nome in nomes], k=quantidade)
+    return [(nome, MODELOS[nome](rng, ctx, lote_sqs)) for nome in escolhidos]
+
+def carregar_gravacao(caminho: str) -> List[dict]:
+    """Eventos gravados: lista JSON ou JSONL (um evento por linha)"""
+    with open(caminho) as arquivo:
+        conteudo = arquivo.read().strip()
+    if conteudo.startswith('['):
+        return json.loads(conteudo)
+    return [json.loads(linha) for linha in conteudo.splitlines() if linha.strip()]
+
+def replay_eventos(gravados: List[dict], quantidade: int, mix: Optional[Dict[str, float]] = None,
+                   semente: int = SEMENTE) -> List[Evento]:
+    """
+    Repete os eventos gravados até `quantidade`
+
+    Sem mistura, na ordem gravada (em ciclo); com mistura, sorteia o rótulo
+    pelos pesos e um evento gravado com esse rótulo.
+    """
+    rotulados = [(rotulo(event), event) for event in gravados]
+    if not mix:
+        return list(itertools.islice(itertools.cycle(rotulados), quantidade))
+
+    por_rotulo = defaultdict(list)
+    for nome, event in rotulados:
+        por_rotulo[nome].append(event)
+    nomes = [nome for nome in mix if por_rotulo.get(nome)]
+    if not nomes:
+        raise ValueError(f"Nenhum evento gravado com os rótulos da mistura (gravados: {', '.join(sorted(por_rotulo))})")
+    rng = random.Random(semente)
+    escolhidos = rng.choices(nomes, weights=[mix[nome] for nome in nomes], k=quantidade)
+    return [(nome, rng.choice(por_rotulo[nome])) for nome in escolhidos]
+
+# Execução
+
+def _preparar_processo(database_url: str):
+    """Ambiente de cada processo: banco, filas/tópicos e backend que descarta mensagens"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.update(ENV)
+    from app.utils.aws_config import set_messaging_backend
+    set_messaging_backend(DescarteMensagens())
+
+def _falhou(resultado) -> bool:
+    if not isinstance(resultado, dict):
+        return False
+    if resultado.get('batchItemFailures'):
+        return True
+    return int(resultado.get('statusCode', 200)) >= 500
+
+def executar(eventos: List[Evento], database_url: str, aquecimento: int = 0, medir_memoria: bool = False) -> dict:
+    """Entrega os eventos em sequência, como um container Lambda, e coleta as amostras por rótulo"""
+    _preparar_processo(database_url)
+    from app.lambda_handler import lambda_handler
+    from app.utils.local_broker import LocalContext
+
+    for _, event in eventos[:aquecimento]:
+        lambda_handler(event, LocalContext())
+
+    amostras: Dict[str, List[float]] = defaultdict(list)
+    erros: Dict[str, int] = defaultdict(int)
+    picos: Dict[str, int] = defaultdict(int)
+    if medir_memoria:
+        tracemalloc.start()
+
+    inicio = time.perf_counter()
+    for nome, event in eventos[aquecimento:]:
+        if medir_memoria:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            resultado = lambda_handler(event, LocalContext())
+        except Exception:
+            resultado = {'statusCode': 500}
+        amostras[nome].append((time.perf_counter() - t0) * 1000)
+        if _falhou(resultado):
+            erros[nome] += 1
+        if medir_memoria:
+            picos[nome] = max(picos[nome], tracemalloc.get_traced_memory()[1] - base)
+    duracao = time.perf_counter() - inicio
+
+    if medir_memoria:
+        tracemalloc.stop()
+    return {
+        'amostras': dict(amostras),
+        'erros': dict(erros),
+        'picos': dict(picos),
+        'segundos': duracao,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def _executar_parte(argumentos):
+    return executar(*argumentos)
+
+def run(eventos: List[Evento], database_url: str, processos: int = 1, aquecimento: int = 0,
+        medir_memoria: bool = False) -> List[dict]:
+    """Executa no próprio processo ou divide o fluxo entre `processos` processos"""
+    if processos <= 1:
+        return [executar(eventos, database_url, aquecimento, medir_memoria)]
+    partes = [eventos[i::processos] for i in range(processos)]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_executar_parte, [(parte, database_url, aquecimento, medir_memoria) for parte in partes]))
+
+def percentis(amostras: List[float]) -> dict:
+    if len(amostras) < 2:
+        return {'p50_ms': round(amostras[0], 3), 'p95_ms': round(amostras[0], 3), 'p99_ms': round(amostras[0], 3)}
+    cortes = quantiles(amostras, n=100, method='inclusive')
+    return {'p50_ms': round(cortes[49], 3), 'p95_ms': round(cortes[94], 3), 'p99_ms': round(cortes[98], 3)}
+
+def consolidar(partes: List[dict], inicio: float, fim: float) -> List[dict]:
+    """Junta as amostras dos processos; vazão por rótulo sobre o tempo total de parede"""
+    parede = fim - inicio
+    amostras: Dict[str, List[float]] = defaultdict(list)
+    erros: Dict[str, int] = defaultdict(int)
+    picos: Dict[str, int] = defaultdict(int)
+    for parte in partes:
+        for nome, valores in parte['amostras'].items():
+            amostras[nome].extend(valores)
+        for nome, quantidade in parte['erros'].items():
+            erros[nome] += quantidade
+        for nome, pico in parte['picos'].items():
+            picos[nome] = max(picos[nome], pico)
+
+    resultados = []
+    for nome in sorted(amostras, key=lambda n: -len(amostras[n])):
+        valores = amostras[nome]
+        p = percentis(valores)
+        resultado = {
+            'operacao': nome,
+            'eventos': len(valores),
+            'erros': erros.get(nome, 0),
+            'eventos_por_segundo': round(len(valores) / parede, 1),
+            # Chave usada na comparação com o baseline
+            'mediana_ms': p['p50_ms'],
+            **p,
+        }
+        if nome in picos:
+            resultado['pico_alocado_kb'] = round(picos[nome] / 1024, 1)
+        resultados.append(resultado)
+    return resultados
+
+def imprimir(resultado: dict):
+    meta = resultado['meta']
+    print(f"{meta['eventos']} eventos em {meta['segundos']:.2f}s ({meta['eventos_por_segundo']:.1f}/s), "
+          f"{meta['processos']} processo(s), RSS máximo {max(meta['max_rss_mb']):.1f} MB")
+    memoria = any('pico_alocado_kb' in r for r in resultado['resultados'])
+    cabecalho = f"{'rótulo':>34} {'eventos':>8} {'erros':>6} {'eventos/s':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}"
+    print(cabecalho + (f" {'pico (KB)':>10}" if memoria else ''))
+    for r in resultado['resultados']:
+        linha = (f"{r['operacao']:>34} {r['eventos']:>8} {r['erros']:>6} {r['eventos_por_segundo']:>10.1f} "
+                 f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+        print(linha + (f" {r.get('pico_alocado_kb', 0):>10.1f}" if memoria else ''))
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--eventos', type=int, default=2000)
+    parser.add_argument('--mix', help='pesos por rótulo: "rótulo=peso,..." ou arquivo JSON')
+    parser.add_argument('--replay', help='eventos gravados (JSON ou JSONL) no lugar dos modelos sintéticos')
+    parser.add_argument('--gravar', help='grava o fluxo gerado em JSONL (para --replay)')
+    parser.add_argument('--lote-sqs', type=int, default=10, help='mensagens por evento SQS sintético')
+    parser.add_argument('--processos', type=int, default=1, help='1 = no próprio processo')
+    parser.add_argument('--aquecimento', type=int, default=50, help='eventos iniciais (por processo) fora da medição')
+    parser.add_argument('--tracemalloc', action='store_true', help='pico de alocação por evento (mais lento)')
+    parser.add_argument('--database-url', default=None, help='padrão: SQLite temporário')
+    parser.add_argument('--sem-carga', action='store_true', help='usa os dados já carregados em --database-url')
+    parser.add_argument('--contas', type=int, default=5000, help='contas da base sintética')
+    parser.add_argument('--semente', type=int, default=SEMENTE)
+    parser.add_argument('--output', help='grava o resultado em JSON neste arquivo')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.15, help='piora relativa do p50 aceita (0.15 = 15%%)')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    # O logger local usa DEBUG por padrão; para medir a aplicação e não o terminal
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    configure_logger(force=True)
+
+    fornecedores = max(args.contas // 200, 10)
+    mix = parse_mix(args.mix) if (args.mix or not args.replay) else None
+    quantidade = args.eventos + args.aquecimento * args.processos
+    if args.replay:
+        eventos = replay_eventos(carregar_gravacao(args.replay), quantidade, mix, args.semente)
+    else:
+        eventos = gerar_eventos(mix, quantidade, Contexto(args.contas, fornecedores), args.semente, args.lote_sqs)
+
+    if args.gravar:
+        with open(args.gravar, 'w') as arquivo:
+            for _, event in eventos:
+                arquivo.write(json.dumps(event) + '\n')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'event_replay.db')}"
+        if not args.sem_carga:
+            engine = create_engine(database_url)
+            carregar(engine, args.contas, fornecedores, args.semente)
+            engine.dispose()
+
+        inicio = time.perf_counter()
+        partes = run(eventos, database_url, args.processos, args.aquecimento, args.tracemalloc)
+        fim = time.perf_counter()
+
+    medidos = sum(len(v) for parte in partes for v in parte['amostras'].values())
+    resultado = {
+        'meta': {
+            'eventos': medidos,
+            'processos': args.processos,
+            'segundos': round(fim - inicio, 3),
+            'eventos_por_segundo': round(medidos / (fim - inicio), 1),
+            'max_rss_mb': [round(parte['max_rss_mb'], 1) for parte in partes],
+            'mix': mix,
+            'replay': args.replay,
+            'semente': args.semente,
+            'contas': args.contas,
+            'executado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'resultados': consolidar(partes, inicio, fim),
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+
+    diferencas = None
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            baseline = json.load(arquivo)
+        diferencas = comparar(resultado, baseline, args.tolerancia)
+        resultado['comparacao'] = diferencas
+
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        imprimir(resultado)
+        if diferencas is not None:
+            imprimir_comparacao(diferencas, baseline, resultado)
+
+    if diferencas and any(d['regressao'] for d in diferencas):
+        return 1
+    return None
+
+if __name__ == "__main__":
+    sys.exit(main())
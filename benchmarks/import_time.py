@@ -0,0 +1,132 @@
+"""
+Perfil de tempo de importação (cold start) dos pontos de entrada Lambda
+
+Executa `python -X importtime -c "import <módulo>"` num processo novo para
+cada ponto de entrada e soma o custo por módulo e por pacote de topo
+(boto3, sqlalchemy, pydantic, ...). O tempo total de importação é uma boa
+aproximação da fase INIT da Lambda excluindo o runtime.
+
+Uso:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 15 --repeat 5 --json
+    python -m benchmarks.import_time --entry-points app.handlers.handler_notifica
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+ENTRY_POINTS = [
+    'app.lambda_handler',
+    'app.handlers.handler_create_conta',
+    'app.handlers.handler_processa_fila',
+    'app.handlers.handler_notifica',
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """
+    Converte a saída do -X importtime em registros por módulo
+
+    Cada linha tem o formato "import time: self [us] | cumulative | módulo",
+    com o nome do módulo indentado conforme a profundidade da importação.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            modules.append({
+                'module': name.strip(),
+                'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+            })
+        except ValueError:
+            continue
+    return modules
+
+def profile_import(module: str) -> List[dict]:
+    """Importa o módulo num interpretador novo e retorna o custo por módulo"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}: {result.stderr.strip().splitlines()[-1:]}")
+    return parse_importtime(result.stderr)
+
+def summarize(modules: List[dict], top: int) -> dict:
+    """Total, módulos mais caros e custo agregado por pacote de topo"""
+    packages: Dict[str, int] = defaultdict(int)
+    for module in modules:
+        packages[module['module'].split('.')[0]] += module['self_us']
+
+    return {
+        'total_ms': round(sum(module['self_us'] for module in modules) / 1000, 2),
+        'modules': len(modules),
+        'top_modules': [
+            {'module': module['module'], 'self_ms': round(module['self_us'] / 1000, 2)}
+            for module in sorted(modules, key=lambda m: m['self_us'], reverse=True)[:top]
+        ],
+        'top_packages': [
+            {'package': package, 'self_ms': round(self_us / 1000, 2)}
+            for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+def run(entry_points: List[str], repeat: int, top: int) -> List[dict]:
+    """Perfila cada ponto de entrada `repeat` vezes e usa a execução mediana"""
+    results = []
+    for entry_point in entry_points:
+        runs = [summarize(profile_import(entry_point), top) for _ in range(repeat)]
+        runs.sort(key=lambda r: r['total_ms'])
+        median = runs[len(runs) // 2]
+        results.append({
+            'entry_point': entry_point,
+            'median_total_ms': median['total_ms'],
+            'min_total_ms': runs[0]['total_ms'],
+            'max_total_ms': runs[-1]['total_ms'],
+            'stdev_ms': round(statistics.pstdev(r['total_ms'] for r in runs), 2),
+            'modules': median['modules'],
+            'top_modules': median['top_modules'],
+            'top_packages': median['top_packages'],
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entry-points', nargs='+', default=ENTRY_POINTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10, help='quantidade de módulos/pacotes listados')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    results = run(args.entry_points, args.repeat, args.top)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for r in results:
+        print(f"\n{r['entry_point']}: {r['median_total_ms']:.1f} ms "
+              f"(min {r['min_total_ms']:.1f}, max {r['max_total_ms']:.1f}, {r['modules']} módulos)")
+        print(f"  {'pacote':<36} {'ms':>8}")
+        for package in r['top_packages']:
+            print(f"  {package['package']:<36} {package['self_ms']:>8.1f}")
+        print(f"  {'módulo':<36} {'ms':>8}")
+        for module in r['top_modules']:
+            print(f"  {module['module']:<36} {module['self_ms']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Outbox: latência da API de criação de conta e vazão do relay
+
+Usa um SQLite em arquivo temporário e uma fila local no lugar do SQS (cada
+chamada de send_message/send_message_batch custa --sqs-ms):
+
+- direto: cria a conta e envia a mensagem com send_message antes de
+  responder (fluxo anterior à outbox)
+- outbox: handler_create_conta, gravando a mensagem na outbox na mesma
+  transação da conta
+- relay: RelayOutbox drenando as mensagens geradas, por tamanho de lote
+
+Uso:
+    python -m benchmarks.outbox_relay
+    python -m benchmarks.outbox_relay --requests 500 --sqs-ms 15 --batch-sizes 10 100 --json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from statistics import quantiles
+from unittest.mock import patch
+
+from sqlalchemy import insert
+
+from app.handlers import handler_create_conta
+from app.models.fornecedor import Fornecedor
+from app.repositories.outbox import OutboxRepository
+from app.services.relay_outbox import RelayOutbox
+from app.utils.aws_config import send_sqs_message
+from app.utils.database import DatabaseConfig
+from app.utils.migrations import run_migrations
+
+QUEUE_URL = 'https://sqs.local/conta-criada'
+
+class FilaLocal:
+    """Fila em memória com a interface do cliente SQS usada pela aplicação"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.mensagens = []
+        self.chamadas = 0
+        self._lock = threading.Lock()
+
+    def send_message(self, QueueUrl, MessageBody, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.chamadas += 1
+            self.mensagens.append(MessageBody)
+        return {'MessageId': str(len(self.mensagens))}
+
+    def send_message_batch(self, QueueUrl, Entries):
+        time.sleep(self.latency)
+        with self._lock:
+            self.chamadas += 1
+            self.mensagens.extend(entry['MessageBody'] for entry in Entries)
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': []}
+
+def percentis(amostras) -> dict:
+    cortes = quantiles(amostras, n=100, method='inclusive')
+    return {'p50_ms': round(cortes[49], 3), 'p95_ms': round(cortes[94], 3), 'p99_ms': round(cortes[98], 3)}
+
+def evento(i: int) -> dict:
+    return {'body': json.dumps({'descricao': f'Conta {i}', 'valor': 10.0 + i, 'vencimento': date.today().isoformat(), 'fornecedor_id': 1})}
+
+def medir_api(modo: str, requests: int) -> dict:
+    """Latência por requisição de criação de conta no modo informado"""
+    amostras = []
+    for i in range(requests):
+        inicio = time.perf_counter()
+        if modo == 'direto':
+            response = handler_create_conta.lambda_handler(evento(i), None)
+            send_sqs_message(QUEUE_URL, json.dumps({'conta_id': json.loads(response['body'])['id'], 'acao': 'conta_criada'}))
+        else:
+            with patch.dict(os.environ, {'SQS_CONTA_CRIADA_URL': QUEUE_URL}):
+                response = handler_create_conta.lambda_handler(evento(i), None)
+        amostras.append((time.perf_counter() - inicio) * 1000)
+        assert response['statusCode'] == 201
+    return {'etapa': f'api.{modo}', 'requests': requests, **percentis(amostras)}
+
+def medir_relay(config: DatabaseConfig, tamanho_lote: int, mensagens: int, fila: FilaLocal) -> dict:
+    """Vazão do relay drenando `mensagens` mensagens da outbox"""
+    session = config.get_session()
+    try:
+        repositorio = OutboxRepository(session)
+        repositorio.adicionar_varios(QUEUE_URL, (json.dumps({'conta_id': i, 'acao': 'conta_criada'}) for i in range(mensagens)))
+        chamadas = fila.chamadas
+        resultado = RelayOutbox(repositorio, tamanho_lote=tamanho_lote).drenar()
+        assert repositorio.contar_pendentes() == 0
+    finally:
+        session.close()
+    return {
+        'etapa': f'relay.lote_{tamanho_lote}',
+        'mensagens': resultado['enviadas'],
+        'segundos': resultado['segundos'],
+        'mensagens_por_segundo': round(resultado['enviadas'] / resultado['segundos'], 1),
+        'chamadas_sqs': fila.chamadas - chamadas,
+    }
+
+def run(database_url: str, requests: int, sqs_ms: float, batch_sizes, relay_messages: int) -> list:
+    config = DatabaseConfig(database_url=database_url)
+    run_migrations(config.engine)
+    with config.engine.begin() as conn:
+        conn.execute(insert(Fornecedor).values(nome='Fornecedor', documento='1', email='f@test.com', telefone='1'))
+
+    fila = FilaLocal(sqs_ms / 1000)
+    results = []
+    with patch.object(handler_create_conta, 'db_config', config), \
+            patch('app.utils.aws_config.get_aws_client', return_value=fila), \
+            patch.object(handler_create_conta.logger, 'info'):
+        for modo in ('direto', 'outbox'):
+            results.append(medir_api(modo, requests))
+
+        # Descarta as mensagens geradas pelo modo outbox antes de medir o relay
+        session = config.get_session()
+        RelayOutbox(OutboxRepository(session)).drenar()
+        session.close()
+        for tamanho_lote in batch_sizes:
+            results.append(medir_relay(config, tamanho_lote, relay_messages, fila))
+
+    config.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--sqs-ms', type=float, default=15.0, help='latência simulada por chamada ao SQS')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--relay-messages', type=int, default=2000)
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'outbox.db')}"
+        results = run(database_url, args.requests, args.sqs_ms, args.batch_sizes, args.relay_messages)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'etapa':>16} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for r in results:
+        if r['etapa'].startswith('api.'):
+            print(f"{r['etapa']:>16} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+    print()
+    print(f"{'etapa':>16} {'mensagens':>10} {'msg/s':>10} {'chamadas SQS':>13}")
+    for r in results:
+        if r['etapa'].startswith('relay.'):
+            print(f"{r['etapa']:>16} {r['mensagens']:>10} {r['mensagens_por_segundo']:>10.1f} {r['chamadas_sqs']:>13}")
+
+if __name__ == "__main__":
+    main()
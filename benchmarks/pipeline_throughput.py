@@ -0,0 +1,123 @@
+"""
+Vazão de ponta a ponta com o broker SQS/SNS em memória
+
+Cria N contas pela API (handler_create_conta via orquestrador) e deixa o
+InMemoryBroker entregar tudo até esvaziar:
+
+    POST /contas -> outbox -> regra drenar-outbox -> fila conta-criada
+        -> handler_processa_fila -> SNS conta-criada -> handler_notifica
+
+Usa um SQLite em arquivo temporário; nada fala com a AWS. Reporta o tempo
+da criação, o tempo até a última notificação e mensagens por segundo no
+pipeline inteiro, além das contagens por fila e tópico.
+
+Uso:
+    python -m benchmarks.pipeline_throughput
+    python -m benchmarks.pipeline_throughput --contas 2000 --batch-size 10 --workers 4 --json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import date
+from unittest.mock import patch
+
+from sqlalchemy import insert
+
+from app.handlers import handler_create_conta, handler_drenar_outbox, handler_processa_fila
+from app.models.fornecedor import Fornecedor
+from app.utils.aws_config import set_messaging_backend
+from app.utils.database import DatabaseConfig
+from app.utils.local_broker import InMemoryBroker
+from app.utils.migrations import run_migrations
+
+QUEUE_URL = 'https://sqs.us-east-1.amazonaws.com/000000000000/contas-a-pagar-conta-criada'
+TOPIC_ARN = 'arn:aws:sns:us-east-1:000000000000:contas-a-pagar-conta-criada'
+
+def api_event(i: int) -> dict:
+    return {
+        'httpMethod': 'POST',
+        'resource': '/contas',
+        'path': '/contas',
+        'body': json.dumps({'descricao': f'Conta {i}', 'valor': 10.0 + i, 'vencimento': date.today().isoformat(), 'fornecedor_id': 1}),
+    }
+
+def run(database_url: str, contas: int, batch_size: int, workers: int, relay_interval: float) -> dict:
+    config = DatabaseConfig(database_url=database_url)
+    run_migrations(config.engine)
+    with config.engine.begin() as conn:
+        conn.execute(insert(Fornecedor).values(nome='Fornecedor', documento='1', email='f@test.com', telefone='1'))
+
+    broker = InMemoryBroker(batch_size=batch_size)
+    broker.schedule('contas-a-pagar-drenar-outbox', relay_interval)
+    env = {
+        'SQS_CONTA_CRIADA_URL': QUEUE_URL,
+        'SNS_CONTA_CRIADA_TOPIC': TOPIC_ARN,
+        'SQS_WORKERS': str(workers),
+    }
+
+    with ExitStack() as stack:
+        for module in (handler_create_conta, handler_processa_fila, handler_drenar_outbox):
+            stack.enter_context(patch.object(module, 'db_config', config))
+        stack.enter_context(patch.dict(os.environ, env))
+        set_messaging_backend(broker)
+        stack.callback(set_messaging_backend, None)
+
+        inicio = time.perf_counter()
+        for i in range(contas):
+            response = broker.invoke(api_event(i))
+            assert response['statusCode'] == 201, response
+        criacao = time.perf_counter() - inicio
+
+        broker.run_until_idle(timeout=600)
+        total = time.perf_counter() - inicio
+
+    config.dispose()
+    stats = broker.stats()
+    notificacoes = stats['topics'].get('contas-a-pagar-conta-criada', {}).get('delivered', 0)
+    assert notificacoes == contas, stats
+    mensagens = sum(fila['deleted'] for fila in stats['queues'].values()) + sum(topico['delivered'] for topico in stats['topics'].values())
+    return {
+        'contas': contas,
+        'batch_size': batch_size,
+        'workers': workers,
+        'api_seconds': round(criacao, 4),
+        'pipeline_seconds': round(total, 4),
+        'contas_por_segundo': round(contas / total, 1),
+        'mensagens': mensagens,
+        'mensagens_por_segundo': round(mensagens / total, 1),
+        'invocacoes': stats['invocations'],
+        'stats': stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contas', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=10, help='mensagens por invocação do consumidor SQS')
+    parser.add_argument('--workers', type=int, default=1, help='SQS_WORKERS do consumidor')
+    parser.add_argument('--relay-interval', type=float, default=0.05, help='intervalo (s) da regra drenar-outbox')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'pipeline.db')}"
+        result = run(database_url, args.contas, args.batch_size, args.workers, args.relay_interval)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"contas: {result['contas']}  lote SQS: {result['batch_size']}  workers: {result['workers']}")
+    print(f"criação (API): {result['api_seconds']:.3f}s  pipeline completo: {result['pipeline_seconds']:.3f}s")
+    print(f"contas/s: {result['contas_por_segundo']:.1f}  mensagens SQS+SNS/s: {result['mensagens_por_segundo']:.1f}  invocações: {result['invocacoes']}")
+    print(f"{'fila/tópico':>36} {'enviadas':>9} {'entregues':>10} {'falhas':>7}")
+    for nome, fila in result['stats']['queues'].items():
+        print(f"{'sqs:' + nome:>36} {fila['sent']:>9} {fila['deleted']:>10} {fila['failed']:>7}")
+    for nome, topico in result['stats']['topics'].items():
+        print(f"{'sns:' + nome:>36} {topico['published']:>9} {topico['delivered']:>10} {'-':>7}")
+
+if __name__ == "__main__":
+    main()
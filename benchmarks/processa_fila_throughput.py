@@ -0,0 +1,120 @@
+"""
+Comparação de throughput do handler_processa_fila: sequencial x concorrente
+
+Simula a latência de I/O do Aurora e do SNS (time.sleep) sem precisar de
+AWS nem de banco, e mede quanto tempo o handler leva para processar lotes
+de diferentes tamanhos com diferentes quantidades de workers.
+
+Uso:
+    python -m benchmarks.processa_fila_throughput
+    python -m benchmarks.processa_fila_throughput --batch-sizes 10 100 --workers 1 4 8 --db-ms 5 --sns-ms 20
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.handlers import handler_processa_fila
+from app.repositories.conta_repository import ContaPaga
+
+class ServicoContaSimulado:
+    """Serviço com latência fixa por chamada ao banco"""
+
+    def __init__(self, db_latency: float):
+        self.db_latency = db_latency
+
+    def marcar_como_paga(self, conta_id):
+        # Um único UPDATE ... RETURNING
+        time.sleep(self.db_latency)
+        return ContaPaga(conta_id, f"Conta {conta_id}", 10.0, 1)
+
+    def nomes_fornecedores(self, fornecedor_ids):
+        # Servido pelo cache de fornecedores
+        return {fornecedor_id: f"Fornecedor {fornecedor_id}" for fornecedor_id in fornecedor_ids}
+
+    def buscar_contas(self, conta_ids, com_fornecedor=False):
+        time.sleep(self.db_latency)
+        return [
+            SimpleNamespace(id=conta_id, descricao=f"Conta {conta_id}", valor=10.0, vencimento=date.today(), fornecedor=None)
+            for conta_id in conta_ids
+        ]
+
+def build_event(batch_size: int) -> dict:
+    """Lote SQS alternando criação e pagamento de contas distintas"""
+    records = []
+    for i in range(batch_size):
+        acao = 'conta_criada' if i % 2 == 0 else 'marcar_como_paga'
+        records.append({
+            'messageId': f'msg-{i}',
+            'eventSource': 'aws:sqs',
+            'body': json.dumps({'acao': acao, 'conta_id': i})
+        })
+    return {'Records': records}
+
+def run(batch_sizes, workers_list, db_ms: float, sns_ms: float, repeat: int):
+    results = []
+    servico = ServicoContaSimulado(db_ms / 1000)
+
+    def publish(*args, **kwargs):
+        time.sleep(sns_ms / 1000)
+
+    env = {
+        'SNS_CONTA_CRIADA_TOPIC': 'arn:local:conta-criada',
+        'SNS_PAGAMENTO_TOPIC': 'arn:local:pagamento',
+    }
+
+    with patch.object(handler_processa_fila, 'db_config') as db_config, \
+            patch.object(handler_processa_fila, 'ServicoConta', return_value=servico), \
+            patch.object(handler_processa_fila, 'publish_sns_message', side_effect=publish), \
+            patch.object(handler_processa_fila.logger, 'info'), \
+            patch.dict(os.environ, env):
+        db_config.get_session.side_effect = lambda: MagicMock()
+
+        for batch_size in batch_sizes:
+            event = build_event(batch_size)
+            for workers in workers_list:
+                os.environ['SQS_WORKERS'] = str(workers)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    response = handler_processa_fila.lambda_handler(event, None)
+                    timings.append(time.perf_counter() - start)
+                    assert not response['batchItemFailures']
+                best = min(timings)
+                results.append({
+                    'batch_size': batch_size,
+                    'workers': workers,
+                    'seconds': round(best, 4),
+                    'messages_per_second': round(batch_size / best, 1)
+                })
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--db-ms', type=float, default=5.0, help='latência simulada por chamada ao banco')
+    parser.add_argument('--sns-ms', type=float, default=20.0, help='latência simulada por publicação SNS')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    results = run(args.batch_sizes, args.workers, args.db_ms, args.sns_ms, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = {r['batch_size']: r['seconds'] for r in results if r['workers'] == 1}
+    print(f"{'lote':>6} {'workers':>8} {'tempo (s)':>10} {'msg/s':>10} {'ganho':>7}")
+    for r in results:
+        speedup = baseline.get(r['batch_size'], r['seconds']) / r['seconds']
+        print(f"{r['batch_size']:>6} {r['workers']:>8} {r['seconds']:>10.4f} {r['messages_per_second']:>10.1f} {speedup:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
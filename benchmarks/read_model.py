@@ -0,0 +1,107 @@
+"""
+Listagens: entidades ORM (ContaRepository) x linhas de leitura (ContaLeituraRepository)
+
+Popula um SQLite com N contas (100 mil por padrão) e mede tempo e pico de
+memória (tracemalloc) de:
+
+- orm.listar: ContaRepository.listar (entidades Conta no identity map)
+- rows.listar: ContaLeituraRepository.listar (ContaRow via Core)
+- orm.iter / rows.iter: iteração em lotes (exportação), sem guardar as linhas
+
+Uso:
+    python -m benchmarks.read_model
+    python -m benchmarks.read_model --rows 100000 --json
+    DATABASE_URL=postgresql://... python -m benchmarks.read_model
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models.conta import Conta, Status
+from app.models.fornecedor import Fornecedor
+from app.repositories.conta_repository import ContaRepository
+from app.repositories.leitura import ContaLeituraRepository
+from app.utils.migrations import run_migrations
+
+def populate(engine, rows: int):
+    """Insere `rows` contas distribuídas entre 50 fornecedores"""
+    status = list(Status)
+    with engine.begin() as conn:
+        conn.execute(insert(Fornecedor), [
+            {'nome': f'Fornecedor {i}', 'documento': f'{i:014d}', 'email': f'f{i}@test.com', 'telefone': '1'}
+            for i in range(1, 51)
+        ])
+        conn.execute(insert(Conta), [
+            {
+                'descricao': f'Conta {i}',
+                'valor': float(i % 1000) + 0.99,
+                'vencimento': date(2024, 1, 1) + timedelta(days=i % 365),
+                'status': status[i % len(status)],
+                'fornecedor_id': i % 50 + 1,
+            }
+            for i in range(rows)
+        ])
+
+def measure(Session, repository_class, operation: str) -> dict:
+    """Executa a operação numa sessão nova e retorna tempo e pico de memória"""
+    session = Session()
+    repo = repository_class(session)
+    try:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        if operation == 'listar':
+            total = len(repo.listar())
+        else:
+            total = sum(1 for _ in repo.iter_contas(tamanho_lote=1000))
+        duracao = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        session.close()
+    return {'rows': total, 'seconds': round(duracao, 4), 'peak_mb': round(pico / 1024 / 1024, 2)}
+
+def run(database_url: str, rows: int, populate_db: bool = True) -> list:
+    engine = create_engine(database_url)
+    run_migrations(engine)
+    if populate_db:
+        populate(engine, rows)
+    Session = sessionmaker(bind=engine)
+
+    results = []
+    for operation in ('listar', 'iter'):
+        for name, repository_class in (('orm', ContaRepository), ('rows', ContaLeituraRepository)):
+            results.append({'strategy': f'{name}.{operation}', **measure(Session, repository_class, operation)})
+    engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    database_url = os.getenv('DATABASE_URL')
+    with tempfile.TemporaryDirectory() as tmp:
+        populate_db = database_url is None
+        if populate_db:
+            database_url = f"sqlite:///{os.path.join(tmp, 'read_model.db')}"
+        results = run(database_url, args.rows, populate_db)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'estratégia':>12} {'linhas':>8} {'tempo (s)':>10} {'pico (MB)':>10}")
+    for r in results:
+        print(f"{r['strategy']:>12} {r['rows']:>8} {r['seconds']:>10.4f} {r['peak_mb']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
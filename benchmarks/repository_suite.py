@@ -0,0 +1,297 @@
+"""
+Suíte de benchmarks dos repositórios sobre uma base sintética
+
+Carrega N contas com benchmarks.dataset (SQLite temporário por padrão, ou
+--database-url para um Postgres local) e mede:
+
+- listar e listar_pagina (100 linhas) com cada combinação de filtros
+  (status, fornecedor, período); listar é pulada quando o resultado passa
+  de --limite-listar linhas
+- buscar_por_documento (documentos existentes e inexistentes), por chamada
+- listar_contas_vencendo (7 e 30 dias), pelo ServicoConta
+- marcar_como_paga, por chamada, em contas não pagas sorteadas
+- atualizar_status_atrasadas, uma vez (altera os dados)
+
+Cada operação de leitura roda --repeticoes vezes numa sessão nova. O JSON
+(--output) guarda os parâmetros da base e os tempos; com --baseline o
+resultado é comparado pela mediana e o processo sai com código 1 se alguma
+operação ficar mais de --tolerancia mais lenta.
+
+Uso:
+    python -m benchmarks.repository_suite --contas 10000
+    python -m benchmarks.repository_suite --contas 1000000 --output resultados/1m.json
+    python -m benchmarks.repository_suite --contas 1000000 --baseline resultados/1m.json
+    python -m benchmarks.repository_suite --database-url postgresql://localhost/contas_bench --contas 10000000
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from statistics import median, quantiles
+from typing import Callable, List, Optional
+
+import sqlalchemy
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.conta import Conta, Status
+from app.models.fornecedor import Fornecedor
+from app.repositories.conta_repository import ContaRepository
+from app.repositories.fornecedor_repository import FornecedorRepository
+from app.services.servico_conta import ServicoConta
+from benchmarks.dataset import SEMENTE, carregar
+
+# Diferenças abaixo disso (ms) são tratadas como ruído na comparação com o baseline
+RUIDO_MS = 0.5
+
+def estatisticas(amostras: List[float]) -> dict:
+    if len(amostras) < 2:
+        return {'mediana_ms': round(amostras[0], 3), 'min_ms': round(amostras[0], 3), 'p95_ms': round(amostras[0], 3)}
+    cortes = quantiles(amostras, n=100, method='inclusive')
+    return {
+        'mediana_ms': round(median(amostras), 3),
+        'min_ms': round(min(amostras), 3),
+        'p95_ms': round(cortes[94], 3),
+        'p99_ms': round(cortes[98], 3),
+    }
+
+def medir(Session: sessionmaker, operacao: Callable[[Session], int], repeticoes: int) -> dict:
+    """Executa a operação `repeticoes` vezes, cada uma numa sessão nova"""
+    amostras = []
+    linhas = 0
+    for _ in range(repeticoes):
+        session = Session()
+        try:
+            inicio = time.perf_counter()
+            linhas = operacao(session)
+            amostras.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            session.close()
+    return {'linhas': linhas, 'repeticoes': repeticoes, **estatisticas(amostras)}
+
+def medir_chamadas(Session: sessionmaker, operacao: Callable[[Session, object], bool], argumentos: list) -> dict:
+    """Executa a operação uma vez por argumento, na mesma sessão, e mede cada chamada"""
+    amostras = []
+    linhas = 0
+    session = Session()
+    try:
+        for argumento in argumentos:
+            inicio = time.perf_counter()
+            linhas += bool(operacao(session, argumento))
+            amostras.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        session.close()
+    return {'linhas': linhas, 'repeticoes': len(argumentos), **estatisticas(amostras)}
+
+def combinacoes_de_filtros(fornecedor_id: int, hoje: date) -> List[tuple]:
+    """Todas as combinações de status, fornecedor e período (inclusive nenhuma)"""
+    filtros = {
+        'status': {'status': Status.ABERTA},
+        'fornecedor': {'fornecedor_id': fornecedor_id},
+        'periodo': {'data_inicio': hoje - timedelta(days=30), 'data_fim': hoje + timedelta(days=30)},
+    }
+    resultado = []
+    for tamanho in range(len(filtros) + 1):
+        for nomes in itertools.combinations(filtros, tamanho):
+            combinados = {chave: valor for nome in nomes for chave, valor in filtros[nome].items()}
+            resultado.append(('+'.join(nomes) or 'sem_filtros', combinados))
+    return resultado
+
+def contar(session: Session, filtros: dict) -> int:
+    repositorio = ContaRepository(session)
+    return repositorio.aplicar_filtros(session.query(func.count(Conta.id)), filtros).scalar()
+
+def benchmark_listagens(Session: sessionmaker, repeticoes: int, limite_listar: int, hoje: date) -> List[dict]:
+    resultados = []
+    # Fornecedor 1 é o de maior volume na distribuição do gerador
+    for nome, filtros in combinacoes_de_filtros(1, hoje):
+        session = Session()
+        total = contar(session, filtros)
+        session.close()
+
+        if total > limite_listar:
+            resultados.append({'operacao': f'listar[{nome}]', 'linhas': total, 'ignorada': f'mais de {limite_listar} linhas'})
+        else:
+            resultados.append({'operacao': f'listar[{nome}]', **medir(
+                Session, lambda s, f=filtros: len(ContaRepository(s).listar(**f)), repeticoes)})
+        resultados.append({'operacao': f'listar_pagina[{nome}]', **medir(
+            Session, lambda s, f=filtros: len(ContaRepository(s).listar_pagina(100, **f)), repeticoes)})
+    return resultados
+
+def benchmark_documentos(Session: sessionmaker, amostras: int, rng: random.Random) -> List[dict]:
+    session = Session()
+    maior_id = session.query(func.max(Fornecedor.id)).scalar() or 0
+    ids = rng.sample(range(1, maior_id + 1), min(amostras, maior_id))
+    documentos = list(session.execute(select(Fornecedor.documento).where(Fornecedor.id.in_(ids))).scalars())
+    session.close()
+    rng.shuffle(documentos)
+    inexistentes = [f'99{rng.randrange(10**12):012d}' for _ in range(amostras)]
+
+    buscar = lambda s, documento: FornecedorRepository(s).buscar_por_documento(documento)  # noqa: E731
+    return [
+        {'operacao': 'buscar_por_documento', **medir_chamadas(Session, buscar, documentos)},
+        {'operacao': 'buscar_por_documento[inexistente]', **medir_chamadas(Session, buscar, inexistentes)},
+    ]
+
+def benchmark_vencendo(Session: sessionmaker, repeticoes: int) -> List[dict]:
+    def vencendo(dias):
+        def operacao(session):
+            servico = ServicoConta(ContaRepository(session), FornecedorRepository(session))
+            return len(servico.listar_contas_vencendo(dias))
+        return operacao
+    return [{'operacao': f'listar_contas_vencendo[{dias}d]', **medir(Session, vencendo(dias), repeticoes)} for dias in (7, 30)]
+
+def benchmark_pagamentos(Session: sessionmaker, amostras: int, rng: random.Random) -> List[dict]:
+    session = Session()
+    maior_id = session.query(func.max(Conta.id)).scalar() or 0
+    candidatos = rng.sample(range(1, maior_id + 1), min(amostras * 4, maior_id))
+    nao_pagas = set(session.execute(
+        select(Conta.id).where(Conta.id.in_(candidatos), Conta.status != Status.PAGA)
+    ).scalars())
+    session.close()
+    ids = [conta_id for conta_id in candidatos if conta_id in nao_pagas][:amostras]
+
+    pagar = lambda s, conta_id: ContaRepository(s).marcar_como_paga(conta_id)  # noqa: E731
+    return [{'operacao': 'marcar_como_paga', **medir_chamadas(Session, pagar, ids)}]
+
+def benchmark_atrasadas(Session: sessionmaker) -> List[dict]:
+    session = Session()
+    try:
+        repositorio = ContaRepository(session)
+        inicio = time.perf_counter()
+        linhas = repositorio.atualizar_status_atrasadas()
+        duracao = (time.perf_counter() - inicio) * 1000
+    finally:
+        session.close()
+    return [{
+        'operacao': 'atualizar_status_atrasadas',
+        'linhas': linhas,
+        'repeticoes': 1,
+        'lotes': len(repositorio.relatorio_atrasadas),
+        **estatisticas([duracao]),
+    }]
+
+def run(database_url: str, contas: int, fornecedores: int, semente: int, repeticoes: int, amostras: int,
+        limite_listar: int, popular: bool = True) -> dict:
+    engine = create_engine(database_url)
+    hoje = date.today()
+    carga = carregar(engine, contas, fornecedores, semente, hoje) if popular else None
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(semente)
+
+    resultados = benchmark_listagens(Session, repeticoes, limite_listar, hoje)
+    resultados += benchmark_documentos(Session, amostras, rng)
+    resultados += benchmark_vencendo(Session, repeticoes)
+    # Operações que alteram os dados ficam por último
+    resultados += benchmark_pagamentos(Session, amostras, rng)
+    resultados += benchmark_atrasadas(Session)
+
+    meta = {
+        'contas': contas,
+        'fornecedores': fornecedores,
+        'semente': semente,
+        'hoje': hoje.isoformat(),
+        'dialeto': engine.dialect.name,
+        'carga': carga,
+        'sqlalchemy': sqlalchemy.__version__,
+        'python': platform.python_version(),
+        'executado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    engine.dispose()
+    return {'meta': meta, 'resultados': resultados}
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> List[dict]:
+    """Diferença de mediana por operação; `regressao` quando fica mais de `tolerancia` mais lenta"""
+    anteriores = {r['operacao']: r for r in baseline['resultados'] if 'mediana_ms' in r}
+    diferencas = []
+    for resultado in atual['resultados']:
+        anterior = anteriores.get(resultado['operacao'])
+        if anterior is None or 'mediana_ms' not in resultado:
+            continue
+        base, agora = anterior['mediana_ms'], resultado['mediana_ms']
+        variacao = (agora - base) / base if base else 0.0
+        diferencas.append({
+            'operacao': resultado['operacao'],
+            'baseline_ms': base,
+            'atual_ms': agora,
+            'variacao': round(variacao, 4),
+            'regressao': variacao > tolerancia and agora - base > RUIDO_MS,
+        })
+    return diferencas
+
+def imprimir(resultado: dict):
+    meta = resultado['meta']
+    print(f"{meta['dialeto']}: {meta['contas']} contas, {meta['fornecedores']} fornecedores (semente {meta['semente']})")
+    if meta['carga']:
+        print(f"carga: {meta['carga']['contas_segundos']:.1f}s ({meta['carga']['contas_por_segundo']:.0f} contas/s)")
+    print(f"{'operação':>44} {'linhas':>9} {'mediana (ms)':>13} {'p95 (ms)':>9}")
+    for r in resultado['resultados']:
+        if 'ignorada' in r:
+            print(f"{r['operacao']:>44} {r['linhas']:>9} {'-':>13} {'-':>9}  ({r['ignorada']})")
+        else:
+            print(f"{r['operacao']:>44} {r['linhas']:>9} {r['mediana_ms']:>13.3f} {r['p95_ms']:>9.3f}")
+
+def imprimir_comparacao(diferencas: List[dict], baseline: dict, atual: dict):
+    chaves = ('contas', 'fornecedores', 'semente', 'dialeto')
+    if any(baseline['meta'].get(chave) != atual['meta'].get(chave) for chave in chaves):
+        parametros = ', '.join(f"{chave}={baseline['meta'].get(chave)}" for chave in chaves)
+        print(f"\natenção: baseline com parâmetros diferentes ({parametros})")
+    print(f"\n{'operação':>44} {'baseline':>10} {'atual':>10} {'variação':>9}")
+    for d in diferencas:
+        marca = '  REGRESSÃO' if d['regressao'] else ''
+        print(f"{d['operacao']:>44} {d['baseline_ms']:>10.3f} {d['atual_ms']:>10.3f} {d['variacao']:>+9.1%}{marca}")
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='padrão: SQLite temporário')
+    parser.add_argument('--sem-carga', action='store_true', help='usa os dados já carregados em --database-url')
+    parser.add_argument('--contas', type=int, default=10_000)
+    parser.add_argument('--fornecedores', type=int, default=None, help='padrão: 1 para cada 200 contas (mínimo 10)')
+    parser.add_argument('--semente', type=int, default=SEMENTE)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--amostras', type=int, default=200, help='chamadas de buscar_por_documento e marcar_como_paga')
+    parser.add_argument('--limite-listar', type=int, default=200_000)
+    parser.add_argument('--output', help='grava o resultado em JSON neste arquivo')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.15, help='piora relativa da mediana aceita (0.15 = 15%%)')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    fornecedores = args.fornecedores or max(args.contas // 200, 10)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'repository_suite.db')}"
+        resultado = run(database_url, args.contas, fornecedores, args.semente, args.repeticoes, args.amostras,
+                        args.limite_listar, popular=not args.sem_carga)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+
+    diferencas = None
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            baseline = json.load(arquivo)
+        diferencas = comparar(resultado, baseline, args.tolerancia)
+        resultado['comparacao'] = diferencas
+
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    else:
+        imprimir(resultado)
+        if diferencas is not None:
+            imprimir_comparacao(diferencas, baseline, resultado)
+
+    if diferencas and any(d['regressao'] for d in diferencas):
+        return 1
+    return None
+
+if __name__ == "__main__":
+    sys.exit(main())
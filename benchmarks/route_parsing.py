@@ -0,0 +1,139 @@
+"""
+Roteamento do API Gateway: implementação anterior x tabela de rotas compilada
+
+A implementação anterior escolhia o recurso por substring ('/contas' in path),
+remontava o handler_map a cada requisição e chamava importlib.import_module
+em todo request, inclusive para handlers inexistentes (que refazem a busca
+no sistema de arquivos). Este script mede, por requisição:
+
+- parse: apenas a escolha da rota (no router, servida pelo cache de
+  resultados, já que os mesmos caminhos se repetem)
+- parse_sem_cache: a escolha da rota com o cache de resultados desligado
+  (ROUTER_CACHE_MAX=0), o custo de um caminho visto pela primeira vez
+- resolve: escolha da rota + obtenção do handler (import)
+
+Uso:
+    python -m benchmarks.route_parsing
+    python -m benchmarks.route_parsing --iterations 50000 --json
+"""
+
+import argparse
+import importlib
+import json
+import timeit
+from contextlib import contextmanager
+
+from app.handlers.orchestrator import ROUTER
+
+REQUESTS = [
+    ('GET', '/contas'),
+    ('POST', '/contas'),
+    ('POST', '/contas/lote'),
+    ('GET', '/contas/123'),
+    ('POST', '/contas/123/pagar'),
+    ('PUT', '/fornecedores/9'),
+    ('GET', '/health'),
+    ('GET', '/desconhecido'),
+]
+
+LEGACY_HANDLERS = {
+    'contas': {'POST': 'handler_create_conta', 'GET': 'handler_list_contas', 'PUT': 'handler_update_conta', 'DELETE': 'handler_delete_conta'},
+    'fornecedores': {'POST': 'handler_create_fornecedor', 'GET': 'handler_list_fornecedores', 'PUT': 'handler_update_fornecedor', 'DELETE': 'handler_delete_fornecedor'},
+}
+
+def legacy_parse(method: str, path: str):
+    """Escolha de rota como no orquestrador anterior"""
+    if '/contas' in path:
+        handler_map = dict(LEGACY_HANDLERS['contas'])
+        if method not in handler_map:
+            return None
+        if method == 'POST' and path.rstrip('/').endswith('/contas/lote'):
+            return 'handler_create_contas_lote'
+        return handler_map[method]
+    elif '/fornecedores' in path:
+        handler_map = dict(LEGACY_HANDLERS['fornecedores'])
+        return handler_map.get(method)
+    elif '/health' in path:
+        return 'health'
+    return None
+
+def legacy_resolve(method: str, path: str):
+    """Escolha de rota + import a cada requisição, como no orquestrador anterior"""
+    handler_name = legacy_parse(method, path)
+    if not handler_name or handler_name == 'health':
+        return None
+    try:
+        return getattr(importlib.import_module(f'app.handlers.{handler_name}'), 'lambda_handler')
+    except (ImportError, AttributeError):
+        return None
+
+def router_parse(method: str, path: str):
+    return ROUTER.match(method, path)
+
+def router_resolve(method: str, path: str):
+    resultado = ROUTER.match(method, path)
+    return ROUTER.resolve(resultado.rota) if resultado.rota else None
+
+@contextmanager
+def sem_cache():
+    """Desliga o cache de resultados do ROUTER durante a medição"""
+    cache_max = ROUTER.cache_max
+    ROUTER.cache_max = 0
+    ROUTER.limpar_cache()
+    try:
+        yield
+    finally:
+        ROUTER.cache_max = cache_max
+
+def router_parse_sem_cache(method: str, path: str):
+    return ROUTER.match(method, path)
+
+def measure(func, iterations: int) -> float:
+    """Tempo médio por requisição em microssegundos"""
+    def run_all():
+        for method, path in REQUESTS:
+            func(method, path)
+
+    run_all()  # aquece caches de import
+    seconds = min(timeit.repeat(run_all, number=iterations, repeat=3))
+    return seconds / (iterations * len(REQUESTS)) * 1e6
+
+def run(iterations: int) -> list:
+    results = []
+    for stage, legacy, router in (
+        ('parse', legacy_parse, router_parse),
+        ('parse_sem_cache', legacy_parse, router_parse_sem_cache),
+        ('resolve', legacy_resolve, router_resolve),
+    ):
+        legacy_us = measure(legacy, iterations)
+        if router is router_parse_sem_cache:
+            with sem_cache():
+                router_us = measure(router, iterations)
+        else:
+            router_us = measure(router, iterations)
+        results.append({
+            'stage': stage,
+            'legacy_us': round(legacy_us, 3),
+            'router_us': round(router_us, 3),
+            'speedup': round(legacy_us / router_us, 2) if router_us else None,
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'etapa':>16} {'anterior (us)':>14} {'router (us)':>12} {'ganho':>7}")
+    for r in results:
+        print(f"{r['stage']:>16} {r['legacy_us']:>14.3f} {r['router_us']:>12.3f} {r['speedup']:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
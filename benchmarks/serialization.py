@@ -0,0 +1,104 @@
+"""
+Serialização de respostas: json.dumps sobre dicts montados à mão x TypeAdapter
+
+Compara, para listas de 1, 100 e 10 mil contas (modelos ORM em memória):
+
+- json: dict montado à mão + json.dumps (implementação anterior dos handlers)
+- orjson: dict montado à mão + orjson.dumps (se instalado)
+- adapter: TypeAdapter(ContaPaginaResponse) com from_attributes + dump_json
+
+Uso:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --sizes 1 100 10000 --json
+"""
+
+import argparse
+import json
+import timeit
+from datetime import date, timedelta
+
+from app.models.conta import Conta, Status
+from app.utils import serialization
+
+def build_contas(quantidade: int) -> list:
+    status = list(Status)
+    return [
+        Conta(
+            id=i,
+            descricao=f"Conta {i}",
+            valor=float(i % 1000) + 0.99,
+            vencimento=date(2024, 1, 1) + timedelta(days=i % 365),
+            status=status[i % len(status)],
+            fornecedor_id=i % 50 + 1,
+        )
+        for i in range(1, quantidade + 1)
+    ]
+
+def _dict_page(contas):
+    return {
+        'items': [
+            {
+                'id': conta.id,
+                'descricao': conta.descricao,
+                'valor': conta.valor,
+                'vencimento': conta.vencimento.isoformat() if conta.vencimento else None,
+                'status': conta.status.value if conta.status else None,
+                'fornecedor_id': conta.fornecedor_id
+            }
+            for conta in contas
+        ],
+        'count': len(contas),
+        'next_cursor': None
+    }
+
+def json_page(contas) -> str:
+    return json.dumps(_dict_page(contas))
+
+def orjson_page(contas) -> str:
+    return serialization.orjson.dumps(_dict_page(contas)).decode()
+
+def adapter_page(contas) -> str:
+    return serialization.pagina_contas_json(contas, None)
+
+def measure(func, contas, min_seconds: float = 0.2) -> float:
+    """Tempo médio por chamada em milissegundos"""
+    timer = timeit.Timer(lambda: func(contas))
+    number, _ = timer.autorange()
+    number = max(number, 1)
+    best = min(timer.repeat(repeat=3, number=number))
+    return best / number * 1000
+
+def run(sizes) -> list:
+    strategies = [('json', json_page), ('adapter', adapter_page)]
+    if serialization.orjson is not None:
+        strategies.insert(1, ('orjson', orjson_page))
+
+    results = []
+    for size in sizes:
+        contas = build_contas(size)
+        assert json.loads(json_page(contas)) == json.loads(adapter_page(contas))
+        baseline = None
+        for name, func in strategies:
+            ms = measure(func, contas)
+            baseline = baseline or ms
+            results.append({'size': size, 'strategy': name, 'ms': round(ms, 4), 'speedup': round(baseline / ms, 2)})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'contas':>8} {'estratégia':>10} {'ms':>10} {'ganho':>7}")
+    for r in results:
+        print(f"{r['size']:>8} {r['strategy']:>10} {r['ms']:>10.4f} {r['speedup']:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
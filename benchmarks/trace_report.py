@@ -0,0 +1,159 @@
+"""
+Latência de ponta a ponta por conta a partir dos spans registrados nos logs
+
+Lê as linhas "span {...}" emitidas por app.utils.tracing (formato texto do
+loguru, LOG_JSON ou exportação do CloudWatch Logs), remonta a árvore de cada
+trace pelo parent_id e, para cada caminho da raiz até uma folha, mede:
+
+- total: do início do span raiz (rota da API) ao fim da folha (ex: o
+  handler_notifica), ou seja, a latência do pipeline para aquela conta
+- por salto: a espera antes do salto (queue_ms: outbox, fila SQS, tópico
+  SNS) e a duração do próprio salto
+
+    api POST /contas -> outbox -> sqs conta_criada -> sns <tópico>
+
+Caminhos cuja folha não é o salto final esperado (--final) são contados como
+incompletos (mensagem ainda na fila, falha ou spans de outra invocação fora
+dos logs lidos).
+
+Uso:
+    LOG_FILE=logs/trace.log python -m benchmarks.pipeline_throughput --contas 200 && python -m benchmarks.trace_report logs/trace.log
+    aws logs tail /aws/lambda/contas-a-pagar --since 1h | python -m benchmarks.trace_report - --top 20 --json
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from benchmarks.repository_suite import estatisticas
+
+MARCADOR = 'span {'
+
+def ler_spans(linhas: Iterable[str]) -> Iterator[dict]:
+    """Extrai os registros de span das linhas de log, ignorando o resto"""
+    for linha in linhas:
+        linha = linha.strip()
+        if linha.startswith('{') and '"record"' in linha:
+            # LOG_JSON: a mensagem fica em record.message
+            try:
+                linha = json.loads(linha)['record']['message']
+            except (ValueError, KeyError, TypeError):
+                continue
+        posicao = linha.find(MARCADOR)
+        if posicao < 0:
+            continue
+        try:
+            span = json.loads(linha[posicao + len(MARCADOR) - 1:])
+        except ValueError:
+            continue
+        if isinstance(span, dict) and 'trace_id' in span and 'span_id' in span:
+            yield span
+
+def caminhos(spans: Iterable[dict]) -> List[dict]:
+    """Um caminho por folha de cada trace: saltos da raiz até a folha e latência total"""
+    por_trace: Dict[str, Dict[str, dict]] = {}
+    for span in spans:
+        por_trace.setdefault(span['trace_id'], {})[span['span_id']] = span
+
+    resultado = []
+    for trace_id, por_id in por_trace.items():
+        com_filhos = {span.get('parent_id') for span in por_id.values()}
+        for folha in por_id.values():
+            if folha['span_id'] in com_filhos:
+                continue
+            saltos = [folha]
+            while saltos[-1].get('parent_id') in por_id and len(saltos) <= len(por_id):
+                saltos.append(por_id[saltos[-1]['parent_id']])
+            saltos.reverse()
+
+            raiz = saltos[0]
+            resultado.append({
+                'trace_id': trace_id,
+                'conta_id': next((salto['conta_id'] for salto in reversed(saltos) if 'conta_id' in salto), None),
+                'total_ms': round(folha['start_ms'] + folha['duration_ms'] - raiz['start_ms'], 3),
+                'saltos': [
+                    {'span': salto['span'], 'queue_ms': salto.get('queue_ms'), 'duration_ms': salto['duration_ms']}
+                    for salto in saltos
+                ],
+            })
+    return resultado
+
+def _estatisticas(amostras: List[float]) -> Optional[dict]:
+    return estatisticas(amostras) if amostras else None
+
+def resumir(todos: List[dict], final: str = 'sns', top: int = 10) -> dict:
+    """Estatísticas de ponta a ponta e por salto dos caminhos completos"""
+    completos = [caminho for caminho in todos if caminho['saltos'][-1]['span'].startswith(final)]
+    esperas: Dict[str, List[float]] = {}
+    duracoes: Dict[str, List[float]] = {}
+    for caminho in completos:
+        for salto in caminho['saltos']:
+            duracoes.setdefault(salto['span'], []).append(salto['duration_ms'])
+            if salto['queue_ms'] is not None:
+                esperas.setdefault(salto['span'], []).append(salto['queue_ms'])
+
+    return {
+        'traces': len({caminho['trace_id'] for caminho in todos}),
+        'caminhos': len(todos),
+        'completos': len(completos),
+        'incompletos': len(todos) - len(completos),
+        'ponta_a_ponta': _estatisticas([caminho['total_ms'] for caminho in completos]),
+        'saltos': {
+            nome: {
+                'amostras': len(duracoes[nome]),
+                'espera': _estatisticas(esperas.get(nome, [])),
+                'duracao': _estatisticas(duracoes[nome]),
+            }
+            for nome in duracoes
+        },
+        'mais_lentos': sorted(completos, key=lambda caminho: caminho['total_ms'], reverse=True)[:top],
+    }
+
+def _ms(estatistica: Optional[dict], chave: str) -> str:
+    return f"{estatistica[chave]:.1f}" if estatistica and chave in estatistica else '-'
+
+def _descrever_salto(salto: dict) -> str:
+    """Salto como "nome (+espera duração)", em ms"""
+    espera = '' if salto['queue_ms'] is None else f"+{salto['queue_ms']:.1f} "
+    return f"{salto['span']} ({espera}{salto['duration_ms']:.1f})"
+
+def imprimir(resumo: dict):
+    print(f"traces: {resumo['traces']}  caminhos completos: {resumo['completos']}  incompletos: {resumo['incompletos']}")
+    total = resumo['ponta_a_ponta']
+    if total:
+        print(f"ponta a ponta (ms): mediana {_ms(total, 'mediana_ms')}  p95 {_ms(total, 'p95_ms')}  p99 {_ms(total, 'p99_ms')}")
+    print(f"{'salto':>40} {'n':>6} {'espera p50':>11} {'espera p95':>11} {'duração p50':>12} {'duração p95':>12}")
+    for nome, salto in resumo['saltos'].items():
+        print(f"{nome:>40} {salto['amostras']:>6} {_ms(salto['espera'], 'mediana_ms'):>11} {_ms(salto['espera'], 'p95_ms'):>11} "
+              f"{_ms(salto['duracao'], 'mediana_ms'):>12} {_ms(salto['duracao'], 'p95_ms'):>12}")
+    if resumo['mais_lentos']:
+        print("mais lentos:")
+    for caminho in resumo['mais_lentos']:
+        saltos = ' -> '.join(_descrever_salto(salto) for salto in caminho['saltos'])
+        print(f"  conta {caminho['conta_id']}  {caminho['total_ms']:.1f}ms  {saltos}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('arquivos', nargs='*', default=['logs/app.log'], help="arquivos de log ('-' para stdin)")
+    parser.add_argument('--final', default='sns', help='prefixo do nome do último salto de um caminho completo')
+    parser.add_argument('--top', type=int, default=10, help='quantidade de caminhos mais lentos listados')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    spans = []
+    for arquivo in args.arquivos:
+        if arquivo == '-':
+            spans.extend(ler_spans(sys.stdin))
+        else:
+            with open(arquivo, encoding='utf-8', errors='replace') as linhas:
+                spans.extend(ler_spans(linhas))
+
+    resumo = resumir(caminhos(spans), args.final, args.top)
+    if args.json:
+        print(json.dumps(resumo, indent=2))
+    else:
+        imprimir(resumo)
+
+if __name__ == "__main__":
+    main()
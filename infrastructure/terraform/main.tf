@@ -304,6 +304,7 @@ resource "aws_lambda_function" "create_conta" {
       AURORA_CLUSTER_ARN    = aws_rds_cluster.aurora.arn
       AURORA_SECRET_ARN     = aws_rds_cluster.aurora.master_user_secret[0].secret_arn
       DATABASE_NAME         = var.database_name
+      DB_POOL_STRATEGY      = "single"
       SQS_CONTA_CRIADA_URL  = aws_sqs_queue.conta_criada.url
     }
   }
@@ -331,6 +332,7 @@ resource "aws_lambda_function" "processa_fila" {
       AURORA_CLUSTER_ARN     = aws_rds_cluster.aurora.arn
       AURORA_SECRET_ARN      = aws_rds_cluster.aurora.master_user_secret[0].secret_arn
       DATABASE_NAME          = var.database_name
+      DB_POOL_STRATEGY       = "single"
       SNS_CONTA_CRIADA_TOPIC = aws_sns_topic.conta_criada.arn
       SNS_VENCIMENTOS_TOPIC  = aws_sns_topic.vencimentos.arn
       SNS_PAGAMENTO_TOPIC    = aws_sns_topic.pagamentos.arn
@@ -347,12 +349,18 @@ resource "aws_lambda_event_source_mapping" "sqs_conta_criada" {
   event_source_arn = aws_sqs_queue.conta_criada.arn
   function_name    = aws_lambda_function.processa_fila.arn
   batch_size       = 10
+
+  # O handler retorna batchItemFailures: só as mensagens com falha voltam para a fila
+  function_response_types = ["ReportBatchItemFailures"]
 }
 
 resource "aws_lambda_event_source_mapping" "sqs_processamento" {
   event_source_arn = aws_sqs_queue.processamento.arn
   function_name    = aws_lambda_function.processa_fila.arn
   batch_size       = 10
+
+  # O handler retorna batchItemFailures: só as mensagens com falha voltam para a fila
+  function_response_types = ["ReportBatchItemFailures"]
 }
 
 # API Gateway
@@ -420,3 +428,17 @@ resource "aws_cloudwatch_event_target" "sqs_verificar_vencimentos" {
     message_group_id = "verificacao-vencimentos"
   }
 }
+
+# CloudWatch Event para publicar as mensagens da outbox (contas criadas)
+resource "aws_cloudwatch_event_rule" "drenar_outbox" {
+  name                = "${var.project_name}-drenar-outbox"
+  description         = "Publica no SQS as mensagens gravadas na tabela outbox"
+  schedule_expression = "rate(1 minute)"
+}
+
+resource "aws_cloudwatch_event_target" "sqs_drenar_outbox" {
+  rule      = aws_cloudwatch_event_rule.drenar_outbox.name
+  target_id = "SendToSQS"
+  arn       = aws_sqs_queue.processamento.arn
+  input     = jsonencode({ acao = "drenar_outbox" })
+}
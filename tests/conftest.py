@@ -0,0 +1,5 @@
+import os
+
+# Os testes não gravam no arquivo de log local (logs/app.log); o logger é
+# configurado no primeiro import de app.utils.logger, depois deste módulo
+os.environ['LOG_FILE'] = ''
@@ -0,0 +1,186 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from app.utils.aws_config import AWSClientRegistry, SQSBatchProducer, send_sqs_message_batch
+
+class TestAWSClientRegistry:
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.registry = AWSClientRegistry()
+
+    @patch('app.utils.aws_config.boto3')
+    def test_reutiliza_cliente_por_servico_e_regiao(self, mock_boto3):
+        """Teste de reutilização do cliente já criado"""
+        # Arrange
+        mock_session = mock_boto3.session.Session.return_value
+        mock_session.client.side_effect = lambda service_name, **kwargs: Mock(name=service_name)
+
+        # Act
+        sqs_1 = self.registry.get('sqs', 'us-east-1')
+        sqs_2 = self.registry.get('sqs', 'us-east-1')
+        sqs_outra_regiao = self.registry.get('sqs', 'sa-east-1')
+
+        # Assert
+        assert sqs_1 is sqs_2
+        assert sqs_outra_regiao is not sqs_1
+        assert mock_session.client.call_count == 2
+
+    @patch.dict('os.environ', {'AWS_MAX_POOL_CONNECTIONS': '25', 'AWS_CONNECT_TIMEOUT': '1.5'})
+    @patch('app.utils.aws_config.boto3')
+    def test_configuracao_de_pool_e_timeouts(self, mock_boto3):
+        """Teste das configurações de pool e timeout via ambiente"""
+        # Act
+        self.registry.get('sns', 'us-east-1')
+
+        # Assert
+        config = mock_boto3.session.Session.return_value.client.call_args.kwargs['config']
+        assert config.max_pool_connections == 25
+        assert config.connect_timeout == 1.5
+
+    @patch('app.utils.aws_config.boto3')
+    def test_criacao_concorrente_cria_um_cliente(self, mock_boto3):
+        """Teste de criação thread-safe"""
+        # Arrange
+        mock_session = mock_boto3.session.Session.return_value
+        mock_session.client.side_effect = lambda service_name, **kwargs: Mock(name=service_name)
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clientes = list(executor.map(lambda _: self.registry.get('sqs', 'us-east-1'), range(50)))
+
+        # Assert
+        assert all(cliente is clientes[0] for cliente in clientes)
+        assert mock_session.client.call_count == 1
+
+    @patch('app.utils.aws_config.boto3')
+    def test_warm_up_e_clear(self, mock_boto3):
+        """Teste do aquecimento e descarte dos clientes"""
+        # Arrange
+        mock_session = mock_boto3.session.Session.return_value
+
+        # Act
+        self.registry.warm_up(['sqs', 'sns'], 'us-east-1')
+        self.registry.get('sqs', 'us-east-1')
+        self.registry.clear()
+        self.registry.get('sqs', 'us-east-1')
+
+        # Assert
+        assert mock_session.client.call_count == 3
+
+class TestSQSBatchProducer:
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.producer = SQSBatchProducer(retry_delay=0)
+        self.sqs = Mock()
+        self.sqs.send_message_batch.return_value = {'Successful': [], 'Failed': []}
+
+    def test_envia_lote_ao_completar_10_mensagens(self):
+        """Teste de envio automático quando o lote enche"""
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            # Act
+            for i in range(23):
+                self.producer.send('fila', f'mensagem {i}')
+            enviados_antes_do_flush = self.sqs.send_message_batch.call_count
+            falhas = self.producer.flush()
+
+        # Assert
+        assert enviados_antes_do_flush == 2
+        assert self.sqs.send_message_batch.call_count == 3
+        tamanhos = [len(call.kwargs['Entries']) for call in self.sqs.send_message_batch.call_args_list]
+        assert tamanhos == [10, 10, 3]
+        assert falhas == []
+        assert self.producer.pending() == 0
+
+    def test_respeita_limite_de_256kb(self):
+        """Teste de divisão do lote pelo tamanho total"""
+        # Arrange
+        corpo = 'x' * (100 * 1024)
+
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            # Act
+            for _ in range(3):
+                self.producer.send('fila', corpo)
+            self.producer.flush()
+
+        # Assert
+        tamanhos = [len(call.kwargs['Entries']) for call in self.sqs.send_message_batch.call_args_list]
+        assert tamanhos == [2, 1]
+
+    def test_mensagem_acima_do_limite(self):
+        """Teste de mensagem maior que 256 KB"""
+        with pytest.raises(ValueError):
+            self.producer.send('fila', 'x' * (256 * 1024 + 1))
+
+    def test_flush_retorna_falhas_dos_lotes_enviados_no_send(self):
+        """Teste de falhas de lotes enviados automaticamente, devolvidas no flush"""
+        # Arrange
+        self.sqs.send_message_batch.side_effect = [
+            {'Successful': [], 'Failed': [{'Id': '3', 'Code': 'InvalidParameterValue', 'SenderFault': True}]},
+            {'Successful': [], 'Failed': []},
+        ]
+
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            # Act
+            for i in range(12):
+                self.producer.send('fila', f'mensagem {i}')
+            falhas = self.producer.flush()
+
+        # Assert
+        assert [falha['Id'] for falha in falhas] == ['3']
+        assert falhas[0]['MessageBody'] == 'mensagem 3'
+        assert self.producer.flush() == []
+
+    def test_reenvia_apenas_entradas_com_falha(self):
+        """Teste de reenvio parcial em lote com falha"""
+        # Arrange
+        self.sqs.send_message_batch.side_effect = [
+            {'Successful': [{'Id': '0'}], 'Failed': [{'Id': '1', 'Code': 'InternalError', 'SenderFault': False}]},
+            {'Successful': [{'Id': '1'}], 'Failed': []},
+        ]
+
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            # Act
+            self.producer.send('fila', 'a')
+            self.producer.send('fila', 'b')
+            falhas = self.producer.flush()
+
+        # Assert
+        assert falhas == []
+        reenvio = self.sqs.send_message_batch.call_args_list[1].kwargs['Entries']
+        assert [entry['MessageBody'] for entry in reenvio] == ['b']
+
+    def test_nao_reenvia_erro_do_remetente(self):
+        """Teste de falha definitiva (SenderFault) sem reenvio"""
+        # Arrange
+        self.sqs.send_message_batch.return_value = {
+            'Successful': [],
+            'Failed': [{'Id': '0', 'Code': 'InvalidMessageContents', 'SenderFault': True}]
+        }
+
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            # Act
+            self.producer.send('fila', 'inválida')
+            falhas = self.producer.flush()
+
+        # Assert
+        assert self.sqs.send_message_batch.call_count == 1
+        assert falhas[0]['Code'] == 'InvalidMessageContents'
+        assert falhas[0]['QueueUrl'] == 'fila'
+        assert falhas[0]['MessageBody'] == 'inválida'
+
+    def test_send_sqs_message_batch_identifica_falhas_pela_posicao(self):
+        """Teste do envio síncrono em lote"""
+        # Arrange
+        self.sqs.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            'Failed': [
+                {'Id': entry['Id'], 'Code': 'InvalidMessageContents', 'SenderFault': True}
+                for entry in Entries if entry['MessageBody'] == 'ruim'
+            ]
+        }
+
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            # Act
+            falhas = send_sqs_message_batch('fila', ['ok'] * 12 + ['ruim'])
+
+        # Assert
+        assert [falha['Id'] for falha in falhas] == ['12']
@@ -0,0 +1,141 @@
+import pytest
+import subprocess
+import sys
+from unittest.mock import patch
+from sqlalchemy.pool import NullPool
+from app.utils.aws_config import get_reader_database_url
+from app.utils.database import DatabaseConfig, pool_settings
+from benchmarks.pool_stress import stress
+
+class TestDatabaseConfig:
+    def test_engine_criada_apenas_no_primeiro_uso(self):
+        """Teste de criação tardia da engine e da fábrica de sessões"""
+        # Arrange
+        with patch('app.utils.database.get_database_url', return_value='sqlite://'):
+            config = DatabaseConfig()
+
+        # Assert
+        assert not config.initialized
+
+        # Act
+        session = config.get_session()
+
+        # Assert
+        assert config.initialized
+        assert session.bind is config.engine
+        session.close()
+        config.engine.dispose()
+
+    def test_import_do_entry_point_nao_carrega_boto3_nem_sqlalchemy(self):
+        """Teste de cold start: app.lambda_handler não importa dependências pesadas"""
+        # Arrange
+        codigo = (
+            "import sys, app.lambda_handler; "
+            "print(','.join(m for m in ('boto3', 'botocore', 'sqlalchemy', 'pydantic') if m in sys.modules))"
+        )
+
+        # Act
+        resultado = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+
+        # Assert
+        assert resultado.stdout.strip() == ''
+
+class TestPoolStrategies:
+    @pytest.mark.parametrize('strategy, limite', [('queue', 3), ('single', 1)])
+    def test_conexoes_limitadas_sob_concorrencia(self, tmp_path, strategy, limite):
+        """Teste de carga: conexões abertas não crescem com a concorrência"""
+        # Arrange
+        database_url = f"sqlite:///{tmp_path / 'pool.db'}"
+
+        with patch.dict('os.environ', {'DB_POOL_SIZE': '2', 'DB_MAX_OVERFLOW': '1'}):
+            # Act
+            resultado = stress(database_url, strategy, concurrency=16, operations=64, hold_ms=1)
+
+        # Assert
+        assert resultado['max_open'] <= limite
+        assert resultado['max_checked_out'] <= limite
+
+    def test_null_pool_fecha_conexao_ao_devolver(self, tmp_path):
+        """Teste da estratégia sem pool (RDS Proxy)"""
+        # Arrange
+        config = DatabaseConfig(database_url=f"sqlite:///{tmp_path / 'pool.db'}", pool_strategy='null')
+
+        # Act
+        for _ in range(3):
+            session = config.get_session()
+            session.connection()
+            session.close()
+
+        # Assert
+        assert isinstance(config.engine.pool, NullPool)
+        status = config.pool_status()
+        assert status['connects'] == 3
+        assert status['open'] == 0
+
+    def test_configuracoes_do_pool(self):
+        """Teste de pre-ping, recycle e estratégia inválida"""
+        # Act
+        with patch.dict('os.environ', {'DB_POOL_RECYCLE': '120'}):
+            settings = pool_settings('queue')
+
+        # Assert
+        assert settings['pool_pre_ping'] is True
+        assert settings['pool_recycle'] == 120
+        with pytest.raises(ValueError):
+            pool_settings('invalida')
+
+    def test_pool_single_com_uma_conexao_por_worker_sqs(self):
+        """Teste da estratégia single dimensionada para o consumidor concorrente (SQS_WORKERS)"""
+        # Arrange
+        with patch.dict('os.environ', {'SQS_WORKERS': '4'}):
+            # Act
+            single = pool_settings('single')
+
+        # Assert
+        assert single['pool_size'] == 4
+        assert single['max_overflow'] == 0
+
+class TestReaderRouting:
+    def test_sessao_de_leitura_usa_engine_do_reader(self, tmp_path):
+        """Teste de sessões somente leitura no endpoint das réplicas"""
+        # Arrange
+        config = DatabaseConfig(
+            database_url=f"sqlite:///{tmp_path / 'writer.db'}",
+            reader_url=f"sqlite:///{tmp_path / 'reader.db'}"
+        )
+
+        # Act
+        leitura = config.get_session(read_only=True)
+        escrita = config.get_session()
+
+        # Assert
+        assert config.has_reader
+        assert leitura.bind is config.reader_engine
+        assert escrita.bind is config.engine
+        assert config.reader_engine is not config.engine
+        leitura.close()
+        escrita.close()
+        config.dispose()
+
+    def test_sem_reader_usa_o_writer(self):
+        """Teste de fallback para o writer sem endpoint de leitura"""
+        # Arrange
+        config = DatabaseConfig(database_url='sqlite://', reader_url='')
+
+        # Act
+        session = config.get_session(read_only=True)
+
+        # Assert
+        assert not config.has_reader
+        assert session.bind is config.engine
+        session.close()
+        config.dispose()
+
+    @patch.dict('os.environ', {'DB_READER_HOST': 'contas.cluster-ro.local', 'DB_USER': 'app', 'DB_PASSWORD': 'x'})
+    def test_url_do_reader_pelo_ambiente(self):
+        """Teste da URL do endpoint de leitura"""
+        # Act
+        reader_url = get_reader_database_url()
+
+        # Assert
+        assert reader_url == 'postgresql://app:x@contas.cluster-ro.local:5432/contas_a_pagar'
@@ -1,26 +1,34 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 import json
+from datetime import date
 from app.handlers.handler_create_conta import lambda_handler
+from app.handlers.handler_list_contas import lambda_handler as lambda_handler_list
+from app.handlers.handler_create_contas_lote import lambda_handler as lambda_handler_lote
+from app.handlers.handler_pagar_contas_lote import lambda_handler as lambda_handler_pagar_lote
+from app.handlers.handler_processa_fila import lambda_handler as lambda_handler_fila, agrupar_por_acao, particionar_por_conta
+from app.models.conta import Conta, Status
+from app.models.base import Base
+from app.models.fornecedor import Fornecedor
+from app.repositories.cache import CacheLRU
+from app.repositories.conta_repository import ContaPaga
+from app.utils.database import DatabaseConfig
+from sqlalchemy import insert
 
 class TestHandlerCreateConta:
+    @patch.dict('os.environ', {'SQS_CONTA_CRIADA_URL': 'https://sqs.local/conta-criada'})
+    @patch('app.handlers.handler_create_conta.OutboxRepository')
     @patch('app.handlers.handler_create_conta.db_config')
     @patch('app.handlers.handler_create_conta.ContaRepository')
     @patch('app.handlers.handler_create_conta.FornecedorRepository')
     @patch('app.handlers.handler_create_conta.ServicoConta')
-    def test_lambda_handler_sucesso(self, mock_servico, mock_repo_fornecedor, mock_repo_conta, mock_db_config):
-        """Teste do handler Lambda com sucesso"""
+    def test_lambda_handler_sucesso(self, mock_servico, mock_repo_fornecedor, mock_repo_conta, mock_db_config, mock_outbox):
+        """Teste do handler Lambda com sucesso (evento gravado na outbox, na mesma transação)"""
         # Arrange
-        mock_session = Mock()
+        mock_session = MagicMock()
         mock_db_config.get_session.return_value = mock_session
         
-        mock_conta = Mock()
-        mock_conta.id = 1
-        mock_conta.descricao = "Conta teste"
-        mock_conta.valor = 100.0
-        mock_conta.vencimento.isoformat.return_value = "2024-12-31"
-        mock_conta.status.value = "Aberta"
-        mock_conta.fornecedor_id = 1
+        mock_conta = Conta(id=1, descricao="Conta teste", valor=100.0, vencimento=date(2024, 12, 31), status=Status.ABERTA, fornecedor_id=1)
         
         mock_servico_instance = mock_servico.return_value
         mock_servico_instance.criar_conta.return_value = mock_conta
@@ -43,8 +51,32 @@ class TestHandlerCreateConta:
         body = json.loads(response['body'])
         assert body['id'] == 1
         assert body['descricao'] == "Conta teste"
+        queue_url, mensagem = mock_outbox.return_value.adicionar.call_args[0]
+        assert queue_url == 'https://sqs.local/conta-criada'
+        assert json.loads(mensagem)['conta_id'] == 1
+        mock_session.commit.assert_called_once()
         mock_session.close.assert_called_once()
     
+    def test_segunda_conta_do_fornecedor_usa_cache(self):
+        """Teste do cache de fornecedores aquecido pela criação de contas (unidade de trabalho sem escrita de fornecedor)"""
+        # Arrange
+        config = DatabaseConfig(database_url="sqlite://")
+        Base.metadata.create_all(bind=config.engine)
+        with config.engine.begin() as conn:
+            conn.execute(insert(Fornecedor).values(nome='Fornecedor', documento='1', email='f@test.com', telefone='1'))
+        cache = CacheLRU()
+        event = {'body': json.dumps({'descricao': 'Conta', 'valor': 10.0, 'vencimento': '2024-12-31', 'fornecedor_id': 1})}
+
+        # Act
+        with patch('app.handlers.handler_create_conta.db_config', config), patch('app.repositories.cache.cache_fornecedores', cache):
+            respostas = [lambda_handler(event, {}) for _ in range(3)]
+
+        # Assert
+        assert [resposta['statusCode'] for resposta in respostas] == [201, 201, 201]
+        estatisticas = cache.estatisticas()
+        assert (estatisticas['entries'], estatisticas['hits'], estatisticas['misses']) == (1, 2, 1)
+        config.dispose()
+
     @patch('app.handlers.handler_create_conta.db_config')
     def test_lambda_handler_dados_invalidos(self, mock_db_config):
         """Teste do handler Lambda com dados inválidos"""
@@ -67,3 +99,394 @@ class TestHandlerCreateConta:
         body = json.loads(response['body'])
         assert 'error' in body
         assert body['error'] == 'Dados inválidos'
+
+class TestHandlerListContas:
+    @patch('app.handlers.handler_list_contas.db_config')
+    @patch('app.handlers.handler_list_contas.ContaRepository')
+    @patch('app.handlers.handler_list_contas.FornecedorRepository')
+    @patch('app.handlers.handler_list_contas.ServicoConta')
+    def test_lambda_handler_sucesso(self, mock_servico, mock_repo_fornecedor, mock_repo_conta, mock_db_config):
+        """Teste da listagem paginada com filtros"""
+        # Arrange
+        mock_session = Mock()
+        mock_db_config.get_session.return_value = mock_session
+        
+        conta = Conta(id=1, descricao="Conta teste", valor=100.0, vencimento=date(2024, 12, 31), status=Status.ABERTA, fornecedor_id=1)
+        mock_servico_instance = mock_servico.return_value
+        mock_servico_instance.listar_contas_paginado.return_value = ([conta], "proximo")
+        
+        event = {
+            'queryStringParameters': {
+                'status': 'Aberta',
+                'fornecedor_id': '1',
+                'data_inicio': '2024-12-01',
+                'limit': '10',
+                'cursor': 'atual'
+            }
+        }
+        
+        # Act
+        response = lambda_handler_list(event, {})
+        
+        # Assert
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['items'][0]['id'] == 1
+        assert body['items'][0]['status'] == 'Aberta'
+        assert body['next_cursor'] == "proximo"
+        mock_servico_instance.listar_contas_paginado.assert_called_once_with(
+            limite=10,
+            cursor='atual',
+            status=Status.ABERTA,
+            fornecedor_id=1,
+            data_inicio=date(2024, 12, 1)
+        )
+        mock_session.close.assert_called_once()
+    
+    @patch('app.handlers.handler_list_contas.db_config')
+    def test_lambda_handler_parametros_invalidos(self, mock_db_config):
+        """Teste da listagem com parâmetros inválidos"""
+        # Arrange
+        event = {'queryStringParameters': {'status': 'Inexistente'}}
+        
+        # Act
+        response = lambda_handler_list(event, {})
+        
+        # Assert
+        assert response['statusCode'] == 400
+        mock_db_config.get_session.assert_not_called()
+
+class TestHandlerCreateContasLote:
+    @patch.dict('os.environ', {'SQS_CONTA_CRIADA_URL': 'https://sqs.local/conta-criada'})
+    @patch('app.handlers.handler_create_contas_lote.OutboxRepository')
+    @patch('app.handlers.handler_create_contas_lote.db_config')
+    @patch('app.handlers.handler_create_contas_lote.ServicoConta')
+    def test_lambda_handler_lote_parcial(self, mock_servico, mock_db_config, mock_outbox):
+        """Teste de criação em lote com falha parcial"""
+        # Arrange
+        mock_servico.return_value.criar_contas_em_lote.return_value = [
+            {'indice': 0, 'status': 'criada', 'id': 1, 'valor': 10.0, 'vencimento': '2024-12-31'},
+            {'indice': 1, 'status': 'erro', 'erro': 'O valor da conta deve ser positivo'},
+        ]
+        event = {'body': json.dumps({'contas': [{'descricao': 'A'}, {'descricao': 'B'}]})}
+        
+        # Act
+        response = lambda_handler_lote(event, {})
+        
+        # Assert
+        assert response['statusCode'] == 207
+        body = json.loads(response['body'])
+        assert body['criadas'] == 1
+        assert body['erros'] == 1
+        queue_url, mensagens = mock_outbox.return_value.adicionar_varios.call_args[0]
+        assert queue_url == 'https://sqs.local/conta-criada'
+        assert [json.loads(mensagem)['conta_id'] for mensagem in mensagens] == [1]
+        mock_db_config.get_session.return_value.commit.assert_called_once()
+        mock_db_config.get_session.return_value.close.assert_called_once()
+    
+    @patch('app.handlers.handler_create_contas_lote.OutboxRepository')
+    @patch('app.handlers.handler_create_contas_lote.db_config')
+    @patch('app.handlers.handler_create_contas_lote.ServicoConta')
+    def test_lambda_handler_lote_sem_contas_criadas(self, mock_servico, mock_db_config, mock_outbox):
+        """Teste de criação em lote em que todos os itens falham"""
+        # Arrange
+        mock_servico.return_value.criar_contas_em_lote.return_value = [
+            {'indice': 0, 'status': 'erro', 'erro': 'O valor da conta deve ser positivo'},
+            {'indice': 1, 'status': 'erro', 'erro': 'Fornecedor não encontrado'},
+        ]
+        event = {'body': json.dumps({'contas': [{'descricao': 'A'}, {'descricao': 'B'}]})}
+        
+        # Act
+        response = lambda_handler_lote(event, {})
+        
+        # Assert
+        assert response['statusCode'] == 400
+        body = json.loads(response['body'])
+        assert (body['criadas'], body['erros']) == (0, 2)
+        assert [resultado['erro'] for resultado in body['resultados']] == ['O valor da conta deve ser positivo', 'Fornecedor não encontrado']
+        mock_outbox.return_value.adicionar_varios.assert_not_called()
+    
+    def test_lambda_handler_lote_vazio(self):
+        """Teste de criação em lote sem contas"""
+        # Act
+        response = lambda_handler_lote({'body': json.dumps({'contas': []})}, {})
+        
+        # Assert
+        assert response['statusCode'] == 400
+
+class TestHandlerPagarContasLote:
+    @patch.dict('os.environ', {'SNS_PAGAMENTO_TOPIC': 'arn:aws:sns:local:pagamentos'})
+    @patch('app.handlers.handler_pagar_contas_lote.publish_sns_message')
+    @patch('app.handlers.handler_pagar_contas_lote.db_config')
+    @patch('app.handlers.handler_pagar_contas_lote.ServicoConta')
+    def test_pagar_contas_do_fornecedor(self, mock_servico, mock_db_config, mock_publish):
+        """Teste de pagamento em lote de todas as contas em aberto de um fornecedor"""
+        # Arrange
+        mock_servico.return_value.pagar_contas.return_value = [ContaPaga(1, "A", 10.0, 7), ContaPaga(2, "B", 5.5, 7)]
+        mock_servico.return_value.nomes_fornecedores.return_value = {7: "Fornecedor"}
+        event = {'body': json.dumps({'fornecedor_id': 7})}
+        
+        # Act
+        response = lambda_handler_pagar_lote(event, {})
+        
+        # Assert
+        assert response['statusCode'] == 200
+        assert json.loads(response['body']) == {'pagas': 2, 'total': 15.5, 'ids': [1, 2], 'notificacao_falhou': False}
+        mock_servico.return_value.pagar_contas.assert_called_once_with(conta_ids=None, fornecedor_id=7)
+        mock_publish.assert_called_once_with(
+            'arn:aws:sns:local:pagamentos', "2 contas pagas - Total R$15.50 - Fornecedor: Fornecedor", "Contas Pagas"
+        )
+        mock_db_config.get_session.return_value.close.assert_called_once()
+    
+    @patch.dict('os.environ', {'SNS_PAGAMENTO_TOPIC': 'arn:aws:sns:local:pagamentos'})
+    @patch('app.handlers.handler_pagar_contas_lote.publish_sns_message')
+    @patch('app.handlers.handler_pagar_contas_lote.db_config')
+    @patch('app.handlers.handler_pagar_contas_lote.ServicoConta')
+    def test_falha_na_notificacao_mantem_pagamento(self, mock_servico, mock_db_config, mock_publish):
+        """Teste de SNS indisponível após o pagamento confirmado"""
+        # Arrange
+        mock_servico.return_value.pagar_contas.return_value = [ContaPaga(1, "A", 10.0, 7)]
+        mock_servico.return_value.nomes_fornecedores.return_value = {}
+        mock_publish.side_effect = Exception("SNS indisponível")
+        
+        # Act
+        response = lambda_handler_pagar_lote({'body': json.dumps({'conta_ids': [1]})}, {})
+        
+        # Assert
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert (body['pagas'], body['notificacao_falhou']) == (1, True)
+    
+    def test_pagar_contas_sem_criterio(self):
+        """Teste de pagamento em lote sem contas nem fornecedor"""
+        # Act
+        response = lambda_handler_pagar_lote({'body': json.dumps({})}, {})
+        
+        # Assert
+        assert response['statusCode'] == 400
+
+class TestHandlerProcessaFila:
+    def _record(self, message_id, body):
+        return {'messageId': message_id, 'eventSource': 'aws:sqs', 'body': json.dumps(body) if isinstance(body, dict) else body}
+    
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_lote_com_uma_sessao_e_falhas_parciais(self, mock_servico, mock_db_config):
+        """Teste de processamento do lote numa sessão, reportando só as falhas"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_db_config.get_session.return_value = mock_session
+        servico = mock_servico.return_value
+        servico.buscar_contas.return_value = []
+        servico.marcar_como_paga.side_effect = [True, Exception("erro no banco")]
+        
+        event = {
+            'Records': [
+                self._record('m1', {'acao': 'conta_criada', 'conta_id': 1}),
+                self._record('m2', {'acao': 'marcar_como_paga', 'conta_id': 2}),
+                self._record('m3', 'isto não é json'),
+                self._record('m4', {'acao': 'marcar_como_paga', 'conta_id': 3}),
+                self._record('m5', {'acao': 'conta_criada', 'conta_id': 4}),
+            ]
+        }
+        
+        # Act
+        response = lambda_handler_fila(event, {})
+        
+        # Assert
+        falhas = sorted(item['itemIdentifier'] for item in response['batchItemFailures'])
+        assert falhas == ['m3', 'm4']
+        mock_db_config.get_session.assert_called_once()
+        mock_session.close.assert_called_once()
+        servico.buscar_contas.assert_called_once_with([1, 4], com_fornecedor=True)
+        mock_session.commit.assert_called_once()
+    
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_verificacao_de_vencimentos_uma_vez_por_lote(self, mock_servico, mock_db_config):
+        """Teste de deduplicação da verificação de vencimentos no lote"""
+        # Arrange
+        servico = mock_servico.return_value
+        servico.atualizar_status_atrasadas.return_value = 0
+        servico.listar_contas_vencendo.return_value = []
+        event = {
+            'Records': [
+                self._record('m1', {'acao': 'verificar_vencimentos'}),
+                self._record('m2', {'acao': 'verificar_vencimentos'}),
+            ]
+        }
+        
+        # Act
+        response = lambda_handler_fila(event, {})
+        
+        # Assert
+        assert response['batchItemFailures'] == []
+        servico.atualizar_status_atrasadas.assert_called_once()
+    
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_falha_no_grupo_reporta_todas_as_mensagens_do_grupo(self, mock_servico, mock_db_config):
+        """Teste de falha de um grupo inteiro (ex: erro no commit)"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session.commit.side_effect = Exception("conexão perdida")
+        mock_db_config.get_session.return_value = mock_session
+        mock_servico.return_value.marcar_como_paga.return_value = True
+        event = {
+            'Records': [
+                self._record('m1', {'acao': 'marcar_como_paga', 'conta_id': 1}),
+                self._record('m2', {'acao': 'marcar_como_paga', 'conta_id': 2}),
+            ]
+        }
+        
+        # Act
+        response = lambda_handler_fila(event, {})
+        
+        # Assert
+        assert sorted(item['itemIdentifier'] for item in response['batchItemFailures']) == ['m1', 'm2']
+    
+    def test_agrupar_por_acao_preserva_ordem_por_conta(self):
+        """Teste de segmentação quando a mesma conta recebe ações diferentes"""
+        # Arrange
+        records = [
+            self._record('m1', {'acao': 'conta_criada', 'conta_id': 1}),
+            self._record('m2', {'acao': 'marcar_como_paga', 'conta_id': 2}),
+            self._record('m3', {'acao': 'marcar_como_paga', 'conta_id': 1}),
+            self._record('m4', {'acao': 'conta_criada', 'conta_id': 3}),
+        ]
+        
+        # Act
+        segmentos, invalidas = agrupar_por_acao(records)
+        
+        # Assert
+        assert invalidas == []
+        ordem = [[message_id for message_id, _ in mensagens] for grupos in segmentos for mensagens in grupos.values()]
+        assert ordem == [['m1'], ['m2'], ['m3'], ['m4']]
+    
+    def test_particionar_por_conta(self):
+        """Teste de particionamento mantendo cada conta numa única partição"""
+        # Arrange
+        records = [self._record(f'm{i}', {'acao': 'marcar_como_paga', 'conta_id': i % 5}) for i in range(20)]
+        records.append(self._record('v', {'acao': 'verificar_vencimentos'}))
+        
+        # Act
+        partes, sem_conta = particionar_por_conta(records, 3)
+        
+        # Assert
+        assert sum(len(parte) for parte in partes) == 20
+        for conta_id in range(5):
+            contendo = [parte for parte in partes if any(json.loads(r['body']).get('conta_id') == conta_id for r in parte)]
+            assert len(contendo) == 1
+            ids = [r['messageId'] for r in contendo[0] if json.loads(r['body']).get('conta_id') == conta_id]
+            assert ids == [f'm{i}' for i in range(20) if i % 5 == conta_id]
+        assert [r['messageId'] for r in sem_conta] == ['v']
+    
+    @patch.dict('os.environ', {'SQS_WORKERS': '4'})
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_modo_concorrente_uma_sessao_por_particao(self, mock_servico, mock_db_config):
+        """Teste do modo concorrente com sessões independentes"""
+        # Arrange
+        mock_db_config.get_session.side_effect = lambda: MagicMock()
+        mock_servico.return_value.marcar_como_paga.side_effect = lambda conta_id: conta_id != 3
+        records = [self._record(f'm{i}', {'acao': 'marcar_como_paga', 'conta_id': i}) for i in range(8)]
+        
+        # Act
+        response = lambda_handler_fila({'Records': records}, {})
+        
+        # Assert
+        assert response['batchItemFailures'] == []
+        assert mock_db_config.get_session.call_count == 4
+        assert mock_servico.return_value.marcar_como_paga.call_count == 8
+    
+    @patch.dict('os.environ', {'SQS_WORKERS': '4'})
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_modo_concorrente_mensagens_sem_conta_depois_das_particoes(self, mock_servico, mock_db_config):
+        """Teste de pagamento em lote processado em série, após os pagamentos por conta"""
+        # Arrange
+        ordem = []
+        mock_db_config.get_session.side_effect = lambda: MagicMock()
+        servico = mock_servico.return_value
+        servico.marcar_como_paga.side_effect = lambda conta_id: ordem.append(('conta', conta_id)) or None
+        servico.pagar_contas.side_effect = lambda conta_ids, fornecedor_id: ordem.append(('lote', tuple(conta_ids))) or []
+        records = [self._record('lote', {'acao': 'marcar_como_paga_lote', 'conta_ids': [1, 2]})]
+        records += [self._record(f'm{i}', {'acao': 'marcar_como_paga', 'conta_id': i}) for i in range(4)]
+        
+        # Act
+        response = lambda_handler_fila({'Records': records}, {})
+        
+        # Assert
+        assert response['batchItemFailures'] == []
+        assert ordem[-1] == ('lote', (1, 2))
+        assert sorted(ordem[:-1]) == [('conta', i) for i in range(4)]
+    
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_acao_desconhecida_volta_para_a_fila(self, mock_servico, mock_db_config):
+        """Teste de ação não reconhecida reportada em batchItemFailures (segue para a DLQ)"""
+        # Arrange
+        records = [self._record('m1', {'acao': 'acao_inexistente', 'conta_id': 1})]
+        
+        # Act
+        response = lambda_handler_fila({'Records': records}, {})
+        
+        # Assert
+        assert response['batchItemFailures'] == [{'itemIdentifier': 'm1'}]
+    
+    @patch.dict('os.environ', {'SNS_PAGAMENTO_TOPIC': 'arn:aws:sns:local:pagamentos'})
+    @patch('app.handlers.handler_processa_fila.publish_sns_message')
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_pagamentos_sem_nova_notificacao_em_reentrega(self, mock_servico, mock_db_config, mock_publish):
+        """Teste de pagamento idempotente e pagamento em lote via SQS"""
+        # Arrange
+        servico = mock_servico.return_value
+        servico.marcar_como_paga.side_effect = [ContaPaga(1, "A", 10.0, 7), None]
+        servico.pagar_contas.return_value = [ContaPaga(2, "B", 5.0, 7), ContaPaga(3, "C", 5.0, 7)]
+        servico.nomes_fornecedores.return_value = {7: "Fornecedor"}
+        event = {
+            'Records': [
+                self._record('m1', {'acao': 'marcar_como_paga', 'conta_id': 1}),
+                self._record('m2', {'acao': 'marcar_como_paga', 'conta_id': 1}),
+                self._record('m3', {'acao': 'marcar_como_paga_lote', 'fornecedor_id': 7}),
+            ]
+        }
+        
+        # Act
+        response = lambda_handler_fila(event, {})
+        
+        # Assert
+        assert response['batchItemFailures'] == []
+        servico.pagar_contas.assert_called_once_with(conta_ids=None, fornecedor_id=7)
+        mensagens = [chamada.args[1] for chamada in mock_publish.call_args_list]
+        assert mensagens == [
+            "Conta paga: A - R$10.0 - Fornecedor: Fornecedor",
+            "2 contas pagas - Total R$10.00 - Fornecedor: Fornecedor",
+        ]
+    
+    @patch.dict('os.environ', {'SNS_PAGAMENTO_TOPIC': 'arn:aws:sns:local:pagamentos'})
+    @patch('app.handlers.handler_processa_fila.publish_sns_message')
+    @patch('app.handlers.handler_processa_fila.db_config')
+    @patch('app.handlers.handler_processa_fila.ServicoConta')
+    def test_falha_na_notificacao_nao_devolve_pagamento_a_fila(self, mock_servico, mock_db_config, mock_publish):
+        """Teste de SNS indisponível após pagamentos confirmados: a reentrega não notificaria de novo"""
+        # Arrange
+        servico = mock_servico.return_value
+        servico.marcar_como_paga.return_value = ContaPaga(1, "A", 10.0, 7)
+        servico.pagar_contas.return_value = [ContaPaga(2, "B", 5.0, 7)]
+        servico.nomes_fornecedores.side_effect = Exception("conexão perdida")
+        mock_publish.side_effect = Exception("SNS indisponível")
+        event = {
+            'Records': [
+                self._record('m1', {'acao': 'marcar_como_paga', 'conta_id': 1}),
+                self._record('m2', {'acao': 'marcar_como_paga_lote', 'conta_ids': [2]}),
+            ]
+        }
+        
+        # Act
+        response = lambda_handler_fila(event, {})
+        
+        # Assert
+        assert response['batchItemFailures'] == []
+        assert mock_publish.call_count == 2
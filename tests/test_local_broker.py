@@ -0,0 +1,114 @@
+import json
+from unittest.mock import patch
+from app.handlers.orchestrator import identify_event_type
+from app.utils import aws_config
+from app.utils.aws_config import get_messaging_backend, publish_sns_message, send_sqs_message, set_messaging_backend
+from app.utils.local_broker import InMemoryBroker
+
+class TestInMemoryBroker:
+    def setup_method(self):
+        """Setup para cada teste com um handler que registra os eventos recebidos"""
+        self.eventos = []
+        self.falhar = set()
+        self.broker = InMemoryBroker(handler=self._handler, batch_size=3, visibility_timeout=0, max_receives=2)
+
+    def _handler(self, event, context):
+        self.eventos.append(event)
+        return {'batchItemFailures': [
+            {'itemIdentifier': record['messageId']}
+            for record in event.get('Records', [])
+            if record.get('body') in self.falhar
+        ]}
+
+    def test_entrega_em_lotes_como_evento_sqs(self):
+        """Teste de entrega em lotes no formato do event source mapping"""
+        # Arrange
+        url = self.broker.create_queue('fila')
+        for i in range(7):
+            self.broker.send(url, json.dumps({'i': i}))
+
+        # Act
+        entregues = self.broker.run_until_idle(timeout=5)
+
+        # Assert
+        assert entregues == 7
+        assert [len(evento['Records']) for evento in self.eventos] == [3, 3, 1]
+        assert identify_event_type(self.eventos[0]) == 'sqs'
+        assert self.broker.stats()['queues']['fila']['deleted'] == 7
+        assert self.broker.pending() == 0
+
+    def test_reentrega_falhas_e_dead_letter(self):
+        """Teste de reentrega de batchItemFailures até o limite de recebimentos"""
+        # Arrange
+        url = self.broker.create_queue('fila')
+        self.broker.send(url, 'ok')
+        self.broker.send(url, 'falha')
+        self.falhar.add('falha')
+
+        # Act
+        self.broker.run_until_idle(timeout=5)
+
+        # Assert
+        fila = self.broker.queues[url]
+        assert [message.body for message in fila.dead_letters] == ['falha']
+        assert fila.stats['failed'] == 2
+        assert fila.stats['deleted'] == 1
+
+    def test_publicacao_sns_entregue_ao_handler_e_filas_assinantes(self):
+        """Teste de notificação SNS para o handler e cópia para fila assinante"""
+        # Arrange
+        topico = self.broker.create_topic('conta-criada')
+        self.broker.subscribe(topico, 'auditoria')
+
+        # Act
+        self.broker.publish(topico, 'Nova conta', 'Assunto')
+        self.broker.run_until_idle(timeout=5)
+
+        # Assert
+        notificacoes = [evento for evento in self.eventos if identify_event_type(evento) == 'sns']
+        assert len(notificacoes) == 1
+        assert notificacoes[0]['Records'][0]['Sns']['Message'] == 'Nova conta'
+        assert self.broker.stats()['queues']['auditoria']['deleted'] == 1
+
+    def test_agendamento_dispara_evento_cloudwatch(self):
+        """Teste de regra agendada entregue como evento do CloudWatch"""
+        # Arrange
+        self.broker.schedule('drenar-outbox', interval=60)
+
+        # Act
+        self.broker.deliver()
+        self.broker.deliver()
+
+        # Assert
+        assert len(self.eventos) == 1
+        assert identify_event_type(self.eventos[0]) == 'cloudwatch_event'
+        assert self.eventos[0]['detail']['rule-name'] == 'drenar-outbox'
+
+class TestMessagingBackend:
+    def teardown_method(self):
+        set_messaging_backend(None)
+
+    def test_envio_e_publicacao_pelo_broker(self):
+        """Teste de send_sqs_message/publish_sns_message roteados para o backend configurado"""
+        # Arrange
+        broker = InMemoryBroker(handler=lambda event, context: None)
+        set_messaging_backend(broker)
+
+        # Act
+        send_sqs_message('https://sqs.local/000/fila', '{"acao": "x"}')
+        publish_sns_message('arn:aws:sns:us-east-1:000:topico', 'mensagem')
+
+        # Assert
+        stats = broker.stats()
+        assert stats['queues']['fila']['sent'] == 1
+        assert stats['topics']['topico']['published'] == 1
+
+    @patch.dict('os.environ', {'MESSAGING_BACKEND': 'memory'})
+    def test_backend_em_memoria_por_variavel_de_ambiente(self):
+        """Teste de MESSAGING_BACKEND=memory sem criar clientes boto3"""
+        # Act
+        backend = get_messaging_backend()
+
+        # Assert
+        assert isinstance(backend, InMemoryBroker)
+        assert backend is not aws_config.client_registry
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from app.handlers.orchestrator import identify_event_type
+from app.local_server import ASGIAdapter, LocalInvoker, LocalServer, build_event, to_http_response
+
+def eco(event, context):
+    return {
+        'statusCode': 201,
+        'headers': {'X-Metodo': event['httpMethod']},
+        'body': json.dumps({
+            'path': event['path'],
+            'query': event['queryStringParameters'],
+            'body': event['body'],
+            'restante_ms': context.get_remaining_time_in_millis(),
+        }),
+    }
+
+class TestConversaoDeEventos:
+    def test_monta_evento_do_api_gateway(self):
+        """Teste de requisição HTTP convertida em evento de proxy"""
+        # Act
+        event = build_event('post', '/contas', 'status=Aberta&tag=a&tag=b', [('Content-Type', 'application/json')], b'{"valor": 1}')
+
+        # Assert
+        assert identify_event_type(event) == 'api_gateway'
+        assert event['httpMethod'] == 'POST'
+        assert event['queryStringParameters'] == {'status': 'Aberta', 'tag': 'b'}
+        assert event['multiValueQueryStringParameters']['tag'] == ['a', 'b']
+        assert event['headers'] == {'Content-Type': 'application/json'}
+        assert event['body'] == '{"valor": 1}'
+        assert event['isBase64Encoded'] is False
+
+    def test_corpo_binario_em_base64(self):
+        """Teste de corpo que não é UTF-8"""
+        # Act
+        event = build_event('POST', '/contas', '', [], b'\xff\xfe')
+
+        # Assert
+        assert event['isBase64Encoded'] is True
+        assert event['body'] == '//4='
+        assert event['queryStringParameters'] is None
+
+    def test_resposta_do_handler_em_http(self):
+        """Teste de resposta de proxy convertida em status, cabeçalhos e corpo"""
+        # Act
+        status, headers, payload = to_http_response({'statusCode': 404, 'body': '{"error": "x"}'})
+
+        # Assert
+        assert status == 404
+        assert ('Content-Type', 'application/json') in headers
+        assert payload == b'{"error": "x"}'
+
+class TestLocalInvoker:
+    def test_limita_invocacoes_simultaneas(self):
+        """Teste do limite de concorrência"""
+        # Arrange
+        def lento(event, context):
+            time.sleep(0.05)
+            return {'statusCode': 200, 'body': ''}
+        invoker = LocalInvoker(handler=lento, concurrency=2)
+
+        # Act
+        with ThreadPoolExecutor(6) as executor:
+            list(executor.map(invoker, [{}] * 6))
+
+        # Assert
+        stats = invoker.stats()
+        assert stats['invocations'] == 6
+        assert stats['max_in_flight'] == 2
+        assert stats['in_flight'] == 0
+
+    def test_excecao_do_handler_vira_502(self):
+        """Teste de exceção não tratada no handler"""
+        # Arrange
+        def quebra(event, context):
+            raise RuntimeError('falhou')
+        invoker = LocalInvoker(handler=quebra, concurrency=1)
+
+        # Act
+        result = invoker({})
+
+        # Assert
+        assert result['statusCode'] == 502
+        assert invoker.stats()['errors'] == 1
+
+class TestLocalServer:
+    def setup_method(self):
+        """Setup para cada teste com o servidor numa porta livre"""
+        self.server = LocalServer(('127.0.0.1', 0), LocalInvoker(handler=eco, concurrency=4, timeout=10))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requisicoes_concorrentes(self):
+        """Teste de requisições HTTP entregues ao handler em paralelo"""
+        # Arrange
+        def post(i):
+            request = urllib.request.Request(f'{self.url}/contas?i={i}', data=b'{"valor": 1}', method='POST')
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers['X-Metodo'], json.loads(response.read())
+
+        # Act
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(post, range(16)))
+
+        # Assert
+        assert {status for status, _, _ in results} == {201}
+        assert {metodo for _, metodo, _ in results} == {'POST'}
+        assert sorted(int(body['query']['i']) for _, _, body in results) == list(range(16))
+        assert all(0 < body['restante_ms'] <= 10000 for _, _, body in results)
+        assert self.server.invoker.stats()['invocations'] == 16
+
+class TestASGIAdapter:
+    def test_requisicao_http(self):
+        """Teste da aplicação ASGI repassando a requisição ao handler"""
+        # Arrange
+        adapter = ASGIAdapter(LocalInvoker(handler=eco, concurrency=2))
+        scope = {'type': 'http', 'method': 'GET', 'path': '/contas', 'query_string': b'status=Paga', 'headers': [(b'accept', b'*/*')]}
+        mensagens = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        enviadas = []
+
+        async def receive():
+            return mensagens.pop(0)
+
+        async def send(message):
+            enviadas.append(message)
+
+        # Act
+        asyncio.run(adapter(scope, receive, send))
+
+        # Assert
+        assert enviadas[0]['status'] == 201
+        assert (b'x-metodo', b'GET') in enviadas[0]['headers']
+        assert json.loads(enviadas[1]['body'])['query'] == {'status': 'Paga'}
@@ -0,0 +1,69 @@
+from unittest.mock import patch
+from loguru import logger
+from app.utils import logger as logger_module
+from app.utils.logger import configure_logger, get_logger, log_payload, truncate_payload
+
+class TestLogger:
+    def setup_method(self):
+        """Setup para cada teste com sink em memória"""
+        configure_logger()
+        self.mensagens = []
+        self.sink_id = logger.add(self.mensagens.append, level="INFO", format="{message}")
+
+    def teardown_method(self):
+        logger.remove(self.sink_id)
+
+    def test_configura_apenas_uma_vez(self):
+        """Teste de configuração idempotente do logger"""
+        with patch.object(logger_module.logger, 'remove') as mock_remove:
+            # Act
+            get_logger('a')
+            get_logger('b')
+
+        # Assert
+        mock_remove.assert_not_called()
+
+    def test_truncate_payload_limita_tamanho(self):
+        """Teste de serialização limitada de payloads grandes"""
+        # Arrange
+        payload = {'Records': [{'body': 'x' * 100} for _ in range(10000)]}
+
+        # Act
+        texto = truncate_payload(payload, max_bytes=200)
+
+        # Assert
+        assert texto.startswith('{"Records": [{"body": "xxx')
+        assert texto.endswith('[truncado em 200 bytes]')
+        assert len(texto) < 250
+
+    def test_truncate_payload_conta_bytes_utf8(self):
+        """Teste do limite em bytes com caracteres multibyte, sem cortar um caractere ao meio"""
+        # Arrange
+        payload = {'descricao': 'ação' * 100}
+
+        # Act
+        texto = truncate_payload(payload, max_bytes=19)
+
+        # Assert
+        conteudo = texto.split('... [truncado')[0]
+        assert len(conteudo.encode()) <= 19
+        assert conteudo == '{"descricao": "aç'
+
+    def test_log_payload_nao_serializa_com_nivel_desabilitado(self):
+        """Teste de formatação ignorada quando o nível não está habilitado"""
+        # Arrange
+        with patch('app.utils.logger.truncate_payload') as mock_truncate:
+            # Act
+            log_payload(logger, "Evento", {'a': 1}, level="TRACE")
+
+        # Assert
+        mock_truncate.assert_not_called()
+
+    def test_log_payload_com_amostragem(self):
+        """Teste de amostragem dos payloads registrados"""
+        # Act
+        log_payload(logger, "Descartado", {'a': 1}, sample_rate=0)
+        log_payload(logger, "Registrado", {'a': 1}, sample_rate=1)
+
+        # Assert
+        assert [str(mensagem).strip() for mensagem in self.mensagens] == ['Registrado: {"a": 1}']
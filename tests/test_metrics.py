@@ -0,0 +1,165 @@
+import io
+import json
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from app.handlers.orchestrator import handle_event
+from app.utils.metrics import EMF_MAX_VALUES, Histogram, MetricsRegistry, instrument_engine, metrics
+
+class TestHistogram:
+    def test_buckets_e_percentis(self):
+        """Teste de contagem por bucket e percentis aproximados"""
+        # Arrange
+        histogram = Histogram(buckets=(1, 10, 100))
+
+        # Act
+        for valor in [0.5] * 50 + [5] * 45 + [50] * 4 + [500]:
+            histogram.observe(valor)
+
+        # Assert
+        snapshot = histogram.snapshot()
+        assert snapshot['count'] == 100
+        assert snapshot['buckets'] == {'le_1': 50, 'le_10': 45, 'le_100': 4, 'le_inf': 1}
+        assert snapshot['p50'] == 1
+        assert snapshot['p95'] == 10
+        assert snapshot['p99'] == 100
+        assert histogram.percentile(100) == 500
+
+class TestMetricsRegistry:
+    def setup_method(self):
+        """Setup para cada teste com registro emitindo EMF em memória"""
+        self.saida = io.StringIO()
+        self.registry = MetricsRegistry(enabled=True, namespace='Teste', emf=True, stream=self.saida)
+
+    def test_flush_emite_emf_por_conjunto_de_dimensoes(self):
+        """Teste de documentos EMF agrupados por dimensões"""
+        # Arrange
+        self.registry.incr('db.sessions')
+        self.registry.incr('db.sessions')
+        self.registry.observe('route', 12.5, Route='GET /contas')
+        self.registry.gauge('fila.pendentes', 3)
+
+        # Act
+        documentos = self.registry.flush()
+
+        # Assert
+        linhas = [json.loads(linha) for linha in self.saida.getvalue().splitlines()]
+        assert linhas == documentos
+        por_dimensao = {tuple(doc['_aws']['CloudWatchMetrics'][0]['Dimensions'][0]): doc for doc in documentos}
+        geral = por_dimensao[('Service',)]
+        assert geral['db.sessions'] == 2
+        assert geral['fila.pendentes'] == 3
+        assert geral['_aws']['CloudWatchMetrics'][0]['Namespace'] == 'Teste'
+        rota = por_dimensao[('Service', 'Route')]
+        assert rota['Route'] == 'GET /contas'
+        assert rota['route'] == [12.5]
+        assert rota['_aws']['CloudWatchMetrics'][0]['Metrics'] == [{'Name': 'route', 'Unit': 'Milliseconds'}]
+
+    def test_latencias_acima_do_limite_emf_em_varios_documentos(self):
+        """Teste de latências agregadas na chegada e divididas em blocos de 100 valores, sem descartar amostras"""
+        # Arrange
+        for indice in range(10_000):
+            self.registry.observe('sqs.send', 1.0 + (indice % 3) + 1e-7 * indice)
+        self.registry.incr('db.sessions')
+
+        # Act
+        pendentes = len(self.registry._pending_values[('sqs.send', ())])
+        documentos = self.registry.flush()
+
+        # Assert
+        assert pendentes == 3
+        blocos = [doc['sqs.send'] for doc in documentos]
+        assert all(len(bloco) <= EMF_MAX_VALUES for bloco in blocos)
+        assert sum(len(bloco) for bloco in blocos) == 10_000
+        assert sorted(set(valor for bloco in blocos for valor in bloco)) == [1.0, 2.0, 3.0]
+        assert [doc.get('db.sessions') for doc in documentos].count(1) == 1
+
+    def test_flush_zera_invocacao_e_mantem_totais(self):
+        """Teste de medições da invocação zeradas e totais do processo preservados"""
+        # Arrange
+        self.registry.observe('sqs.send', 4.0)
+        self.registry.flush()
+
+        # Act
+        segundo = self.registry.flush()
+
+        # Assert
+        assert segundo == []
+        snapshot = self.registry.snapshot()
+        assert snapshot['histograms']['sqs.send']['count'] == 1
+        assert snapshot['invocations'] == 2
+
+    def test_timer_conta_erros(self):
+        """Teste de timer registrando latência e erro"""
+        # Act
+        with pytest.raises(RuntimeError):
+            with self.registry.timer('sns.publish'):
+                raise RuntimeError('falhou')
+
+        # Assert
+        snapshot = self.registry.snapshot()
+        assert snapshot['counters'] == {'sns.publish.errors': 1}
+        assert snapshot['histograms']['sns.publish']['count'] == 1
+
+    def test_registro_desligado_nao_mede(self):
+        """Teste de METRICS_ENABLED=false"""
+        # Arrange
+        registry = MetricsRegistry(enabled=False, emf=True, stream=self.saida)
+
+        # Act
+        registry.incr('x')
+        registry.observe('y', 1.0)
+
+        # Assert
+        assert registry.flush() == []
+        assert self.saida.getvalue() == ''
+
+    def test_instrumentacao_da_engine(self):
+        """Teste de tempo por comando SQL e por conexão fora do pool"""
+        # Arrange
+        engine = create_engine('sqlite://')
+        instrument_engine(engine, self.registry)
+
+        # Act
+        with engine.connect() as conn:
+            conn.execute(text('select 1'))
+            conn.execute(text('select 2'))
+
+        # Assert
+        histograms = self.registry.snapshot()['histograms']
+        assert histograms['db.query']['count'] == 2
+        assert histograms['db.connection']['count'] == 1
+        engine.dispose()
+
+class TestMetricasDoOrquestrador:
+    def setup_method(self):
+        metrics.reset()
+
+    def teardown_method(self):
+        metrics.reset()
+
+    def test_rota_medida_e_exposta_no_health(self):
+        """Teste de latência por rota e totais no /health"""
+        # Arrange
+        event = {'httpMethod': 'GET', 'resource': '/health', 'path': '/health'}
+
+        # Act
+        handle_event(event, None)
+        response = handle_event(event, None)
+
+        # Assert
+        body = json.loads(response['body'])
+        assert body['metrics']['histograms']['route[Route=GET /health]']['count'] == 1
+        assert body['metrics']['histograms']['event[EventType=api_gateway]']['count'] == 1
+
+    @patch('app.handlers.orchestrator.ROUTER.resolve')
+    def test_erro_no_handler_conta_5xx(self, mock_resolve):
+        """Teste de contador de respostas 5xx por rota"""
+        # Arrange
+        mock_resolve.return_value = lambda event, context: {'statusCode': 503, 'body': '{}'}
+
+        # Act
+        handle_event({'httpMethod': 'GET', 'resource': '/contas', 'path': '/contas'}, None)
+
+        # Assert
+        assert metrics.snapshot()['counters']['route.5xx[Route=GET /contas]'] == 1
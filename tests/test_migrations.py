@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.models.base import Base
+from app.models.fornecedor import Fornecedor
+from app.utils.migrations import MIGRATIONS, MigrationError, current_version, run_migrations
+from app.utils.query_plans import explain_hot_queries
+
+class TestMigrations:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória"""
+        self.engine = create_engine("sqlite://")
+
+    def teardown_method(self):
+        self.engine.dispose()
+
+    def test_run_migrations_aplica_todas_as_versoes(self):
+        """Teste de aplicação das migrações em banco vazio"""
+        # Act
+        applied = run_migrations(self.engine)
+
+        # Assert
+        assert applied == [version for version, _, _ in MIGRATIONS]
+        with self.engine.connect() as conn:
+            assert current_version(conn) == MIGRATIONS[-1][0]
+        indexes = {index['name'] for index in inspect(self.engine).get_indexes('contas')}
+        assert {'ix_contas_status_vencimento', 'ix_contas_fornecedor_vencimento', 'ix_contas_vencimento_id'} <= indexes
+
+    def test_run_migrations_idempotente(self):
+        """Teste de execução repetida sem reaplicar migrações"""
+        # Arrange
+        run_migrations(self.engine)
+
+        # Act
+        applied = run_migrations(self.engine)
+
+        # Assert
+        assert applied == []
+
+    def test_run_migrations_ate_versao_alvo(self):
+        """Teste de aplicação parcial até uma versão"""
+        # Act
+        applied = run_migrations(self.engine, target=1)
+
+        # Assert
+        assert applied == [1]
+        assert 'contas' in inspect(self.engine).get_table_names()
+
+    def test_coluna_atributos_adicionada_em_outbox_existente(self):
+        """Teste da migração 4 numa outbox criada antes da coluna atributos"""
+        # Arrange
+        run_migrations(self.engine, target=3)
+        assert 'atributos' not in {coluna['name'] for coluna in inspect(self.engine).get_columns('outbox')}
+
+        # Act
+        applied = run_migrations(self.engine)
+
+        # Assert
+        assert applied == [4]
+        assert 'atributos' in {coluna['name'] for coluna in inspect(self.engine).get_columns('outbox')}
+
+    def test_schema_migrado_igual_aos_models(self):
+        """Teste das tabelas criadas pelas migrações contra as colunas e índices dos models"""
+        # Act
+        run_migrations(self.engine)
+
+        # Assert
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            assert {coluna['name'] for coluna in inspector.get_columns(table.name)} == set(table.columns.keys())
+            assert {index['name'] for index in inspector.get_indexes(table.name)} == {index.name for index in table.indexes}
+
+    def test_documento_repetido_impede_indice_unico(self):
+        """Teste da migração 2 com fornecedores duplicados: erro claro e nenhum índice criado"""
+        # Arrange
+        run_migrations(self.engine, target=1)
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO fornecedores (nome, documento) VALUES ('A', '123'), ('B', '123'), ('C', '456'), ('D', NULL), ('E', NULL)"
+            ))
+
+        # Act
+        with pytest.raises(MigrationError, match=r"123 \(2x\)"):
+            run_migrations(self.engine)
+
+        # Assert
+        with self.engine.connect() as conn:
+            assert current_version(conn) == 1
+        assert inspect(self.engine).get_indexes('contas') == []
+
+    def test_documento_unico(self):
+        """Teste do índice único de documento do fornecedor"""
+        # Arrange
+        run_migrations(self.engine)
+        session = sessionmaker(bind=self.engine)()
+        session.add(Fornecedor(nome="A", documento="123", email="a@test.com", telefone="1"))
+        session.commit()
+
+        # Act & Assert
+        session.add(Fornecedor(nome="B", documento="123", email="b@test.com", telefone="2"))
+        with pytest.raises(IntegrityError):
+            session.commit()
+        session.close()
+
+    def test_consultas_criticas_usam_indices(self):
+        """Teste do EXPLAIN das consultas críticas dos repositórios"""
+        # Arrange
+        run_migrations(self.engine)
+
+        # Act
+        results = explain_hot_queries(self.engine)
+
+        # Assert
+        for name, result in results.items():
+            assert result['uses_index'], f"{name} não usa {result['index']}: {result['plan']}"
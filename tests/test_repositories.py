@@ -0,0 +1,640 @@
+import pytest
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models.base import Base
+from app.models.conta import Conta, Status
+from app.models.fornecedor import Fornecedor
+from app.models.outbox import OutboxMensagem
+from app.repositories.conta_repository import ContaRepository
+from app.repositories.fornecedor_repository import FornecedorRepository
+from app.repositories.interfaces import IRepositorioFornecedor
+from app.repositories.transacao import unidade_de_trabalho
+from app.repositories.cache import CacheLRU, FornecedorRepositoryCache
+from app.repositories.outbox import OutboxRepository
+from app.repositories.leitura import ContaLeituraRepository, ContaRow, FornecedorLeituraRepository, FornecedorRow
+from benchmarks.dataset import carregar, gerar_contas
+from benchmarks.repository_suite import comparar
+
+class TestContaRepository:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo_conta = ContaRepository(self.session)
+
+        self.fornecedor = Fornecedor(nome="Fornecedor", documento="123", email="f@test.com", telefone="123")
+        self.session.add(self.fornecedor)
+        self.session.commit()
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _criar_contas(self, quantidade, vencimento, status=Status.ABERTA):
+        contas = [
+            Conta(
+                descricao=f"Conta {i}",
+                valor=10.0 + i,
+                vencimento=vencimento,
+                status=status,
+                fornecedor_id=self.fornecedor.id
+            )
+            for i in range(quantidade)
+        ]
+        self.session.add_all(contas)
+        self.session.commit()
+        return contas
+
+    def test_atualizar_status_atrasadas_em_lotes(self):
+        """Teste de atualização em lotes por keyset, sem lotes vazios nas lacunas de ids"""
+        # Arrange
+        ontem = date.today() - timedelta(days=1)
+        for _ in range(7):
+            # Contas vencidas intercaladas com contas que não entram no UPDATE
+            self._criar_contas(1, ontem)
+            self._criar_contas(2, date.today() + timedelta(days=5))
+        self._criar_contas(2, ontem, status=Status.PAGA)
+
+        # Act
+        lotes = []
+        quantidade = self.repo_conta.atualizar_status_atrasadas(tamanho_lote=3, ao_atualizar=lotes.append)
+
+        # Assert
+        assert quantidade == 7
+        assert [lote['linhas'] for lote in self.repo_conta.relatorio_atrasadas] == [3, 3, 1]
+        assert [len(ids) for ids in lotes] == [3, 3, 1]
+        assert all('ids' not in lote for lote in self.repo_conta.relatorio_atrasadas)
+        assert self.session.query(Conta).filter(Conta.status == Status.ATRASADA).count() == 7
+        assert self.session.query(Conta).filter(Conta.status == Status.PAGA).count() == 2
+        assert self.session.query(Conta).filter(Conta.status == Status.ABERTA).count() == 14
+
+    def test_atualizar_status_atrasadas_sem_returning(self):
+        """Teste de banco sem UPDATE ... RETURNING: contagem pelo rowcount"""
+        # Arrange
+        self._criar_contas(5, date.today() - timedelta(days=1))
+        lotes = []
+
+        # Act
+        with patch.object(self.session.get_bind().dialect, 'update_returning', False):
+            quantidade = self.repo_conta.atualizar_status_atrasadas(tamanho_lote=2, ao_atualizar=lotes.append)
+
+        # Assert
+        assert quantidade == 5
+        assert [lote['linhas'] for lote in self.repo_conta.relatorio_atrasadas] == [2, 2, 1]
+        assert lotes == []
+
+    def test_atualizar_status_atrasadas_sem_contas_vencidas(self):
+        """Teste sem contas vencidas"""
+        # Arrange
+        self._criar_contas(2, date.today())
+
+        # Act
+        quantidade = self.repo_conta.atualizar_status_atrasadas()
+
+        # Assert
+        assert quantidade == 0
+        assert self.repo_conta.relatorio_atrasadas == []
+
+    def test_listar_pagina_keyset(self):
+        """Teste de paginação por (vencimento, id) sem repetir nem pular contas"""
+        # Arrange
+        hoje = date.today()
+        for dias in (3, 1, 2, 1, 3):
+            self._criar_contas(1, hoje + timedelta(days=dias))
+        esperado = [
+            (conta.vencimento, conta.id)
+            for conta in self.session.query(Conta).order_by(Conta.vencimento, Conta.id)
+        ]
+
+        # Act
+        paginas = []
+        apos = None
+        while True:
+            pagina = self.repo_conta.listar_pagina(2, apos=apos)
+            if not pagina:
+                break
+            paginas.append(pagina)
+            apos = (pagina[-1].vencimento, pagina[-1].id)
+
+        # Assert
+        assert [len(pagina) for pagina in paginas] == [2, 2, 1]
+        assert [(conta.vencimento, conta.id) for pagina in paginas for conta in pagina] == esperado
+
+    def test_iter_contas_com_filtros(self):
+        """Teste de iteração em lotes aplicando filtros"""
+        # Arrange
+        self._criar_contas(5, date.today())
+        self._criar_contas(2, date.today(), status=Status.PAGA)
+
+        # Act
+        contas = list(self.repo_conta.iter_contas(tamanho_lote=2, status=Status.ABERTA))
+
+        # Assert
+        assert len(contas) == 5
+        assert all(conta.status == Status.ABERTA for conta in contas)
+
+    def test_salvar_em_lote_retorna_ids_na_ordem(self):
+        """Teste de inserção em lote numa única transação"""
+        # Arrange
+        linhas = [
+            {'descricao': f"Lote {i}", 'valor': float(i + 1), 'vencimento': date.today(), 'fornecedor_id': self.fornecedor.id}
+            for i in range(5)
+        ]
+
+        # Act
+        ids = self.repo_conta.salvar_em_lote(linhas)
+
+        # Assert
+        assert len(ids) == 5
+        salvas = {conta.id: conta for conta in self.session.query(Conta)}
+        assert [salvas[conta_id].descricao for conta_id in ids] == [f"Lote {i}" for i in range(5)]
+        assert all(salvas[conta_id].status == Status.ABERTA for conta_id in ids)
+
+    def test_marcar_como_paga_idempotente(self):
+        """Teste do pagamento com um único UPDATE, ignorando reentregas"""
+        # Arrange
+        contas = self._criar_contas(1, date.today())
+        conta_id, fornecedor_id = contas[0].id, self.fornecedor.id
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        # Act
+        paga = self.repo_conta.marcar_como_paga(conta_id)
+        repetida = self.repo_conta.marcar_como_paga(conta_id)
+
+        # Assert
+        assert paga == (conta_id, "Conta 0", 10.0, fornecedor_id)
+        assert repetida is None
+        assert len(statements) == 2
+        assert all(sql.startswith("UPDATE contas") for sql in statements)
+        self.session.expire_all()
+        assert contas[0].status == Status.PAGA
+
+    def test_pagar_em_lote_por_ids_e_por_fornecedor(self):
+        """Teste do pagamento em lote por ids e de todas as contas em aberto do fornecedor"""
+        # Arrange
+        contas = self._criar_contas(4, date.today())
+        self._criar_contas(1, date.today() - timedelta(days=1), status=Status.ATRASADA)
+        outro = Fornecedor(nome="Outro", documento="456", email="o@test.com", telefone="1")
+        self.session.add(outro)
+        self.session.flush()
+        self.session.add(Conta(descricao="Outra", valor=1.0, vencimento=date.today(), status=Status.ABERTA, fornecedor_id=outro.id))
+        self.session.commit()
+
+        # Act
+        por_ids = self.repo_conta.pagar_em_lote(conta_ids=[contas[0].id, contas[1].id])
+        por_fornecedor = self.repo_conta.pagar_em_lote(fornecedor_id=self.fornecedor.id)
+
+        # Assert
+        assert sorted(paga.id for paga in por_ids) == [contas[0].id, contas[1].id]
+        assert len(por_fornecedor) == 3
+        assert self.session.query(Conta).filter(Conta.status != Status.PAGA).count() == 1
+        assert self.repo_conta.pagar_em_lote(conta_ids=[]) == []
+        with pytest.raises(ValueError):
+            self.repo_conta.pagar_em_lote()
+
+    def test_unidade_de_trabalho_confirma_ao_final(self):
+        """Teste de várias operações de repositório numa única transação"""
+        # Arrange
+        contas = self._criar_contas(2, date.today())
+
+        # Act
+        with unidade_de_trabalho(self.session):
+            self.repo_conta.marcar_como_paga(contas[0].id)
+            self.repo_conta.marcar_como_paga(contas[1].id)
+            assert self.session.in_transaction()
+
+        # Assert
+        self.session.expire_all()
+        assert self.session.query(Conta).filter(Conta.status == Status.PAGA).count() == 2
+
+    def test_unidade_de_trabalho_desfaz_em_caso_de_erro(self):
+        """Teste de rollback da unidade de trabalho"""
+        # Arrange
+        contas = self._criar_contas(1, date.today())
+
+        # Act
+        with pytest.raises(RuntimeError):
+            with unidade_de_trabalho(self.session):
+                self.repo_conta.marcar_como_paga(contas[0].id)
+                raise RuntimeError("falha")
+
+        # Assert
+        assert self.session.query(Conta).filter(Conta.status == Status.PAGA).count() == 0
+
+class TestFornecedorRepository:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo_fornecedor = FornecedorRepository(self.session)
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_buscar_ids_existentes(self):
+        """Teste de verificação de vários fornecedores com uma consulta"""
+        # Arrange
+        fornecedores = [
+            Fornecedor(nome=f"F{i}", documento=str(i), email=f"f{i}@test.com", telefone="1")
+            for i in range(3)
+        ]
+        self.session.add_all(fornecedores)
+        self.session.commit()
+
+        # Act
+        existentes = self.repo_fornecedor.buscar_ids_existentes([fornecedores[0].id, fornecedores[2].id, 999])
+
+        # Assert
+        assert existentes == {fornecedores[0].id, fornecedores[2].id}
+        assert self.repo_fornecedor.buscar_ids_existentes([]) == set()
+
+    def test_interface_exige_metodos_usados_pelos_servicos(self):
+        """Teste do contrato de IRepositorioFornecedor cumprido pelas implementações"""
+        # Assert
+        assert {'buscar_ids_existentes', 'buscar_por_ids', 'buscar_por_documento', 'atualizar'} <= IRepositorioFornecedor.__abstractmethods__
+        assert isinstance(FornecedorRepositoryCache(self.repo_fornecedor), IRepositorioFornecedor)
+
+class TestFornecedorRepositoryCache:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória e cache próprio"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.session = self.Session()
+        self.cache = CacheLRU(capacidade=2, ttl=60, ttl_negativo=60)
+        self.repo = FornecedorRepositoryCache(FornecedorRepository(self.session), self.cache)
+
+        self.fornecedor = Fornecedor(nome="Fornecedor", documento="123", email="f@test.com", telefone="1")
+        self.session.add(self.fornecedor)
+        self.session.commit()
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_acerto_em_outra_sessao_sem_consulta(self):
+        """Teste de leitura do cache por outra sessão (container aquecido)"""
+        # Arrange
+        self.repo.buscar_por_id(self.fornecedor.id)
+        outra_sessao = self.Session()
+        repo = FornecedorRepositoryCache(FornecedorRepository(outra_sessao), self.cache)
+        consultas = []
+        event.listen(self.engine, 'before_cursor_execute', lambda *args: consultas.append(args[2]))
+
+        # Act
+        fornecedor = repo.buscar_por_id(self.fornecedor.id)
+
+        # Assert
+        assert fornecedor.nome == "Fornecedor"
+        assert fornecedor in outra_sessao
+        assert consultas == []
+        assert self.cache.estatisticas()['hits'] == 1
+        outra_sessao.close()
+
+    def test_cache_negativo_invalidado_ao_salvar(self):
+        """Teste de resultado negativo invalidado pela criação do fornecedor"""
+        # Arrange
+        assert self.repo.buscar_por_documento("456") is None
+
+        # Act
+        self.repo.salvar(Fornecedor(nome="Novo", documento="456", email="n@test.com", telefone="1"))
+        fornecedor = self.repo.buscar_por_documento("456")
+
+        # Assert
+        assert fornecedor.nome == "Novo"
+
+    def test_atualizar_e_excluir_invalidam(self):
+        """Teste de invalidação nas escritas"""
+        # Arrange
+        self.repo.buscar_por_id(self.fornecedor.id)
+        self.repo.buscar_por_documento("123")
+
+        # Act
+        self.repo.atualizar(self.fornecedor.id, {'nome': 'Renomeado', 'documento': '789'})
+        por_documento_antigo = self.repo.buscar_por_documento("123")
+        atualizado = self.repo.buscar_por_id(self.fornecedor.id)
+        self.repo.excluir(self.fornecedor.id)
+
+        # Assert
+        assert por_documento_antigo is None
+        assert atualizado.nome == 'Renomeado'
+        assert self.repo.buscar_por_id(self.fornecedor.id) is None
+
+    def test_unidade_de_trabalho_popula_apenas_sem_escrita_de_fornecedor(self):
+        """Teste de leitura em unidade de trabalho guardada no cache, exceto após alterar fornecedores"""
+        # Act
+        with unidade_de_trabalho(self.session):
+            self.repo.buscar_por_id(self.fornecedor.id)
+        with pytest.raises(RuntimeError):
+            with unidade_de_trabalho(self.session):
+                novo = self.repo.salvar(Fornecedor(nome="Novo", documento="456", email="n@test.com", telefone="1"))
+                self.repo.buscar_por_id(novo.id)
+                raise RuntimeError("falha")
+        com_escrita_desfeita = self.cache.get(('id', novo.id), 'ausente')
+        self.repo.buscar_por_documento("123")
+
+        # Assert
+        assert self.cache.get(('id', self.fornecedor.id), 'ausente')['nome'] == "Fornecedor"
+        assert com_escrita_desfeita == 'ausente'
+        assert self.cache.get(('documento', "123"), 'ausente') != 'ausente'
+
+    def test_buscar_por_ids_uma_consulta_para_as_faltas(self):
+        """Teste de busca de vários fornecedores: acertos do cache e uma única consulta IN para o restante"""
+        # Arrange
+        outros = [Fornecedor(nome=f"Outro {i}", documento=f"9{i}", email="o@test.com", telefone="1") for i in range(3)]
+        self.session.add_all(outros)
+        self.session.commit()
+        outros_ids = [outro.id for outro in outros]
+        self.repo.cache = CacheLRU(capacidade=100, ttl=60, ttl_negativo=60)
+        self.repo.buscar_por_id(self.fornecedor.id)
+        consultas = []
+        event.listen(self.engine, 'before_cursor_execute', lambda *args: consultas.append(args[2]))
+
+        # Act
+        fornecedores = self.repo.buscar_por_ids([self.fornecedor.id, 999, *outros_ids])
+        repetida = self.repo.buscar_por_ids(outros_ids)
+
+        # Assert
+        assert sorted(fornecedor.nome for fornecedor in fornecedores) == ["Fornecedor", "Outro 0", "Outro 1", "Outro 2"]
+        assert len(repetida) == 3
+        assert len(consultas) == 1
+
+    def test_lru_e_ttl(self):
+        """Teste de remoção por capacidade e por expiração"""
+        # Arrange
+        cache = CacheLRU(capacidade=2, ttl=60)
+
+        # Act
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        with patch('app.repositories.cache.time.monotonic', return_value=time.monotonic() + 120):
+            expirado = cache.get('a', 'expirado')
+
+        # Assert
+        assert cache.get('b', None) is None
+        assert expirado == 'expirado'
+        estatisticas = cache.estatisticas()
+        assert estatisticas['evictions'] == 1
+        assert estatisticas['expirations'] == 1
+
+    def test_buscar_ids_existentes_consulta_apenas_pendentes(self):
+        """Teste de verificação de existência usando o cache"""
+        # Arrange
+        self.repo.buscar_por_id(self.fornecedor.id)
+        self.repo.buscar_por_id(999)
+
+        with patch.object(self.repo.repositorio, 'buscar_ids_existentes', return_value=set()) as mock_buscar:
+            # Act
+            existentes = self.repo.buscar_ids_existentes([self.fornecedor.id, 999, 1000])
+
+        # Assert
+        assert existentes == {self.fornecedor.id}
+        mock_buscar.assert_called_once_with({1000})
+
+class TestContaLeituraRepository:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        fornecedor = Fornecedor(nome="Fornecedor", documento="123", email="f@test.com", telefone="1")
+        self.session.add(fornecedor)
+        self.session.commit()
+        hoje = date.today()
+        self.session.add_all([
+            Conta(descricao=f"Conta {i}", valor=10.0 + i, vencimento=hoje + timedelta(days=i % 5),
+                  status=Status.PAGA if i % 3 == 0 else Status.ABERTA, fornecedor_id=fornecedor.id)
+            for i in range(12)
+        ])
+        self.session.commit()
+        self.session.expunge_all()
+        self.repo = ContaLeituraRepository(self.session)
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_listar_retorna_linhas_sem_entidades_orm(self):
+        """Teste de projeção em ContaRow sem popular o identity map"""
+        # Act
+        contas = self.repo.listar(status=Status.ABERTA)
+
+        # Assert
+        assert len(contas) == 8
+        assert all(isinstance(conta, ContaRow) for conta in contas)
+        assert all(conta.status == Status.ABERTA for conta in contas)
+        assert len(self.session.identity_map) == 0
+
+    def test_listar_pagina_e_iter_contas_na_mesma_ordem(self):
+        """Teste de paginação por chave e iteração em lotes"""
+        # Act
+        primeira = self.repo.listar_pagina(5)
+        segunda = self.repo.listar_pagina(5, apos=(primeira[-1].vencimento, primeira[-1].id))
+        todas = list(self.repo.iter_contas(tamanho_lote=4))
+
+        # Assert
+        assert [conta.id for conta in primeira + segunda] == [conta.id for conta in todas[:10]]
+        assert len(todas) == 12
+
+    def test_fornecedores(self):
+        """Teste de listagem de fornecedores em FornecedorRow"""
+        # Act
+        fornecedores = FornecedorLeituraRepository(self.session).listar()
+
+        # Assert
+        assert fornecedores == [FornecedorRow(1, "Fornecedor", "123", "f@test.com", "1")]
+
+class TestContaFornecedorRelacionamento:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo_conta = ContaRepository(self.session)
+
+        fornecedores = [
+            Fornecedor(nome=f"Fornecedor {i}", documento=str(i), email=f"f{i}@test.com", telefone="1")
+            for i in range(5)
+        ]
+        self.session.add_all(fornecedores)
+        self.session.commit()
+        self.session.add_all([
+            Conta(descricao=f"Conta {i}", valor=10.0, vencimento=date.today(), status=Status.ABERTA,
+                  fornecedor_id=fornecedores[i % 5].id)
+            for i in range(20)
+        ])
+        self.session.commit()
+        self.session.expunge_all()
+
+        self.consultas = []
+        event.listen(self.engine, 'before_cursor_execute', self._contar)
+
+    def teardown_method(self):
+        event.remove(self.engine, 'before_cursor_execute', self._contar)
+        self.session.close()
+        self.engine.dispose()
+
+    def _contar(self, conn, cursor, statement, parameters, context, executemany):
+        self.consultas.append(statement)
+
+    def test_listagem_com_fornecedor_em_numero_constante_de_consultas(self):
+        """Teste de N+1: listar N contas com fornecedor custa uma consulta"""
+        # Act
+        contas = self.repo_conta.listar(com_fornecedor=True)
+        nomes = {conta.fornecedor.nome for conta in contas}
+        pagina = self.repo_conta.listar_pagina(10, com_fornecedor=True)
+        nomes_pagina = [conta.fornecedor.nome for conta in pagina]
+
+        # Assert
+        assert len(contas) == 20
+        assert len(nomes) == 5
+        assert len(nomes_pagina) == 10
+        assert len(self.consultas) == 2
+
+    def test_listagem_sem_opcao_carrega_fornecedor_sob_demanda(self):
+        """Teste do comportamento padrão (lazy): uma consulta por fornecedor distinto"""
+        # Act
+        contas = self.repo_conta.listar()
+        for conta in contas:
+            conta.fornecedor.nome
+
+        # Assert
+        assert len(self.consultas) == 1 + 5
+
+    def test_buscar_por_ids_com_fornecedor(self):
+        """Teste de busca das contas notificadas já com o fornecedor"""
+        # Act
+        contas = self.repo_conta.buscar_por_ids([1, 2, 3], com_fornecedor=True)
+
+        # Assert
+        assert sorted(conta.fornecedor.nome for conta in contas) == ["Fornecedor 0", "Fornecedor 1", "Fornecedor 2"]
+        assert len(self.consultas) == 1
+
+class TestOutboxRepository:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo_outbox = OutboxRepository(self.session)
+
+        self.fornecedor = Fornecedor(nome="Fornecedor", documento="123", email="f@test.com", telefone="123")
+        self.session.add(self.fornecedor)
+        self.session.commit()
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _conta(self):
+        return Conta(descricao="Conta", valor=10.0, vencimento=date.today(), fornecedor_id=self.fornecedor.id)
+
+    def test_mensagem_gravada_na_mesma_transacao_da_conta(self):
+        """Teste de conta e mensagem confirmadas juntas"""
+        # Act
+        with unidade_de_trabalho(self.session):
+            conta = ContaRepository(self.session).salvar(self._conta())
+            self.repo_outbox.adicionar('fila', f'{{"conta_id": {conta.id}}}')
+
+        # Assert
+        assert self.session.query(Conta).count() == 1
+        mensagens = self.repo_outbox.reservar(10, max_tentativas=3)
+        assert [(mensagem.destino, mensagem.corpo) for mensagem in mensagens] == [('fila', f'{{"conta_id": {conta.id}}}')]
+
+    def test_mensagem_desfeita_com_a_conta(self):
+        """Teste de rollback da conta levando junto a mensagem"""
+        # Act
+        with pytest.raises(RuntimeError):
+            with unidade_de_trabalho(self.session):
+                ContaRepository(self.session).salvar(self._conta())
+                self.repo_outbox.adicionar('fila', '{}')
+                raise RuntimeError("falha")
+
+        # Assert
+        assert self.session.query(Conta).count() == 0
+        assert self.repo_outbox.contar_pendentes() == 0
+
+    def test_reservar_ignora_mensagens_no_limite_de_tentativas(self):
+        """Teste de remoção, contagem de falhas e limite de tentativas"""
+        # Arrange
+        self.repo_outbox.adicionar_varios('fila', ['a', 'b', 'c'])
+        primeira, segunda, terceira = self.repo_outbox.reservar(10, max_tentativas=2)
+
+        # Act
+        self.repo_outbox.remover([primeira.id])
+        self.repo_outbox.registrar_falhas([segunda.id])
+        self.repo_outbox.registrar_falhas([segunda.id, terceira.id])
+        self.session.commit()
+
+        # Assert
+        assert self.repo_outbox.contar_pendentes() == 2
+        assert [mensagem.corpo for mensagem in self.repo_outbox.reservar(10, max_tentativas=2)] == ['c']
+        assert self.session.get(OutboxMensagem, segunda.id).tentativas == 2
+
+class TestDatasetSintetico:
+    def setup_method(self):
+        """Setup para cada teste com a base sintética num SQLite em memória"""
+        self.hoje = date(2024, 6, 15)
+        self.engine = create_engine("sqlite://")
+        carregar(self.engine, contas=2000, fornecedores=20, hoje=self.hoje, tamanho_lote=500)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_gerador_deterministico(self):
+        """Teste de mesma semente e data gerando as mesmas contas"""
+        # Act
+        primeira = list(gerar_contas(500, 20, semente=7, hoje=self.hoje))
+        segunda = list(gerar_contas(500, 20, semente=7, hoje=self.hoje))
+        outra = list(gerar_contas(500, 20, semente=8, hoje=self.hoje))
+
+        # Assert
+        assert primeira == segunda
+        assert primeira != outra
+        assert {conta['fornecedor_id'] for conta in primeira} <= set(range(1, 21))
+
+    def test_carga_com_mistura_de_status(self):
+        """Teste da distribuição de status e dos documentos únicos carregados"""
+        # Act
+        contas = self.session.query(Conta).all()
+        documentos = {f.documento for f in self.session.query(Fornecedor).all()}
+
+        # Assert
+        assert len(contas) == 2000
+        assert len(documentos) == 20
+        assert {conta.status for conta in contas} == set(Status)
+        assert all(conta.status != Status.ATRASADA for conta in contas if conta.vencimento >= self.hoje)
+
+    def test_comparacao_com_baseline(self):
+        """Teste de regressão acima da tolerância e do ruído"""
+        # Arrange
+        baseline = {'resultados': [
+            {'operacao': 'listar[status]', 'mediana_ms': 100.0},
+            {'operacao': 'marcar_como_paga', 'mediana_ms': 0.2},
+        ]}
+        atual = {'resultados': [
+            {'operacao': 'listar[status]', 'mediana_ms': 130.0},
+            {'operacao': 'marcar_como_paga', 'mediana_ms': 0.4},
+            {'operacao': 'listar[sem_filtros]', 'linhas': 10, 'ignorada': 'mais de 5 linhas'},
+        ]}
+
+        # Act
+        diferencas = {d['operacao']: d for d in comparar(atual, baseline, tolerancia=0.15)}
+
+        # Assert
+        assert diferencas['listar[status]']['regressao'] is True
+        assert diferencas['listar[status]']['variacao'] == 0.3
+        assert diferencas['marcar_como_paga']['regressao'] is False
+        assert 'listar[sem_filtros]' not in diferencas
@@ -0,0 +1,196 @@
+import pytest
+import json
+from unittest.mock import MagicMock, patch
+from app.handlers import router as router_module
+from app.handlers.orchestrator import handle_api_gateway, handle_cloudwatch_event
+from app.handlers.router import Router, import_handler, clear_handler_cache
+from benchmarks.event_replay import MODELOS, Contexto, gerar_eventos, replay_eventos, rotulo
+
+class TestRouter:
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.router = Router()
+        self.router.add('GET', '/contas', 'handler_list_contas')
+        self.router.add('POST', '/contas', 'handler_create_conta')
+        self.router.add('POST', '/contas/lote', 'handler_create_contas_lote')
+        self.router.add('GET', '/contas/{id}', 'handler_get_conta')
+        self.router.add('POST', '/contas/{id}/pagar', 'handler_pagar_conta')
+
+    def test_rota_estatica_tem_precedencia(self):
+        """Teste de /contas/lote antes de /contas/{id}"""
+        # Act
+        resultado = self.router.match('POST', '/contas/lote/')
+
+        # Assert
+        assert resultado.rota.handler == 'handler_create_contas_lote'
+        assert resultado.path_parameters == {}
+
+    def test_extrai_parametros_do_caminho(self):
+        """Teste de extração de parâmetros"""
+        # Act
+        resultado = self.router.match('post', '/contas/42/pagar')
+
+        # Assert
+        assert resultado.rota.template == '/contas/{id}/pagar'
+        assert resultado.path_parameters == {'id': '42'}
+
+    def test_nao_confunde_prefixo(self):
+        """Teste de caminho que apenas contém '/contas'"""
+        # Act
+        resultado = self.router.match('GET', '/contas-foo')
+
+        # Assert
+        assert resultado.rota is None
+        assert resultado.allowed_methods == []
+
+    def test_metodo_nao_permitido(self):
+        """Teste dos métodos permitidos para um caminho existente"""
+        # Act
+        resultado = self.router.match('DELETE', '/contas')
+
+        # Assert
+        assert resultado.rota is None
+        assert resultado.allowed_methods == ['GET', 'POST']
+
+    def test_cache_de_resultados(self):
+        """Teste do cache por (método, caminho), limitado e invalidado ao registrar rotas"""
+        # Arrange
+        router = Router(cache_max=2)
+        router.add('GET', '/contas/{id}', 'handler_get_conta')
+        primeiro = router.match('GET', '/contas/1')
+
+        # Act
+        repetido = router.match('GET', '/contas/1')
+        router.match('GET', '/contas/2')
+        router.match('GET', '/contas/3')
+        router.add('DELETE', '/contas/{id}', 'handler_delete_conta')
+        apos_add = router.match('DELETE', '/contas/1')
+
+        # Assert
+        assert repetido is primeiro
+        assert repetido.path_parameters == {'id': '1'}
+        assert len(router._resultados) <= 2
+        assert apos_add.rota.handler == 'handler_delete_conta'
+
+    def test_parametro_vazio_nao_casa(self):
+        """Teste de segmento de parâmetro vazio (ex: /contas//pagar)"""
+        # Act
+        resultado = self.router.match('POST', '/contas//pagar')
+
+        # Assert
+        assert resultado.rota is None
+
+class TestImportHandler:
+    def setup_method(self):
+        """Setup para cada teste"""
+        clear_handler_cache()
+
+    def teardown_method(self):
+        clear_handler_cache()
+
+    def test_cache_negativo(self):
+        """Teste de handler inexistente importado uma única vez"""
+        with patch.object(router_module.importlib, 'import_module', side_effect=ImportError('inexistente')) as mock_import:
+            # Act
+            primeiro = import_handler('handler_inexistente')
+            segundo = import_handler('handler_inexistente')
+
+        # Assert
+        assert primeiro is None and segundo is None
+        mock_import.assert_called_once()
+
+class TestOrchestratorApiGateway:
+    def test_parametros_repassados_ao_handler(self):
+        """Teste de pathParameters mesclados no evento"""
+        # Arrange
+        handler = MagicMock(return_value={'statusCode': 200})
+        event = {'httpMethod': 'POST', 'resource': '/contas/{id}/pagar', 'path': '/contas/7/pagar'}
+
+        with patch('app.handlers.router.import_handler', return_value=handler):
+            # Act
+            response = handle_api_gateway(event, None)
+
+        # Assert
+        assert response == {'statusCode': 200}
+        assert handler.call_args.args[0]['pathParameters'] == {'id': '7'}
+
+    def test_rota_inexistente_e_handler_ausente(self):
+        """Teste de 404 para caminho desconhecido e 501 para handler não implementado"""
+        with patch('app.handlers.router.import_handler', return_value=None):
+            # Act
+            nao_encontrada = handle_api_gateway({'httpMethod': 'GET', 'path': '/contas-foo'}, None)
+            nao_implementada = handle_api_gateway({'httpMethod': 'GET', 'path': '/contas/1'}, None)
+
+        # Assert
+        assert nao_encontrada['statusCode'] == 404
+        assert nao_implementada['statusCode'] == 501
+        assert json.loads(nao_implementada['body'])['action'] == 'handler_get_conta'
+
+class TestOrchestratorCloudWatch:
+    @patch.dict('os.environ', {'SQS_PROCESSAMENTO_URL': 'https://sqs.local/processamento'})
+    @patch('app.handlers.orchestrator.import_handler', return_value=None)
+    def test_falha_ao_enfileirar_verificacao_retorna_500(self, mock_import):
+        """Teste de erro no envio da verificação de vencimentos agendada"""
+        # Arrange
+        event = {'source': 'aws.events', 'detail': {'rule-name': 'contas-a-pagar-verificar-vencimentos'}}
+
+        with patch('app.utils.aws_config.send_sqs_message', side_effect=RuntimeError('SQS indisponível')) as mock_send:
+            # Act
+            response = handle_cloudwatch_event(event, None)
+
+        # Assert
+        assert response['statusCode'] == 500
+        mock_send.assert_called_once()
+
+class TestEventReplay:
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.ctx = Contexto(contas=100, fornecedores=10)
+
+    def test_rotulo_dos_modelos_sinteticos(self):
+        """Teste de cada modelo sintético gerando um evento com o próprio rótulo"""
+        # Act
+        eventos = gerar_eventos({nome: 1 for nome in MODELOS}, 200, self.ctx, semente=1, lote_sqs=3)
+
+        # Assert
+        assert {nome for nome, _ in eventos} == set(MODELOS)
+        assert all(rotulo(event) == nome for nome, event in eventos)
+
+    def test_rotulo_usa_template_da_rota(self):
+        """Teste de rótulo com o template da rota parametrizada"""
+        # Act
+        resultado = rotulo({'httpMethod': 'post', 'path': '/contas/42/pagar'})
+
+        # Assert
+        assert resultado == 'api.POST /contas/{id}/pagar'
+
+    def test_fluxo_deterministico_pela_semente(self):
+        """Teste de mesma semente gerando o mesmo fluxo"""
+        # Arrange
+        mix = {'api.GET /contas': 3, 'sqs.conta_criada': 1}
+
+        # Act
+        primeiro = gerar_eventos(mix, 50, Contexto(100, 10), semente=5)
+        segundo = gerar_eventos(mix, 50, Contexto(100, 10), semente=5)
+
+        # Assert
+        assert primeiro == segundo
+
+    def test_mix_com_rotulo_sem_modelo(self):
+        """Teste de erro para rótulo sem modelo sintético"""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            gerar_eventos({'api.GET /inexistente': 1}, 10, self.ctx)
+
+    def test_replay_com_mistura(self):
+        """Teste de replay sorteando apenas rótulos gravados"""
+        # Arrange
+        gravados = [event for _, event in gerar_eventos({'sns': 1, 'api.GET /health': 1}, 20, self.ctx)]
+
+        # Act
+        em_ordem = replay_eventos(gravados, 30)
+        misturados = replay_eventos(gravados, 30, {'sns': 1, 'sqs.conta_criada': 5})
+
+        # Assert
+        assert [event for _, event in em_ordem[:20]] == gravados
+        assert {nome for nome, _ in misturados} == {'sns'}
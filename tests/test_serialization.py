@@ -0,0 +1,62 @@
+import json
+from datetime import date
+from unittest.mock import patch
+from app.models.conta import Conta, Status
+from app.utils import serialization
+from app.utils.serialization import conta_json, dumps, pagina_contas_json
+
+class TestSerialization:
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.conta = Conta(id=1, descricao="Água", valor=99.9, vencimento=date(2024, 12, 31), status=Status.ATRASADA, fornecedor_id=2)
+
+    def test_conta_json_a_partir_do_modelo_orm(self):
+        """Teste de serialização de Conta com date e Status"""
+        # Act
+        body = json.loads(conta_json(self.conta))
+
+        # Assert
+        assert body == {
+            'id': 1,
+            'descricao': 'Água',
+            'valor': 99.9,
+            'vencimento': '2024-12-31',
+            'status': 'Atrasada',
+            'fornecedor_id': 2
+        }
+
+    def test_conta_sem_descricao(self):
+        """Teste de conta gravada sem descrição (coluna anulável)"""
+        # Arrange
+        self.conta.descricao = None
+
+        # Act
+        body = json.loads(conta_json(self.conta))
+
+        # Assert
+        assert body['descricao'] is None
+
+    def test_pagina_contas_json(self):
+        """Teste do corpo da listagem paginada"""
+        # Act
+        body = json.loads(pagina_contas_json([self.conta, self.conta], 'abc'))
+
+        # Assert
+        assert body['count'] == 2
+        assert body['next_cursor'] == 'abc'
+        assert [item['status'] for item in body['items']] == ['Atrasada', 'Atrasada']
+
+    def test_dumps_com_e_sem_orjson(self):
+        """Teste do encoder rápido e do fallback da biblioteca padrão"""
+        # Arrange
+        dados = {'vencimento': date(2024, 1, 2), 'status': Status.PAGA, 'descricao': 'Ação', 'nomes': {7: 'Fornecedor'}}
+
+        # Act
+        rapido = dumps(dados)
+        with patch.object(serialization, 'orjson', None):
+            padrao = dumps(dados)
+
+        # Assert
+        assert json.loads(rapido) == json.loads(padrao) == {
+            'vencimento': '2024-01-02', 'status': 'Paga', 'descricao': 'Ação', 'nomes': {'7': 'Fornecedor'}
+        }
@@ -1,12 +1,22 @@
 import pytest
+import json
 from datetime import date, timedelta
 from app.models.conta import Conta, Status
 from app.models.fornecedor import Fornecedor
+from app.repositories.conta_repository import ContaPaga
 from app.schemas.conta_schema import ContaCreate
 from app.schemas.fornecedor_schema import FornecedorCreate
+from app.schemas.paginacao import codificar_cursor, decodificar_cursor
 from app.services.servico_conta import ServicoConta
 from app.services.servico_fornecedor import ServicoFornecedor
-from unittest.mock import Mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models.base import Base
+from app.repositories.outbox import OutboxRepository
+from app.services.relay_outbox import RelayOutbox
+from app.utils.aws_config import SQSBatchProducer
+from app.utils.tracing import TRACEPARENT, parse_traceparent
+from unittest.mock import Mock, patch
 
 class TestServicoConta:
     def setup_method(self):
@@ -84,15 +94,109 @@ class TestServicoConta:
     def test_marcar_como_paga(self):
         """Teste de marcação de conta como paga"""
         # Arrange
-        self.repo_conta_mock.marcar_como_paga.return_value = True
+        paga = ContaPaga(id=1, descricao="Conta teste", valor=100.0, fornecedor_id=1)
+        self.repo_conta_mock.marcar_como_paga.return_value = paga
         
         # Act
         resultado = self.servico_conta.marcar_como_paga(1)
         
         # Assert
-        assert resultado is True
+        assert resultado == paga
         self.repo_conta_mock.marcar_como_paga.assert_called_once_with(1)
 
+    def test_pagar_contas_em_lote(self):
+        """Teste de pagamento em lote delegado ao repositório"""
+        # Arrange
+        self.repo_conta_mock.pagar_em_lote.return_value = [ContaPaga(1, "A", 10.0, 7)]
+        
+        # Act
+        pagas = self.servico_conta.pagar_contas(fornecedor_id=7)
+        
+        # Assert
+        assert [paga.id for paga in pagas] == [1]
+        self.repo_conta_mock.pagar_em_lote.assert_called_once_with(conta_ids=None, fornecedor_id=7)
+
+    def test_listar_contas_paginado_com_proxima_pagina(self):
+        """Teste de paginação retornando cursor para a próxima página"""
+        # Arrange
+        contas = [
+            Conta(id=i, descricao=f"Conta {i}", valor=10.0, vencimento=date(2024, 1, i), status=Status.ABERTA, fornecedor_id=1)
+            for i in range(1, 4)
+        ]
+        self.repo_conta_mock.listar_pagina.return_value = contas
+        
+        # Act
+        pagina, cursor = self.servico_conta.listar_contas_paginado(limite=2, status=Status.ABERTA)
+        
+        # Assert
+        assert [conta.id for conta in pagina] == [1, 2]
+        assert decodificar_cursor(cursor) == (date(2024, 1, 2), 2)
+        self.repo_conta_mock.listar_pagina.assert_called_once_with(3, apos=None, status=Status.ABERTA)
+    
+    def test_listar_contas_paginado_ultima_pagina(self):
+        """Teste de paginação na última página (sem cursor)"""
+        # Arrange
+        self.repo_conta_mock.listar_pagina.return_value = []
+        cursor = codificar_cursor(date(2024, 1, 2), 2)
+        
+        # Act
+        pagina, proximo_cursor = self.servico_conta.listar_contas_paginado(limite=2, cursor=cursor)
+        
+        # Assert
+        assert pagina == []
+        assert proximo_cursor is None
+        self.repo_conta_mock.listar_pagina.assert_called_once_with(3, apos=(date(2024, 1, 2), 2))
+    
+    def test_listar_contas_paginado_cursor_invalido(self):
+        """Teste de paginação com cursor inválido"""
+        with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+            self.servico_conta.listar_contas_paginado(cursor="nao-e-um-cursor")
+
+    def test_leituras_usam_repositorio_de_leitura(self):
+        """Teste de roteamento: listagens nas réplicas, buscas pontuais no writer"""
+        # Arrange
+        repo_leitura = Mock()
+        repo_leitura.listar_pagina.return_value = []
+        servico = ServicoConta(self.repo_conta_mock, self.repo_fornecedor_mock, repo_leitura)
+
+        # Act
+        servico.listar_contas_vencendo(dias=3)
+        servico.listar_contas_paginado(limite=10)
+        servico.buscar_contas([1])
+
+        # Assert
+        repo_leitura.listar.assert_called_once()
+        repo_leitura.listar_pagina.assert_called_once()
+        self.repo_conta_mock.listar.assert_not_called()
+        self.repo_conta_mock.buscar_por_ids.assert_called_once_with([1], com_fornecedor=False)
+        repo_leitura.buscar_por_ids.assert_not_called()
+
+    def test_criar_contas_em_lote_resultado_por_item(self):
+        """Teste de criação em lote com itens válidos e inválidos"""
+        # Arrange
+        self.repo_fornecedor_mock.buscar_ids_existentes.return_value = {1}
+        self.repo_conta_mock.salvar_em_lote.return_value = [10, 11]
+        itens = [
+            {'descricao': 'Conta A', 'valor': 100.0, 'vencimento': '2024-12-31', 'fornecedor_id': 1},
+            {'descricao': 'Conta B', 'valor': 'inválido', 'vencimento': '2024-12-31', 'fornecedor_id': 1},
+            {'descricao': 'Conta C', 'valor': 50.0, 'vencimento': '2024-12-31', 'fornecedor_id': 999},
+            {'descricao': 'Conta D', 'valor': -5.0, 'vencimento': '2024-12-31', 'fornecedor_id': 1},
+            {'descricao': 'Conta E', 'valor': 20.0, 'vencimento': '2025-01-10', 'fornecedor_id': 1},
+        ]
+        
+        # Act
+        resultados = self.servico_conta.criar_contas_em_lote(itens)
+        
+        # Assert
+        assert [resultado['status'] for resultado in resultados] == ['criada', 'erro', 'erro', 'erro', 'criada']
+        assert resultados[0]['id'] == 10
+        assert resultados[4]['id'] == 11
+        assert "Fornecedor com ID 999 não encontrado" in resultados[2]['erro']
+        assert resultados[3]['erro'] == "O valor da conta deve ser positivo"
+        self.repo_fornecedor_mock.buscar_ids_existentes.assert_called_once_with({1, 999})
+        linhas = self.repo_conta_mock.salvar_em_lote.call_args[0][0]
+        assert [linha['descricao'] for linha in linhas] == ['Conta A', 'Conta E']
+
 class TestServicoFornecedor:
     def setup_method(self):
         """Setup para cada teste"""
@@ -145,3 +249,77 @@ class TestServicoFornecedor:
         # Act & Assert
         with pytest.raises(ValueError, match="Já existe um fornecedor com o documento"):
             self.servico_fornecedor.criar_fornecedor(fornecedor_data)
+
+class TestRelayOutbox:
+    def setup_method(self):
+        """Setup para cada teste com banco SQLite em memória e SQS simulado"""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo_outbox = OutboxRepository(self.session)
+        self.sqs = Mock()
+        self.sqs.send_message_batch.return_value = {'Successful': [], 'Failed': []}
+        self.relay = RelayOutbox(self.repo_outbox, lambda: SQSBatchProducer(max_retries=0), tamanho_lote=25, max_tentativas=3)
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_drenar_envia_em_lotes_e_remove(self):
+        """Teste de drenagem completa da outbox com send_message_batch"""
+        # Arrange
+        self.repo_outbox.adicionar_varios('fila', [f'mensagem {i}' for i in range(60)])
+
+        # Act
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            resultado = self.relay.drenar()
+
+        # Assert
+        assert resultado['enviadas'] == 60
+        assert resultado['lotes'] == 3
+        assert self.repo_outbox.contar_pendentes() == 0
+        enviados = [entry['MessageBody'] for call in self.sqs.send_message_batch.call_args_list for entry in call.kwargs['Entries']]
+        assert enviados == [f'mensagem {i}' for i in range(60)]
+
+    def test_falhas_ficam_na_outbox(self):
+        """Teste de mensagem com falha mantida para a próxima drenagem"""
+        # Arrange
+        self.repo_outbox.adicionar_varios('fila', ['a', 'b'])
+        self.sqs.send_message_batch.return_value = {
+            'Successful': [{'Id': '0'}],
+            'Failed': [{'Id': '1', 'Code': 'InternalError', 'SenderFault': False}]
+        }
+
+        # Act
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            resultado = self.relay.drenar()
+
+        # Assert
+        assert (resultado['enviadas'], resultado['falhas']) == (1, 1)
+        pendentes = self.repo_outbox.reservar(10, max_tentativas=3)
+        assert [(mensagem.corpo, mensagem.tentativas) for mensagem in pendentes] == [('b', 1)]
+
+
+    def test_atributos_gravados_repassados_ao_sqs(self):
+        """Teste de MessageAttributes da outbox enviados ao SQS, com o traceparent do span outbox"""
+        # Arrange
+        traceparent = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+        self.repo_outbox.adicionar('fila', 'com trace', json.dumps({
+            'origem': {'DataType': 'String', 'StringValue': 'api'},
+            TRACEPARENT: {'DataType': 'String', 'StringValue': traceparent},
+        }))
+        self.repo_outbox.adicionar('fila', 'sem trace', json.dumps({'origem': {'DataType': 'String', 'StringValue': 'api'}}))
+        self.repo_outbox.adicionar('fila', 'ilegível', '{')
+
+        # Act
+        with patch('app.utils.aws_config.get_aws_client', return_value=self.sqs):
+            resultado = self.relay.drenar()
+
+        # Assert
+        assert (resultado['enviadas'], resultado['falhas']) == (2, 1)
+        com_trace, sem_trace = self.sqs.send_message_batch.call_args.kwargs['Entries']
+        assert com_trace['MessageAttributes']['origem']['StringValue'] == 'api'
+        propagado = parse_traceparent(com_trace['MessageAttributes'][TRACEPARENT]['StringValue'])
+        assert propagado.trace_id == '0af7651916cd43dd8448eb211c80319c'
+        assert propagado.span_id != 'b7ad6b7169203331'
+        assert sem_trace['MessageAttributes'] == {'origem': {'DataType': 'String', 'StringValue': 'api'}}
@@ -0,0 +1,211 @@
+import json
+import os
+import tempfile
+from contextlib import ExitStack
+from datetime import date
+from unittest.mock import patch
+from loguru import logger
+from sqlalchemy import insert
+from app.handlers import handler_create_conta, handler_drenar_outbox, handler_processa_fila
+from app.models.fornecedor import Fornecedor
+from app.utils.aws_config import SQSBatchProducer, publish_sns_message, send_sqs_message, set_messaging_backend
+from app.utils.database import DatabaseConfig
+from app.utils.local_broker import InMemoryBroker
+from app.utils.logger import configure_logger
+from app.utils.migrations import run_migrations
+from app.utils.tracing import TRACEPARENT, Tracer, format_traceparent, parse_traceparent, tracer
+from benchmarks.trace_report import caminhos, ler_spans, resumir
+
+class TestTracer:
+    def setup_method(self):
+        """Setup para cada teste com sink em memória para os spans"""
+        configure_logger()
+        self.linhas = []
+        self.sink_id = logger.add(self.linhas.append, level="INFO", format="{message}")
+        self.tracer = Tracer(enabled=True, sample_rate=1)
+
+    def teardown_method(self):
+        logger.remove(self.sink_id)
+
+    def spans(self):
+        return list(ler_spans(str(linha) for linha in self.linhas))
+
+    def test_traceparent_w3c(self):
+        """Teste de leitura e escrita do cabeçalho traceparent"""
+        # Arrange
+        valor = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+
+        # Act
+        contexto = parse_traceparent(valor)
+
+        # Assert
+        assert contexto.trace_id == '0af7651916cd43dd8448eb211c80319c'
+        assert contexto.sampled is True
+        assert format_traceparent(contexto) == valor
+        assert parse_traceparent('00-xyz-b7ad6b7169203331-01') is None
+        assert parse_traceparent('00-' + '0' * 32 + '-b7ad6b7169203331-01') is None
+
+    def test_extract_nos_formatos_sqs_sns_e_http(self):
+        """Teste do contexto recebido em eventos SQS, SNS e cabeçalhos HTTP"""
+        # Arrange
+        valor = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+        formatos = [
+            {'traceparent': {'stringValue': valor, 'dataType': 'String'}, 'trace_sent_at': {'stringValue': '1000', 'dataType': 'Number'}},
+            {'traceparent': {'Type': 'String', 'Value': valor}, 'trace_sent_at': {'Type': 'Number', 'Value': '1000'}},
+            {'Traceparent': valor},
+        ]
+
+        # Act
+        recebidos = [self.tracer.extract(atributos) for atributos in formatos]
+
+        # Assert
+        assert {remote.context.span_id for remote in recebidos} == {'b7ad6b7169203331'}
+        assert [remote.sent_at_ms for remote in recebidos] == [1000.0, 1000.0, None]
+
+    def test_span_filho_do_contexto_recebido(self):
+        """Teste de span continuando o trace recebido, com espera na fila"""
+        # Arrange
+        with self.tracer.span('api POST /contas') as raiz:
+            remote = self.tracer.extract(self.tracer.message_attributes())
+
+        # Act
+        with self.tracer.span('sqs conta_criada', remote, conta_id=7):
+            atributos = self.tracer.message_attributes()
+
+        # Assert
+        api, sqs = sorted(self.spans(), key=lambda span: span['start_ms'])
+        assert api['parent_id'] is None
+        assert sqs['trace_id'] == api['trace_id'] == raiz.context.trace_id
+        assert sqs['parent_id'] == api['span_id']
+        assert sqs['conta_id'] == 7
+        assert sqs['queue_ms'] >= 0
+        assert parse_traceparent(atributos[TRACEPARENT]['StringValue']).span_id == sqs['span_id']
+
+    def test_trace_nao_amostrado_propaga_sem_emitir(self):
+        """Teste de TRACE_SAMPLE_RATE=0: contexto propagado, nenhum span registrado"""
+        # Arrange
+        tracer_sem_amostra = Tracer(enabled=True, sample_rate=0)
+
+        # Act
+        with tracer_sem_amostra.span('api GET /contas'):
+            atributos = tracer_sem_amostra.message_attributes()
+
+        # Assert
+        assert atributos[TRACEPARENT]['StringValue'].endswith('-00')
+        assert self.spans() == []
+
+    def test_inject_preserva_traceparent_existente(self):
+        """Teste de atributos da mensagem sem sobrescrever contexto já informado"""
+        # Arrange
+        proprio = {TRACEPARENT: {'DataType': 'String', 'StringValue': 'x'}}
+
+        # Act
+        with self.tracer.span('api POST /contas'):
+            injetado = self.tracer.inject(proprio)
+            novo = self.tracer.inject({'origem': {'DataType': 'String', 'StringValue': 'teste'}})
+
+        # Assert
+        assert injetado is proprio
+        assert set(novo) == {'origem', 'traceparent', 'trace_sent_at'}
+        assert self.tracer.inject(None) is None
+
+class TestPropagacaoMensageria:
+    def setup_method(self):
+        """Setup para cada teste com o broker em memória como backend"""
+        self.broker = InMemoryBroker(handler=lambda event, context: None)
+        self.fila = self.broker.create_queue('fila')
+        self.topico = self.broker.create_topic('topico')
+        set_messaging_backend(self.broker)
+
+    def teardown_method(self):
+        set_messaging_backend(None)
+
+    def test_sqs_e_sns_levam_contexto_do_span_ativo(self):
+        """Teste de traceparent nos MessageAttributes de send, lote e publish"""
+        # Arrange
+        produtor = SQSBatchProducer()
+
+        # Act
+        with tracer.span('api POST /contas') as span:
+            send_sqs_message(self.fila, 'unitaria')
+            produtor.send(self.fila, 'lote')
+            publish_sns_message(self.topico, 'notificacao')
+        produtor.flush()
+
+        # Assert
+        esperado = format_traceparent(span.context)
+        mensagens = self.broker.receive(self.fila, 10)
+        assert [message.attributes[TRACEPARENT]['StringValue'] for message in mensagens] == [esperado, esperado]
+        notificacao = self.broker.topics[self.topico].pending[0]
+        assert notificacao['MessageAttributes'][TRACEPARENT]['Value'] == esperado
+
+    def test_sem_span_ativo_nao_adiciona_atributos(self):
+        """Teste de mensagens enviadas fora de um trace"""
+        # Act
+        send_sqs_message(self.fila, 'sem trace')
+
+        # Assert
+        assert self.broker.receive(self.fila, 1)[0].attributes == {}
+
+class TestTracePipeline:
+    QUEUE_URL = 'https://sqs.us-east-1.amazonaws.com/000000000000/contas-a-pagar-conta-criada'
+    TOPIC_ARN = 'arn:aws:sns:us-east-1:000000000000:contas-a-pagar-conta-criada'
+
+    def setup_method(self):
+        """Setup para cada teste com SQLite em arquivo, broker em memória e sink de spans"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = DatabaseConfig(database_url=f"sqlite:///{os.path.join(self.tmp.name, 'trace.db')}")
+        run_migrations(self.config.engine)
+        with self.config.engine.begin() as conn:
+            conn.execute(insert(Fornecedor).values(nome='Fornecedor', documento='1', email='f@test.com', telefone='1'))
+
+        self.broker = InMemoryBroker(batch_size=10)
+        self.broker.schedule('contas-a-pagar-drenar-outbox', 0.01)
+        self.stack = ExitStack()
+        for module in (handler_create_conta, handler_processa_fila, handler_drenar_outbox):
+            self.stack.enter_context(patch.object(module, 'db_config', self.config))
+        self.stack.enter_context(patch.dict(os.environ, {
+            'SQS_CONTA_CRIADA_URL': self.QUEUE_URL,
+            'SNS_CONTA_CRIADA_TOPIC': self.TOPIC_ARN,
+        }))
+        set_messaging_backend(self.broker)
+
+        configure_logger()
+        self.linhas = []
+        self.sink_id = logger.add(self.linhas.append, level="INFO", format="{message}")
+
+    def teardown_method(self):
+        logger.remove(self.sink_id)
+        set_messaging_backend(None)
+        self.stack.close()
+        self.config.dispose()
+        self.tmp.cleanup()
+
+    def test_latencia_por_conta_reconstruida_dos_logs(self):
+        """Teste de API -> outbox -> SQS -> SNS num único trace por conta, remontado pelo trace_report"""
+        # Arrange
+        traceparent = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+        event = {
+            'httpMethod': 'POST',
+            'resource': '/contas',
+            'path': '/contas',
+            'headers': {'traceparent': traceparent},
+            'body': json.dumps({'descricao': 'Conta', 'valor': 10.0, 'vencimento': date.today().isoformat(), 'fornecedor_id': 1}),
+        }
+
+        # Act
+        response = self.broker.invoke(event)
+        self.broker.run_until_idle(timeout=10)
+
+        # Assert
+        assert response['statusCode'] == 201
+        resumo = resumir(caminhos(ler_spans(str(linha) for linha in self.linhas)))
+        assert resumo['completos'] == 1
+        caminho = resumo['mais_lentos'][0]
+        assert caminho['trace_id'] == '0af7651916cd43dd8448eb211c80319c'
+        assert caminho['conta_id'] == 1
+        assert [salto['span'] for salto in caminho['saltos']] == [
+            'api POST /contas', 'outbox', 'sqs conta_criada', 'sns contas-a-pagar-conta-criada'
+        ]
+        assert all(salto['queue_ms'] is not None for salto in caminho['saltos'][1:])
+        assert caminho['total_ms'] >= sum(salto['duration_ms'] for salto in caminho['saltos'])